@@ -3,20 +3,20 @@ import openai
 from datetime import datetime
 import pytz
 import os
-import random
-import string
+import re
+import threading
 
+import pandas as pd
 
-PORTS = [
-    "Singapore", "Rotterdam", "Shanghai", "Ningbo-Zhoushan", "Guangzhou Harbor", "Busan",
-    "Qingdao", "Hong Kong", "Tianjin", "Port Klang", "Antwerp", "Dubai Ports", "Xiamen",
-    "Kaohsiung", "Hamburg", "Los Angeles", "Tanjung Pelepas", "Laem Chabang", "New York-New Jersey",
-    "Dalian", "Tanjung Priok", "Valencia", "Colombo", "Ho Chi Minh City", "Algeciras"
-]
-
-VESSEL_PREFIXES = ["MV", "SS", "MT", "MSC", "CMA CGM", "OOCL", "Maersk", "Evergreen", "Cosco", "NYK"]
-VESSEL_NAMES = ["Horizon", "Voyager", "Pioneer", "Adventurer", "Explorer", "Discovery", "Navigator", "Endeavour", "Challenger", "Trailblazer"]
-
+from engine_sfoc import ENGINES, SFOC_FIELDS, compute_sfoc, temperature_only_engines
+from report_fields import compile_report
+from report_forms import (VESSEL_PROFILES, current_vessel, display_report_section, get_report_store, select_vessel,
+                          stored_sfoc, vessel_pressures)
+from report_prefill import (PrefillProvider, ais_file_source, clock_source, discard_draft_prefill, get_draft_prefill,
+                            last_report_source, random_source, vessel_profile_source)
+from report_rules import evaluate_report, violations_by_field
+from report_sequence import REPORT_TYPES, is_valid_next, open_reports, valid_next_reports
+from response_cache import ResponseCache, make_cache_key
 
 # Set page config
 st.set_page_config(layout="wide", page_title="AI-Enhanced Maritime Reporting System")
@@ -91,73 +91,34 @@ if not openai.api_key:
     st.error("OpenAI API key not found. Please set it in Streamlit secrets or as an environment variable.")
     st.stop()
 
-# Define report types
-REPORT_TYPES = [
-    "Arrival", "Departure", "Begin of offhire", "End of offhire", "Arrival STS",
-    "Departure STS", "STS", "Begin canal passage", "End canal passage",
-    "Begin of sea passage", "End of sea passage", "Begin Anchoring/Drifting",
-    "End Anchoring/Drifting", "Noon (Position) - Sea passage", "Noon (Position) - Port",
-    "Noon (Position) - River", "Noon (Position) - Stoppage", "ETA update",
-    "Begin fuel change over", "End fuel change over", "Change destination (Deviation)",
-    "Begin of deviation", "End of deviation", "Entering special area", "Leaving special area"
-]
-
-# Define report structures
-REPORT_STRUCTURES = {report_type: ["Vessel Data", "Voyage Data", "Event Data", "Position", "Cargo", "Fuel Consumption", "ROB", "Fuel Allocation", "Machinery", "Weather", "Draft"] for report_type in REPORT_TYPES}
-REPORT_STRUCTURES["ETA update"] = ["Vessel Data", "Voyage Data", "Position"]
-
-# Define section fields
-SECTION_FIELDS = {
-    "Vessel Data": ["Vessel Name", "Vessel IMO"],
-    "Voyage Data": ["Local Date", "Local Time", "UTC Offset", "Voyage ID", "Segment ID", "From Port", "To Port"],
-    "Event Data": ["Event Type", "Time Elapsed (hours)", "Sailing Time (hours)", "Anchor Time (hours)", "DP Time (hours)", "Ice Time (hours)", "Maneuvering (hours)", "Loading/Unloading (hours)", "Drifting (hours)"],
-    "Position": ["Latitude Degrees", "Latitude Minutes", "Latitude Direction", "Longitude Degrees", "Longitude Minutes", "Longitude Direction"],
-    "Cargo": ["Cargo Weight (mt)"],
-    "Fuel Consumption": {
-        "Main Engine": ["ME LFO (mt)", "ME MGO (mt)", "ME LNG (mt)", "ME Other (mt)", "ME Other Fuel Type"],
-        "Auxiliary Engines": ["AE LFO (mt)", "AE MGO (mt)", "AE LNG (mt)", "AE Other (mt)", "AE Other Fuel Type"],
-        "Boilers": ["Boiler LFO (mt)", "Boiler MGO (mt)", "Boiler LNG (mt)", "Boiler Other (mt)", "Boiler Other Fuel Type"]
-    },
-    "ROB": ["LFO ROB (mt)", "MGO ROB (mt)", "LNG ROB (mt)", "Other ROB (mt)", "Other Fuel Type ROB", "Total Fuel ROB (mt)"],
-    "Fuel Allocation": {
-        "Cargo Heating": ["Cargo Heating LFO (mt)", "Cargo Heating MGO (mt)", "Cargo Heating LNG (mt)", "Cargo Heating Other (mt)", "Cargo Heating Other Fuel Type"],
-        "Dynamic Positioning (DP)": ["DP LFO (mt)", "DP MGO (mt)", "DP LNG (mt)", "DP Other (mt)", "DP Other Fuel Type"]
-    },
-    "Machinery": {
-        "Main Engine": ["ME Load (kW)", "ME Load Percentage (%)", "ME Speed (RPM)", "ME Propeller Pitch (m)", "ME Propeller Pitch Ratio", "ME Shaft Generator Power (kW)", "ME Charge Air Inlet Temp (°C)", "ME Scav. Air Pressure (bar)", "ME SFOC (g/kWh)", "ME SFOC ISO Corrected (g/kWh)"],
-        "Auxiliary Engines": {
-            "Auxiliary Engine 1": ["AE1 Load (kW)", "AE1 Charge Air Inlet Temp (°C)", "AE1 Charge Air Pressure (bar)", "AE1 SFOC (g/kWh)", "AE1 SFOC ISO Corrected (g/kWh)"],
-            "Auxiliary Engine 2": ["AE2 Load (kW)", "AE2 Charge Air Inlet Temp (°C)", "AE2 Charge Air Pressure (bar)", "AE2 SFOC (g/kWh)", "AE2 SFOC ISO Corrected (g/kWh)"],
-            "Auxiliary Engine 3": ["AE3 Load (kW)", "AE3 Charge Air Inlet Temp (°C)", "AE3 Charge Air Pressure (bar)", "AE3 SFOC (g/kWh)", "AE3 SFOC ISO Corrected (g/kWh)"]
-        }
-    },
-    "Weather": {
-        "Wind": ["Wind Direction (degrees)", "Wind Speed (knots)", "Wind Force (Beaufort)"],
-        "Sea State": ["Sea State Direction (degrees)", "Sea State Force (Douglas scale)", "Sea State Period (seconds)"],
-        "Swell": ["Swell Direction (degrees)", "Swell Height (meters)", "Swell Period (seconds)"],
-        "Current": ["Current Direction (degrees)", "Current Speed (knots)"],
-        "Temperature": ["Air Temperature (°C)", "Sea Temperature (°C)"]
-    },
-    "Draft": {
-        "Actual": ["Actual Forward Draft (m)", "Actual Aft Draft (m)", "Displacement (mt)", "Water Depth (m)"]
-    }
+# Stream assistant replies token by token instead of waiting for the full completion
+STREAM_AI_RESPONSES = True
+STREAM_POLL_INTERVAL = 0.3  # seconds between refreshes of a streaming reply
+
+# Chat requests that are answered locally from the report sequence rules
+# Whole intents only ("which report next", "create a noon report"), so questions that merely contain
+# a word like "next" or "open" still go to the LLM
+NEXT_REPORT_PATTERN = re.compile(
+    r"\b(?:which|what)\s+reports?\b.*\b(?:next|now|follows?|following|submit|send|file)\b"
+    r"|\bnext\s+reports?\b|\bsuggest\w*\s+(?:an?\s+|the\s+)?(?:next\s+)?reports?\b",
+    re.IGNORECASE,
+)
+CREATE_REPORT_PATTERNS = {
+    report_type: re.compile(
+        rf"\b(?:create|start|file|submit|open|make|prepare|send)\s+(?:(?:a|an|the|new|my)\s+)*{re.escape(report_type)}",
+        re.IGNORECASE,
+    )
+    for report_type in REPORT_TYPES
 }
 
-# Define validation rules
-VALIDATION_RULES = {
-    "ME LFO (mt)": {"min": 0, "max": 25},
-    "ME MGO (mt)": {"min": 0, "max": 25},
-    "ME LNG (mt)": {"min": 0, "max": 25},
-    "ME Other (mt)": {"min": 0, "max": 25},
-    "AE LFO (mt)": {"min": 0, "max": 3},
-    "AE MGO (mt)": {"min": 0, "max": 3},
-    "AE LNG (mt)": {"min": 0, "max": 3},
-    "AE Other (mt)": {"min": 0, "max": 3},
-    "Boiler LFO (mt)": {"min": 0, "max": 4},
-    "Boiler MGO (mt)": {"min": 0, "max": 4},
-    "Boiler LNG (mt)": {"min": 0, "max": 4},
-    "Boiler Other (mt)": {"min": 0, "max": 4},
-}
+# Cache for AI replies, keyed on the normalized prompt and the report history
+AI_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ai_responses.json")
+AI_CACHE_MAX_ENTRIES = 512
+AI_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Prefill sources for report drafts besides the vessel profiles: an optional AIS position file
+# (CSV with imo,timestamp,lat,lon columns)
+AIS_POSITIONS_PATH = os.getenv("AIS_POSITIONS_PATH")
 
 # Prepare the training data as a string
 TRAINING_DATA = f"""
@@ -186,7 +147,7 @@ Provide concise and helpful guidance throughout the report creation process. If
 Remember to provide appropriate reminders and follow-up suggestions based on the current report context and the logical sequence of maritime operations.
 """
 
-def get_ai_response(user_input, last_reports):
+def build_ai_messages(user_input, last_reports):
     current_time = datetime.now(pytz.utc).strftime("%H:%M:%S")
     
     context = f"""
@@ -198,227 +159,233 @@ def get_ai_response(user_input, last_reports):
     Use your knowledge as an experienced seafarer to ensure the suggested reports follow a realistic sequence of events.
     """
     
-    messages = [
+    return [
         {"role": "system", "content": TRAINING_DATA},
         {"role": "system", "content": context},
         {"role": "user", "content": user_input}
     ]
 
-    try:
+@st.cache_resource
+def get_response_cache():
+    """Process-wide AI response cache shared by all sessions."""
+    return ResponseCache(AI_CACHE_PATH, max_entries=AI_CACHE_MAX_ENTRIES, ttl_seconds=AI_CACHE_TTL_SECONDS)
+
+def format_ai_error(e):
+    return f"I'm sorry, but I encountered an error while processing your request: {str(e)}. Please try again later."
+
+def get_ai_response(user_input, last_reports):
+    def complete():
         response = openai.ChatCompletion.create(
             model="gpt-3.5-turbo",
-            messages=messages,
+            messages=build_ai_messages(user_input, last_reports),
             max_tokens=300,
             n=1,
             stop=None,
             temperature=1.0,
         )
         return response.choices[0].message['content'].strip()
-    except Exception as e:
-        return f"I'm sorry, but I encountered an error while processing your request: {str(e)}. Please try again later."
-
-def generate_random_position():
-    lat_deg = random.randint(0, 89)
-    lat_min = round(random.uniform(0, 59.99), 2)
-    lat_dir = random.choice(['N', 'S'])
-    lon_deg = random.randint(0, 179)
-    lon_min = round(random.uniform(0, 59.99), 2)
-    lon_dir = random.choice(['E', 'W'])
-    return lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir
-
-def generate_random_consumption():
-    me_lfo = round(random.uniform(20, 25), 1)
-    ae_lfo = round(random.uniform(2, 3), 1)
-    return me_lfo, ae_lfo
-
-
-def generate_random_vessel_name():
-    return f"{random.choice(VESSEL_PREFIXES)} {random.choice(VESSEL_NAMES)}"
 
-def generate_random_imo():
-    return ''.join(random.choices(string.digits, k=7))
+    try:
+        return get_response_cache().get_or_compute(make_cache_key(user_input, last_reports), complete)
+    except Exception as e:
+        return format_ai_error(e)
+
+def stream_ai_response(user_input, last_reports):
+    """Yields the assistant reply in chunks as they arrive from the API."""
+    response = openai.ChatCompletion.create(
+        model="gpt-3.5-turbo",
+        messages=build_ai_messages(user_input, last_reports),
+        max_tokens=300,
+        n=1,
+        stop=None,
+        temperature=1.0,
+        stream=True,
+    )
+    for chunk in response:
+        content = chunk["choices"][0]["delta"].get("content")
+        if content:
+            yield content
+
+def start_ai_response(user_input, last_reports):
+    """Starts streaming a reply on a background thread and returns its buffer.
+
+    The buffer is a plain dict so the worker thread never touches Streamlit APIs;
+    the chat panel polls it while the rest of the page stays interactive.
+    Cached replies are returned in one chunk, and identical prompts already in
+    flight from another session wait for that request instead of starting a new one.
+    """
+    pending = {"chunks": [], "done": False}
+    cache = get_response_cache()
+    cache_key = make_cache_key(user_input, last_reports)
+
+    def generate():
+        for content in stream_ai_response(user_input, last_reports):
+            pending["chunks"].append(content)
+        return "".join(pending["chunks"]).strip()
+
+    def worker():
+        try:
+            pending["chunks"] = [cache.get_or_compute(cache_key, generate)]
+        except Exception as e:
+            pending["chunks"] = [format_ai_error(e)]
+        finally:
+            pending["done"] = True
+
+    threading.Thread(target=worker, daemon=True).start()
+    return pending
+
+def get_last_submitted_report(vessel, report_type=None):
+    """The vessel's latest stored report, of any type, so a new session carries on from it."""
+    return get_report_store().last_report(vessel)
+
+@st.cache_resource
+def get_prefill_provider():
+    # The clock comes after the last report, so its date and time are never carried over
+    sources = [random_source, vessel_profile_source(VESSEL_PROFILES), last_report_source(get_last_submitted_report), clock_source]
+    if AIS_POSITIONS_PATH:
+        sources.append(ais_file_source(AIS_POSITIONS_PATH))
+    return PrefillProvider(sources)
+
+WIDGETS = {
+    "text": st.text_input,
+    "number": st.number_input,
+    "select": st.selectbox,
+    "date": st.date_input,
+    "time": st.time_input,
+}
 
-def create_fields(fields, prefix, report_type):
+def create_fields(group, prefill, violations, computed, temperature_only):
     cols = st.columns(4)  # Create 4 columns
-    me_total_consumption = 0
-    ae_total_consumption = 0
-    me_fields_processed = False
-    ae_fields_processed = False
-    boiler_message_shown = False
-    position_fields_processed = 0
-    
-    if "consumption" not in st.session_state:
-        st.session_state.consumption = generate_random_consumption()
-    me_lfo, ae_lfo = st.session_state.consumption
-    
-    # Generate random position
-    lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir = generate_random_position()
-    
-    # Get current date, time, and UTC offset
-    now = datetime.now()
-    current_date = now.strftime("%Y-%m-%d")
-    current_time = now.strftime("%H:%M")
-    utc_offset = datetime.now(pytz.timezone('UTC')).astimezone().strftime('%z')
-    
-    # Generate random voyage and vessel data
-    from_port = random.choice(PORTS)
-    to_port = random.choice([p for p in PORTS if p != from_port])
-    voyage_type = random.choice(['L', 'B'])
-    voyage_id = f"{random.randint(10, 99)}{voyage_type}"
-    segment_id = str(random.randint(1, 5))
-    vessel_name = generate_random_vessel_name()
-    imo_number = generate_random_imo()
+    # Show each rule's message once, after the last of its violating fields in this group
+    message_after = {}
+    for spec in group.fields:
+        for violation in violations.get(spec.label, []):
+            message_after[violation.rule] = (spec.label, violation)
     
-    for i, field in enumerate(fields):
+    for i, spec in enumerate(group.fields):
         with cols[i % 4]:  # This will cycle through the columns
-            field_key = f"{prefix}_{field.lower().replace(' ', '_')}"
-            
-            if field == "Vessel Name":
-                value = st.text_input(field, value=vessel_name, key=field_key)
-            elif field == "Vessel IMO":
-                value = st.text_input(field, value=imo_number, key=field_key)
-            elif field == "Local Date":
-                value = st.date_input(field, value=datetime.strptime(current_date, "%Y-%m-%d"), key=field_key)
-            elif field == "Local Time":
-                value = st.time_input(field, value=datetime.strptime(current_time, "%H:%M").time(), key=field_key)
-            elif field == "UTC Offset":
-                value = st.text_input(field, value=utc_offset, key=field_key)
-            elif field == "From Port":
-                value = st.selectbox(field, options=PORTS, index=PORTS.index(from_port), key=field_key)
-            elif field == "To Port":
-                value = st.selectbox(field, options=PORTS, index=PORTS.index(to_port), key=field_key)
-            elif field == "Voyage ID":
-                value = st.text_input(field, value=voyage_id, key=field_key)
-            elif field == "Segment ID":
-                value = st.text_input(field, value=segment_id, key=field_key)
-            elif field == "Event Type":
-                value = st.text_input(field, value=report_type, key=field_key)
-            elif field == "Latitude Degrees":
-                value = st.number_input(field, value=lat_deg, min_value=0, max_value=89, key=field_key)
-                position_fields_processed += 1
-            elif field == "Latitude Minutes":
-                value = st.number_input(field, value=lat_min, min_value=0.0, max_value=59.99, format="%.2f", key=field_key)
-                position_fields_processed += 1
-            elif field == "Latitude Direction":
-                value = st.selectbox(field, options=["N", "S"], index=["N", "S"].index(lat_dir), key=field_key)
-                position_fields_processed += 1
-            elif field == "Longitude Degrees":
-                value = st.number_input(field, value=lon_deg, min_value=0, max_value=179, key=field_key)
-                position_fields_processed += 1
-            elif field == "Longitude Minutes":
-                value = st.number_input(field, value=lon_min, min_value=0.0, max_value=59.99, format="%.2f", key=field_key)
-                position_fields_processed += 1
-            elif field == "Longitude Direction":
-                value = st.selectbox(field, options=["E", "W"], index=["E", "W"].index(lon_dir), key=field_key)
-                position_fields_processed += 1
-                
-                # Display AIS position message after all position fields have been processed
-                if position_fields_processed == 6:
-                    st.markdown('<p class="info-message">Current AIS position</p>', unsafe_allow_html=True)
-            
-            elif field in ["ME LFO (mt)", "ME MGO (mt)", "ME LNG (mt)", "ME Other (mt)"]:
-                if field == "ME LFO (mt)":
-                    value = st.number_input(field, value=me_lfo, min_value=0.0, max_value=25.0, step=0.1, key=field_key)
+            params = spec.params
+            if spec.default is not None:
+                default = prefill[spec.default]
+                if spec.kind == "select":
+                    # A profile or stored value that is no longer an option leaves the widget's own default
+                    if default in params["options"]:
+                        params = {**params, "index": params["options"].index(default)}
                 else:
-                    value = st.number_input(field, min_value=0.0, max_value=25.0, step=0.1, key=field_key)
-                
-                me_total_consumption += value
-                
-                if field == "ME Other (mt)" and not me_fields_processed:
-                    if me_total_consumption > 25:
-                        st.markdown('<p class="info-message">Total ME consumption exceeds expected consumption of 25.</p>', unsafe_allow_html=True)
-                    st.markdown('<p class="info-message">MFM figures since last report</p>', unsafe_allow_html=True)
-                    me_fields_processed = True
-            elif field in ["AE LFO (mt)", "AE MGO (mt)", "AE LNG (mt)", "AE Other (mt)"]:
-                if field == "AE LFO (mt)":
-                    value = st.number_input(field, value=ae_lfo, min_value=0.0, max_value=3.0, step=0.1, key=field_key)
-                else:
-                    value = st.number_input(field, min_value=0.0, max_value=3.0, step=0.1, key=field_key)
-                
-                ae_total_consumption += value
-                
-                if field == "AE Other (mt)" and not ae_fields_processed:
-                    if ae_total_consumption > 3:
-                        st.markdown('<p class="info-message">Total AE consumption exceeds expected consumption of 3.</p>', unsafe_allow_html=True)
-                    st.markdown('<p class="info-message">MFM figures since last report</p>', unsafe_allow_html=True)
-                    ae_fields_processed = True
-            elif field.startswith("Boiler"):
-                value = st.number_input(field, min_value=0.0, max_value=4.0, step=0.1, key=field_key)
-                
-                # Display Boiler consumption message if ME total consumption > 15
-                if me_total_consumption > 15 and not boiler_message_shown:
-                    st.markdown('<p class="info-message">Since Main Engine is running at more than 50% load, Boiler consumption is expected to be zero.</p>', unsafe_allow_html=True)
-                    boiler_message_shown = True
-            elif field in VALIDATION_RULES:
-                min_val, max_val = VALIDATION_RULES[field]["min"], VALIDATION_RULES[field]["max"]
-                value = st.number_input(field, min_value=min_val, max_value=max_val, key=field_key)
-                
-                # Only show the warning if the value exceeds the maximum
-                if value > max_val:
-                    st.markdown(f'<p class="small-warning">Value must be less than or equal to {max_val}</p>', unsafe_allow_html=True)
-            elif any(unit in field for unit in ["(%)", "(mt)", "(kW)", "(°C)", "(bar)", "(g/kWh)", "(knots)", "(meters)", "(seconds)", "(degrees)"]):
-                value = st.number_input(field, key=field_key)
-            elif "Direction" in field and "degrees" not in field:
-                value = st.selectbox(field, options=["N", "NE", "E", "SE", "S", "SW", "W", "NW"], key=field_key)
-            else:
-                value = st.text_input(field, key=field_key)
+                    params = {**params, "value": default}
+            WIDGETS[spec.kind](spec.label, key=spec.key, **params)
+            
+            if spec.hint == "ais_position":
+                st.markdown('<p class="info-message">Current AIS position</p>', unsafe_allow_html=True)
+            elif spec.hint == "mfm_figures":
+                st.markdown('<p class="info-message">MFM figures since last report</p>', unsafe_allow_html=True)
+            elif spec.hint == "computed_sfoc" and pd.notna(computed.get(spec.label)):
+                st.markdown(f'<p class="info-message">Computed: {computed[spec.label]:.1f} g/kWh</p>', unsafe_allow_html=True)
+                if spec.label in temperature_only:
+                    st.markdown('<p class="info-message">Corrected for temperature only: no shop test air pressure '
+                                'in the vessel profile</p>', unsafe_allow_html=True)
+            for label, violation in message_after.values():
+                if label == spec.label:
+                    css_class = "small-warning" if violation.severity == "error" else "info-message"
+                    st.markdown(f'<p class="{css_class}">{violation.message}</p>', unsafe_allow_html=True)
+
+
+def create_section(report_type, section, groups, prefill):
+    st.subheader(section)
+    checks = check_report(report_type)
+    for group in groups:
+        if group.subsection:
+            st.subheader(group.subsection)
+        create_fields(group, prefill, checks["violations"], checks["computed"], checks["temperature_only"])
+
+def collect_report_values(report_type):
+    """Entered values of a report form, keyed by field label."""
+    return {
+        spec.label: st.session_state.get(spec.key)
+        for _, groups in compile_report(report_type)
+        for group in groups
+        for spec in group.fields
+    }
 
-    # Check if we need to display the Boiler message after all fields have been processed
-    if me_total_consumption > 15 and not boiler_message_shown:
-        st.markdown('<p class="info-message">Since Main Engine is running at more than 50% load, Boiler consumption is expected to be zero.</p>', unsafe_allow_html=True)
+def check_report(report_type):
+    """Rule violations by field and computed SFOC of a report form.
 
+    Computed once per set of entered values and kept in session state, so the
+    sections of one run share the result; a section fragment that reruns on
+    its own (with the arguments of the last full run) still sees its edits.
+    """
+    values = collect_report_values(report_type)
+    pressures = vessel_pressures(current_vessel())
+    checks = st.session_state.get("report_checks")
+    if (checks is None or checks["report_type"] != report_type or checks["values"] != values
+            or checks["pressures"] != pressures):
+        checks = {
+            "report_type": report_type,
+            "values": values,
+            "pressures": pressures,
+            "violations": violations_by_field(evaluate_report(values)),
+            "computed": compute_sfoc(pd.DataFrame([values]), pressures).iloc[0],
+            "temperature_only": {
+                engine.iso_sfoc_field for engine in ENGINES if engine.name in temperature_only_engines(pressures)
+            },
+        }
+        st.session_state.report_checks = checks
+    return checks
 
 def create_form(report_type):
     st.header(f"New {report_type}")
     
-    report_structure = REPORT_STRUCTURES.get(report_type, [])
+    report_sections = compile_report(report_type)
     
-    if not report_structure:
+    if not report_sections:
         st.error(f"No structure defined for report type: {report_type}")
         return False
     
-    for section in report_structure:
-        with st.expander(section, expanded=False):
-            st.subheader(section)
-            fields = SECTION_FIELDS.get(section, {})
-            
-            if isinstance(fields, dict):
-                for subsection, subfields in fields.items():
-                    st.subheader(subsection)
-                    create_fields(subfields, f"{report_type}_{section}_{subsection}", report_type)
-            elif isinstance(fields, list):
-                create_fields(fields, f"{report_type}_{section}", report_type)
-            else:
-                st.error(f"Unexpected field type for section {section}: {type(fields)}")
-
-    if st.button("Submit Report"):
-        if validate_report(report_type):
-            st.success(f"{report_type} submitted successfully!")
-            return True
-        else:
-            st.error("Please correct the errors in the report before submitting.")
-    return False
+    vessel = current_vessel()
+    prefill = get_draft_prefill(st.session_state, get_prefill_provider(), report_type, vessel)
+    check_report(report_type)  # once for every section of this run
+    for section, groups in report_sections:
+        display_report_section(report_type, section, create_section, report_type, section, groups, prefill)
+
+    st.button("Submit Report", on_click=submit_report, args=(report_type, vessel))
+    outcome = st.session_state.pop("submit_outcome", None)
+    if outcome is None:
+        return False
+    for warning in outcome["warnings"]:
+        st.warning(warning)
+    if outcome["submitted"]:
+        st.success(outcome["message"])
+    else:
+        st.error(outcome["message"])
+    return outcome["submitted"]
+
+def submit_report(report_type, vessel):
+    """Submit button callback; it runs before the form is built, so a filed report's fields can be cleared."""
+    warnings = []
+    if vessel is None:
+        submitted, message = False, "Enter the vessel's IMO number in the sidebar before submitting."
+    else:
+        warnings = validate_report(report_type)
+        submitted = not warnings
+        message = f"{report_type} submitted successfully!" if submitted else "Please correct the errors in the report before submitting."
+    if submitted:
+        values = collect_report_values(report_type)
+        get_report_store().save_report(report_type, vessel, values)
+        # Start the next draft from a fresh prefill, which now includes this report
+        discard_draft_prefill(st.session_state)
+        for _, groups in compile_report(report_type):
+            for group in groups:
+                for spec in group.fields:
+                    st.session_state.pop(spec.key, None)
+    st.session_state.submit_outcome = {"submitted": submitted, "message": message, "warnings": warnings}
     
 def validate_report(report_type):
-    # Validation logic here
-    # For example, checking if all required fields are filled and if the data is consistent (e.g., ROB calculations)
-    # Placeholder for ROB validation
-    fuel_types = ["LFO", "MGO", "LNG", "Other"]
-    total_rob = 0
-    for fuel in fuel_types:
-        rob_key = f"{report_type}_ROB_{fuel.lower()}_rob_(mt)"
-        if rob_key in st.session_state:
-            total_rob += st.session_state[rob_key]
-    
-    calculated_total = total_rob
-    reported_total_key = f"{report_type}_ROB_total_fuel_rob_(mt)"
-    if reported_total_key in st.session_state:
-        reported_total = st.session_state[reported_total_key]
-        if abs(calculated_total - reported_total) > 0.1:  # Allow for small rounding differences
-            st.warning(f"Total Fuel ROB ({reported_total}) doesn't match the sum of individual fuel ROBs ({calculated_total})")
-            return False
-    
-    return True  # If all validations pass
+    """Messages of the form's error-level rule violations; empty when it can be submitted."""
+    return [
+        f"{violation.field} ({violation.value:g}): {violation.message}"
+        for violation in evaluate_report(collect_report_values(report_type))
+        if violation.severity == "error"
+    ]
 
 def create_collapsible_history_panel():
     with st.expander("Report History (for testing)", expanded=False):
@@ -446,6 +413,78 @@ def create_collapsible_history_panel():
 
         st.markdown('</div>', unsafe_allow_html=True)
 
+        # Computed once per stored report and shared by every session
+        vessel = current_vessel()
+        sfoc = stored_sfoc(vessel) if vessel else None
+        if sfoc is not None and len(sfoc):
+            st.markdown("<h3>Stored SFOC (g/kWh)</h3>", unsafe_allow_html=True)
+            st.dataframe(sfoc[SFOC_FIELDS].tail(4).round(1), use_container_width=True)
+            temperature_only = temperature_only_engines(vessel_pressures(vessel))
+            if temperature_only:
+                st.caption(f"ISO correction of {', '.join(temperature_only)} is for temperature only: "
+                           "no shop test air pressure in the vessel profile.")
+
+        stats = get_response_cache().stats()
+        st.caption(
+            f"AI response cache: {stats['entries']}/{stats['max_entries']} entries, "
+            f"{stats['hits']} hits, {stats['misses']} misses, {stats['coalesced']} coalesced "
+            f"({stats['hit_rate']:.0%} hit rate)"
+        )
+
+def find_report_type(user_input):
+    text = user_input.lower()
+    matches = [report_type for report_type in REPORT_TYPES if report_type.lower() in text]
+    return max(matches, key=len) if matches else None
+
+def get_local_response(user_input, last_reports):
+    """Answers next-report and create-report requests from the sequence rules.
+
+    Returns None for free-form questions, which still go to the LLM.
+    """
+    report_type = find_report_type(user_input)
+    if report_type and CREATE_REPORT_PATTERNS[report_type].search(user_input):
+        if is_valid_report_sequence(last_reports, report_type):
+            return f"Agreed. The form for {report_type} will now appear on the left side of the page."
+        return f"{report_type} cannot follow the previous reports. Valid next reports: {', '.join(valid_next_reports(last_reports))}."
+
+    if report_type is None and NEXT_REPORT_PATTERN.search(user_input):
+        if not last_reports:
+            return "There is no report history, so you can start with any report."
+        response = f"Valid next reports: {', '.join(valid_next_reports(last_reports))}."
+        pending_reports = open_reports(last_reports)
+        if pending_reports:
+            response += f" Still open: {', '.join(pending_reports)}."
+        return response
+
+    return None
+
+def handle_ai_response(response, last_reports):
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    
+    # Check if a specific report type is agreed upon (longest names first, so "Arrival STS" is not read as "Arrival")
+    for report_type in sorted(REPORT_TYPES, key=len, reverse=True):
+        if f"Agreed. The form for {report_type}" in response:
+            if is_valid_report_sequence(last_reports, report_type):
+                st.session_state.current_report_type = report_type
+                st.session_state.show_form = True
+                break
+            else:
+                st.warning(f"Invalid report sequence. {report_type} cannot follow the previous reports.")
+
+@st.fragment(run_every=STREAM_POLL_INTERVAL)
+def display_pending_response(last_reports):
+    pending = st.session_state.get("pending_response")
+    if pending is None:
+        return
+
+    with st.chat_message("assistant"):
+        st.markdown("".join(pending["chunks"]) or "...")
+
+    if pending["done"]:
+        st.session_state.pending_response = None
+        handle_ai_response("".join(pending["chunks"]).strip(), last_reports)
+        st.rerun()
+
 def create_chatbot(last_reports):
     st.header("AI Assistant")
     
@@ -456,55 +495,27 @@ def create_chatbot(last_reports):
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+    if st.session_state.get("pending_response") is not None:
+        display_pending_response(last_reports)
+
     if prompt := st.chat_input("How can I assist you with your maritime reporting?"):
         st.session_state.messages.append({"role": "user", "content": prompt})
-        response = get_ai_response(prompt, last_reports)
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        
-        # Check if a specific report type is agreed upon
-        for report_type in REPORT_TYPES:
-            if f"Agreed. The form for {report_type}" in response:
-                if is_valid_report_sequence(last_reports, report_type):
-                    st.session_state.current_report_type = report_type
-                    st.session_state.show_form = True
-                    break
-                else:
-                    st.warning(f"Invalid report sequence. {report_type} cannot follow the previous reports.")
+        local_response = get_local_response(prompt, last_reports)
+        if local_response is not None:
+            handle_ai_response(local_response, last_reports)
+        elif STREAM_AI_RESPONSES:
+            st.session_state.pending_response = start_ai_response(prompt, last_reports)
+        else:
+            handle_ai_response(get_ai_response(prompt, last_reports), last_reports)
         
-        st.experimental_rerun()
+        st.rerun()
 
 def is_valid_report_sequence(last_reports, new_report):
-    if not last_reports:
-        return True
-    
-    last_report = last_reports[-1]
-    
-    # Define rules for report sequences
-    sequence_rules = {
-        "Arrival STS": ["Departure STS"],
-        "Begin of offhire": ["End of offhire"],
-        "Begin fuel change over": ["End fuel change over"],
-        "Begin canal passage": ["End canal passage"],
-        "Begin Anchoring/Drifting": ["End Anchoring/Drifting"],
-        "Begin of deviation": ["End of deviation"],
-        "Departure": ["Begin of sea passage", "Noon (Position) - Sea passage"],
-        "Departure STS": ["Begin of sea passage", "Noon (Position) - Sea passage"],
-        "End Anchoring/Drifting": ["Begin of sea passage", "Noon (Position) - Sea passage"],
-    }
-    
-    # Check if the new report is valid based on the last report
-    if last_report in sequence_rules:
-        return new_report in sequence_rules[last_report] or new_report.startswith("Noon")
-    
-    # Allow "Noon" reports after most report types
-    if new_report.startswith("Noon"):
-        return True
-    
-    # For reports not explicitly defined in rules, allow them if they're not breaking any sequence
-    return new_report not in [item for sublist in sequence_rules.values() for item in sublist]
+    return is_valid_next(last_reports, new_report)
 
 def main():
     st.title("OptiLog - AI-Enhanced Maritime Reporting System")
+    select_vessel()
     
     if "report_history" not in st.session_state:
         st.session_state.report_history = []
@@ -528,7 +539,8 @@ def main():
             st.session_state.messages = []
             st.session_state.current_report_type = None
             st.session_state.report_history = []
-            st.experimental_rerun()
+            st.session_state.pending_response = None
+            st.rerun()
         
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+# Consumption measurement methods
+METHOD_FLOWMETER = 0
+METHOD_SOUNDING = 1
+METHOD_BDN = 2
+METHOD_CTMS = 3
+
+METHOD_NAMES = {
+    METHOD_FLOWMETER: "Flowmeter",
+    METHOD_SOUNDING: "Tank sounding",
+    METHOD_BDN: "BDN",
+    METHOD_CTMS: "CTMS",
+}
+TANK_METHODS = (METHOD_SOUNDING, METHOD_BDN)  # reported per tank, attributed to fuels by the tank's fuel type
+
+REL_TOLERANCE = 0.05  # 5 % of the reference figure
+ABS_TOLERANCE = 0.1  # mT; smaller differences are never a breach
+
+
+def reconcile(values, rel_tolerance=REL_TOLERANCE, abs_tolerance=ABS_TOLERANCE):
+    """Discrepancy of every method against the median of all methods, over arrays of shape (..., methods, consumers, fuels).
+
+    NaN means a method did not report a figure. Returns (reference, difference,
+    breach): the reference has the method axis removed, and a breach is a
+    difference beyond max(abs_tolerance, rel_tolerance x |reference|) where
+    at least two methods reported.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    reported = ~np.isnan(values)
+    count = reported.sum(axis=-3)
+    compared = count >= 2
+    # Median over the few methods from a sort (NaN sorts last); much faster than nanmedian on large batches
+    ordered = np.sort(values, axis=-3)
+    low = np.take_along_axis(ordered, np.maximum(count - 1, 0)[..., None, :, :] // 2, axis=-3)[..., 0, :, :]
+    high = np.take_along_axis(ordered, (count // 2)[..., None, :, :], axis=-3)[..., 0, :, :]
+    with np.errstate(all="ignore"):
+        reference = np.where(compared, (low + high) / 2, np.nan)
+        difference = values - reference[..., None, :, :]
+        limit = np.maximum(abs_tolerance, rel_tolerance * np.abs(reference))[..., None, :, :]
+        breach = reported & compared[..., None, :, :] & (np.abs(difference) > limit)
+    return reference, difference, breach
+
+
+def reconcile_records(records, key_cols=("report", "consumer", "fuel"), method_col="method", value_col="value",
+                      rel_tolerance=REL_TOLERANCE, abs_tolerance=ABS_TOLERANCE):
+    """reconcile() for a long table of figures, e.g. a fleet's report history; one grouped pass.
+
+    records has one row per (report, consumer, fuel, method) figure. Adds
+    reference, difference and breach columns.
+    """
+    keys = list(key_cols)
+    values = pd.to_numeric(records[value_col], errors="coerce")
+    grouped = values.groupby([records[key] for key in keys])
+    reference = grouped.transform("median").where(grouped.transform("count") >= 2)
+    difference = values - reference
+    limit = np.maximum(abs_tolerance, rel_tolerance * reference.abs())
+    return records.assign(reference=reference, difference=difference, breach=difference.abs() > limit)
+
+
+class ConsumptionModel:
+    """One store of every method's consumption figures, by method, consumer and fuel (mT).
+
+    Flowmeter and CTMS figures are held per fuel. Tank sounding and BDN
+    figures are held per tank and attributed to fuels through the tanks'
+    fuel types, so changing a tank's fuel moves its figures with it. The
+    views read and write this model, and reconcile() compares the methods
+    for every consumer and fuel at once.
+    """
+
+    def __init__(self, consumers, fuels, tanks, tank_fuels):
+        self.consumers = list(consumers)
+        self.fuels = list(fuels)
+        self.tanks = list(tanks)
+        self.consumer_index = {consumer: i for i, consumer in enumerate(self.consumers)}
+        self.fuel_index = {fuel: i for i, fuel in enumerate(self.fuels)}
+        self.tank_index = {tank: i for i, tank in enumerate(self.tanks)}
+        self.tank_fuel = np.array([self.fuel_index[tank_fuels[tank]] for tank in self.tanks])
+        self.fuel_values = np.full((len(METHOD_NAMES), len(self.consumers), len(self.fuels)), np.nan)
+        self.tank_values = np.full((len(METHOD_NAMES), len(self.consumers), len(self.tanks)), np.nan)
+        self.version = 0
+        self._values = None  # (version, methods x consumers x fuels)
+
+    def set_tank_fuel(self, tank, fuel):
+        self.tank_fuel[self.tank_index[tank]] = self.fuel_index[fuel]
+        self.version += 1
+
+    def set_value(self, method, consumer, column, value):
+        """One figure; column is a tank for the tank methods and a fuel otherwise."""
+        if method in TANK_METHODS:
+            self.tank_values[method, self.consumer_index[consumer], self.tank_index[column]] = value
+        else:
+            self.fuel_values[method, self.consumer_index[consumer], self.fuel_index[column]] = value
+        self.version += 1
+
+    def set_frame(self, method, frame):
+        """A method's figures from a consumers x tanks (or fuels) frame; missing cells are left alone."""
+        columns = self.tanks if method in TANK_METHODS else self.fuels
+        target = self.tank_values if method in TANK_METHODS else self.fuel_values
+        aligned = frame.reindex(index=self.consumers, columns=columns).apply(pd.to_numeric, errors="coerce")
+        present = aligned.notna().to_numpy()
+        target[method][present] = aligned.to_numpy(dtype=np.float64)[present]
+        self.version += 1
+
+    def set_consumer_totals(self, method, totals, fuels):
+        """One fuel per consumer (e.g. flowmeters): the total goes to that fuel and the consumer's other fuels are zero."""
+        rows = np.array([self.consumer_index[consumer] for consumer in totals.index])
+        columns = np.array([self.fuel_index[fuel] for fuel in fuels])
+        self.fuel_values[method, rows] = 0.0
+        self.fuel_values[method, rows, columns] = pd.to_numeric(totals, errors="coerce").to_numpy(dtype=np.float64)
+        self.version += 1
+
+    def set_fuel_total(self, method, fuel, total):
+        """A ship-wide figure of one fuel (e.g. from CTMS gauges), split across the consumers.
+
+        The split follows the median of the other methods' figures of that
+        fuel per consumer. Without other figures to split by, the consumers
+        are left unreported and False is returned.
+        """
+        column = self.fuel_index[fuel]
+        others = pd.DataFrame(np.delete(self.values()[:, :, column], method, axis=0))
+        weights = others.median().fillna(0.0).clip(lower=0.0).to_numpy()
+        split = np.isfinite(total) and weights.sum() > 0
+        self.fuel_values[method, :, column] = total * weights / weights.sum() if split else np.nan
+        self.version += 1
+        return split
+
+    def frame(self, method):
+        """A method's figures as stored: consumers x tanks for the tank methods, consumers x fuels otherwise."""
+        if method in TANK_METHODS:
+            return pd.DataFrame(self.tank_values[method], index=self.consumers, columns=self.tanks)
+        return pd.DataFrame(self.fuel_values[method], index=self.consumers, columns=self.fuels)
+
+    def values(self):
+        """Methods x consumers x fuels, with the tank methods summed into their tanks' fuels."""
+        if self._values is not None and self._values[0] == self.version:
+            return self._values[1]
+        values = self.fuel_values.copy()
+        tank_fuels = np.zeros((len(self.tanks), len(self.fuels)))
+        tank_fuels[np.arange(len(self.tanks)), self.tank_fuel] = 1.0
+        for method in TANK_METHODS:
+            tank_values = self.tank_values[method]
+            by_fuel = np.nan_to_num(tank_values) @ tank_fuels
+            reported = (~np.isnan(tank_values)).astype(np.float64) @ tank_fuels > 0
+            values[method] = np.where(reported, by_fuel, np.nan)
+        self._values = (self.version, values)
+        return values
+
+    def by_fuel(self, method):
+        return pd.DataFrame(self.values()[method], index=self.consumers, columns=self.fuels)
+
+    def reconcile(self, rel_tolerance=REL_TOLERANCE, abs_tolerance=ABS_TOLERANCE):
+        """Every compared figure as consumer, fuel, method, value, reference, difference and breach."""
+        values = self.values()
+        reference, difference, breach = reconcile(values, rel_tolerance, abs_tolerance)
+        method, consumer, fuel = np.nonzero(~np.isnan(difference))
+        return pd.DataFrame({
+            "Consumer": np.array(self.consumers, dtype=object)[consumer],
+            "Fuel": np.array(self.fuels, dtype=object)[fuel],
+            "Method": pd.Series(method).map(METHOD_NAMES).to_numpy(),
+            "Value (mT)": values[method, consumer, fuel],
+            "Reference (mT)": reference[consumer, fuel],
+            "Difference (mT)": difference[method, consumer, fuel],
+            "Breach": breach[method, consumer, fuel],
+        })
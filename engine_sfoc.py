@@ -0,0 +1,159 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+REFERENCE_LCV = 42.7  # MJ/kg, the ISO 3046 / ISO 15550 reference fuel
+FUEL_LCV = {"LFO": 41.0, "MGO": 42.7, "LNG": 48.0, "Other": REFERENCE_LCV}  # MJ/kg
+HOURS_FIELD = "Time Elapsed (hours)"
+
+
+class IsoReference(NamedTuple):
+    """ISO 3046-1 standard reference conditions and exponents of one engine.
+
+    The reference charge/scavenge air pressure is the engine's own (shop
+    test), so callers supply it per vessel; see reference_pressures().
+    """
+    air_temp_c: float = 25.0
+    a: float = 0.7  # pressure exponent (turbocharged with charge air cooling)
+    b: float = 1.2  # temperature exponent
+    mechanical_efficiency: float = 0.8
+
+
+class EngineSpec(NamedTuple):
+    name: str
+    fuel_fields: dict  # fuel -> consumption field (mt); engines listing the same fields share that fuel
+    load_field: str  # average load (kW) over the report interval
+    air_temp_field: str
+    pressure_field: str
+    sfoc_field: str
+    iso_sfoc_field: str
+    reference_pressure_field: str  # vessel profile entry of the shop test pressure (bar)
+    reference: IsoReference = IsoReference()
+
+
+def _engine(name, fuel_prefix, pressure_label):
+    return EngineSpec(
+        name,
+        {fuel: f"{fuel_prefix} {fuel} (mt)" for fuel in FUEL_LCV},
+        f"{name} Load (kW)",
+        f"{name} Charge Air Inlet Temp (°C)",
+        f"{name} {pressure_label} (bar)",
+        f"{name} SFOC (g/kWh)",
+        f"{name} SFOC ISO Corrected (g/kWh)",
+        f"{name} Shop Test {pressure_label} (bar)",
+    )
+
+
+ENGINES = (
+    _engine("ME", "ME", "Scav. Air Pressure"),
+    *(_engine(f"AE{i}", "AE", "Charge Air Pressure") for i in (1, 2, 3)),
+)
+SFOC_FIELDS = [field for engine in ENGINES for field in (engine.sfoc_field, engine.iso_sfoc_field)]
+
+
+def iso_correction_factor(air_temp_c, pressure_bar, reference_pressure_bar, reference=IsoReference()):
+    """ISO 3046-1 fuel consumption factor beta = k / alpha; SFOC at reference conditions is SFOC / beta.
+
+    k = (p_x / p_r)^a * (T_r / T_x)^b and alpha = k - 0.7 (1 - k) (1 / eta_m - 1).
+    Missing inputs leave their term out; a NaN reference pressure corrects for temperature only.
+    """
+    temp_x = np.asarray(air_temp_c, dtype=np.float64) + 273.15
+    k = np.where(np.isnan(temp_x), 1.0, ((reference.air_temp_c + 273.15) / temp_x) ** reference.b)
+    if reference_pressure_bar > 0:
+        pressure = np.asarray(pressure_bar, dtype=np.float64)
+        k = k * np.where(np.isnan(pressure) | (pressure <= 0), 1.0, (pressure / reference_pressure_bar) ** reference.a)
+    alpha = k - 0.7 * (1.0 - k) * (1.0 / reference.mechanical_efficiency - 1.0)
+    return k / alpha
+
+
+def reference_pressures(profile, engines=ENGINES):
+    """Shop test charge/scavenge air pressure (bar) of every engine from a vessel profile; NaN where it has none."""
+    pressures = {}
+    for engine in engines:
+        value = pd.to_numeric((profile or {}).get(engine.reference_pressure_field), errors="coerce")
+        pressures[engine.name] = float(value) if value is not None and value > 0 else np.nan
+    return pressures
+
+
+def temperature_only_engines(pressures):
+    """Engines whose ISO correction falls back to temperature only, for want of a reference pressure."""
+    return [name for name, pressure in pressures.items() if not pressure > 0]
+
+
+def input_fields(engines=ENGINES, hours_field=HOURS_FIELD):
+    fields = [hours_field]
+    for engine in engines:
+        fields += [*engine.fuel_fields.values(), engine.load_field, engine.air_temp_field, engine.pressure_field]
+    return list(dict.fromkeys(fields))
+
+
+def compute_sfoc(reports, pressures, engines=ENGINES, hours_field=HOURS_FIELD):
+    """SFOC and ISO corrected SFOC (g/kWh) of every engine for every report, vectorized over rows.
+
+    pressures are the engines' reference pressures from reference_pressures().
+
+    Fuel mass is converted to its reference-LCV equivalent, so mixed fuels
+    compare on energy. Engines reporting fuel together (the auxiliaries)
+    share it in proportion to their energy, which gives them the same SFOC
+    before their own ambient correction. Returns the SFOC_FIELDS columns,
+    NaN where an engine did no work.
+    """
+    def column(field):
+        if field not in reports:
+            return np.full(len(reports), np.nan)
+        return pd.to_numeric(reports[field], errors="coerce").to_numpy(dtype=np.float64)
+
+    hours = column(hours_field)
+    energy = {engine.name: np.nan_to_num(column(engine.load_field)) * hours for engine in engines}  # kWh
+    shared_energy = {}
+    for engine in engines:
+        group = tuple(engine.fuel_fields.values())
+        shared_energy[group] = shared_energy.get(group, 0.0) + energy[engine.name]
+
+    result = {}
+    for engine in engines:
+        group = tuple(engine.fuel_fields.values())
+        fuel_mass = sum(  # mt of reference-LCV fuel
+            np.nan_to_num(column(field)) * FUEL_LCV[fuel] / REFERENCE_LCV for fuel, field in engine.fuel_fields.items()
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sfoc = np.where(
+                (energy[engine.name] > 0) & (shared_energy[group] > 0), fuel_mass * 1e6 / shared_energy[group], np.nan
+            )
+        beta = iso_correction_factor(
+            column(engine.air_temp_field), column(engine.pressure_field), pressures[engine.name], engine.reference
+        )
+        result[engine.sfoc_field] = sfoc
+        result[engine.iso_sfoc_field] = sfoc / beta
+    return pd.DataFrame(result, index=reports.index)
+
+
+class SfocCache:
+    """compute_sfoc results per report id, recomputed only for new or changed reports.
+
+    Reports are keyed by their index; a hash of each row's input fields and
+    the reference pressures tells whether a cached result is still current.
+    Safe to share between sessions.
+    """
+
+    def __init__(self, engines=ENGINES, hours_field=HOURS_FIELD):
+        self.engines = engines
+        self.hours_field = hours_field
+        self.fields = input_fields(engines, hours_field)
+        self._hashes = pd.Series(dtype="uint64")
+        self._results = pd.DataFrame(columns=SFOC_FIELDS, dtype=np.float64)
+        self._lock = threading.Lock()
+
+    def get(self, reports, pressures):
+        inputs = reports.reindex(columns=self.fields).apply(pd.to_numeric, errors="coerce")
+        hashes = pd.util.hash_pandas_object(inputs.assign(**{f"reference {name}": p for name, p in pressures.items()}), index=False)
+        with self._lock:
+            stale = (self._hashes.reindex(hashes.index) != hashes).to_numpy()
+            if stale.any():
+                fresh = compute_sfoc(inputs[stale], pressures, self.engines, self.hours_field)
+                kept = ~self._results.index.isin(fresh.index)
+                self._results = pd.concat([self._results[kept], fresh]) if kept.any() else fresh
+                self._hashes = pd.concat([self._hashes[~self._hashes.index.isin(hashes.index[stale])], hashes[stale]])
+            return self._results.loc[reports.index]
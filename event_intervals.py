@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from report_positions import haversine_nm
+
+START_COLUMN = "Start Date Time"
+END_COLUMN = "End Date Time"
+EVENT_COLUMN = "Event"
+START_POSITION = ("Start Lat", "Start Long")
+END_POSITION = ("End Lat", "End Long")
+
+
+def _ranges(lo, hi):
+    """Concatenated np.arange(lo[i], hi[i]) with the i each value came from."""
+    counts = np.maximum(hi - lo, 0)
+    owner = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(lo, counts) + offsets
+
+
+class EventIntervals:
+    """Special events (off-hire, ECA transit, deviations, ...) indexed by their time intervals.
+
+    Events cover [start, end); events that only touch do not overlap. Rows
+    missing a time, or ending before they start (see invalid()), are left
+    out of the index. Everything is computed over whole arrays:
+    overlap detection and "which events cover time T" queries sort once and
+    then use binary searches, so they cost O(n log n) plus the size of the
+    answer.
+    """
+
+    def __init__(self, events, start_col=START_COLUMN, end_col=END_COLUMN, event_col=EVENT_COLUMN):
+        self.events = events
+        self.event_col = event_col
+        starts = pd.to_datetime(events[start_col], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        ends = pd.to_datetime(events[end_col], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        self.reversed = ends < starts  # False when either time is missing
+        rows = np.flatnonzero(~np.isnat(starts) & ~np.isnat(ends) & ~self.reversed)
+        order = rows[np.argsort(starts[rows], kind="stable")]
+        self.rows = order  # positions in events, sorted by start
+        self.starts = starts[order]
+        self.ends = ends[order]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def invalid(self):
+        """Index labels of events that end before they start."""
+        return self.events.index[self.reversed]
+
+    def durations(self):
+        """Event durations in hours, NaN for events outside the index."""
+        hours = np.full(len(self.events), np.nan)
+        hours[self.rows] = (self.ends - self.starts) / np.timedelta64(1, "h")
+        return pd.Series(hours, index=self.events.index, name="Duration (h)")
+
+    def distances(self, start=START_POSITION, end=END_POSITION):
+        """Great-circle distance in nautical miles between the decimal start and end positions."""
+        lat1, lon1, lat2, lon2 = (
+            pd.to_numeric(self.events[column], errors="coerce").to_numpy(dtype=np.float64)
+            for column in (*start, *end)
+        )
+        return pd.Series(haversine_nm(lat1, lon1, lat2, lon2), index=self.events.index, name="Distance Travelled")
+
+    def overlaps(self, same_event=True):
+        """Pairs of overlapping events as a DataFrame of first, second (index labels) and kind.
+
+        kind is "nested" when the second event lies within the first, else
+        "overlap". With same_event only events of the same type are paired,
+        e.g. two off-hire periods, since an ECA transit during a deviation is normal.
+        """
+        # Later-starting events that begin before event i ends overlap it
+        later = np.searchsorted(self.starts, self.ends, side="left")
+        first, second = _ranges(np.arange(len(self.rows)) + 1, later)
+        if same_event:
+            kinds = self.events[self.event_col].to_numpy()[self.rows]
+            keep = kinds[first] == kinds[second]
+            first, second = first[keep], second[keep]
+        nested = self.ends[second] <= self.ends[first]
+        labels = self.events.index[self.rows]
+        return pd.DataFrame({
+            "first": labels[first],
+            "second": labels[second],
+            "kind": np.where(nested, "nested", "overlap"),
+        })
+
+    def covering(self, times):
+        """Every (time, event) pair where the event covers the time, as positions into times and index labels.
+
+        Events are matched to the sorted query times by binary search, so long
+        histories of report times can be allocated to events in one call.
+        """
+        times = pd.to_datetime(pd.Series(times)).to_numpy(dtype="datetime64[ns]")
+        order = np.argsort(times, kind="stable")
+        sorted_times = times[order]
+        lo = np.searchsorted(sorted_times, self.starts, side="left")
+        hi = np.searchsorted(sorted_times, self.ends, side="left")
+        event, query = _ranges(lo, hi)
+        pairs = pd.DataFrame({"time": order[query], "event": self.events.index[self.rows[event]]})
+        return pairs.sort_values(["time", "event"], kind="stable", ignore_index=True)
+
+    def at(self, time):
+        """Index labels of the events covering a single time."""
+        return list(self.covering([time])["event"])
@@ -0,0 +1,138 @@
+import ast
+import re
+from functools import lru_cache, reduce
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+VARIABLE = re.compile(r"F([1-9][0-9]*)_(TODAY|PREV)")
+# Functions a formula may call; min and max take any number of arguments, like the builtins
+FUNCTIONS = {
+    "abs": np.abs,
+    "min": lambda *args: reduce(np.minimum, args),
+    "max": lambda *args: reduce(np.maximum, args),
+}
+FUNCTION_ARITY = {"abs": 1}  # exact argument counts; the others take one or more
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+# Formula types of the equipment configuration that are not custom expressions
+SIMPLE_DIFFERENCE = "Simple Difference"
+MULTIPLE_DIFFERENCE = "Multiple Flowmeter Difference"
+
+
+class FormulaError(ValueError):
+    pass
+
+
+class CompiledFormula(NamedTuple):
+    source: str
+    code: object  # code object of the validated expression
+    flowmeters: int  # number of flowmeters the formula was validated against
+    variables: tuple  # F<i>_TODAY / F<i>_PREV names it uses
+
+
+def formula_source(formula, flowmeters):
+    """Expression text of a configured formula; the named formula types become sums of differences."""
+    if formula == SIMPLE_DIFFERENCE:
+        return "F1_TODAY - F1_PREV"
+    if formula == MULTIPLE_DIFFERENCE:
+        return " + ".join(f"(F{i}_TODAY - F{i}_PREV)" for i in range(1, flowmeters + 1)) or "0"
+    return formula
+
+
+def _validate(node, flowmeters, variables):
+    if isinstance(node, ast.Expression):
+        return _validate(node.body, flowmeters, variables)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        node.value = float(node.value)  # float arithmetic overflows instead of growing huge integers
+        return
+    if isinstance(node, ast.BinOp) and isinstance(node.op, OPERATORS):
+        _validate(node.left, flowmeters, variables)
+        return _validate(node.right, flowmeters, variables)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, OPERATORS):
+        return _validate(node.operand, flowmeters, variables)
+    if isinstance(node, ast.Name):
+        match = VARIABLE.fullmatch(node.id)
+        if match is None:
+            raise FormulaError(f"Unknown name {node.id!r}; use F1_TODAY, F1_PREV, F2_TODAY, ...")
+        if int(match.group(1)) > flowmeters:
+            raise FormulaError(f"{node.id} refers to flowmeter {match.group(1)}, but only {flowmeters} are selected")
+        variables.add(node.id)
+        return
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+            and not node.keywords and node.args):
+        arity = FUNCTION_ARITY.get(node.func.id)
+        if arity is not None and len(node.args) != arity:
+            raise FormulaError(f"{node.func.id}() takes exactly {arity} argument, got {len(node.args)}")
+        for arg in node.args:
+            _validate(arg, flowmeters, variables)
+        return
+    raise FormulaError(f"Not allowed in a formula: {ast.unparse(node)}")
+
+
+@lru_cache(maxsize=256)
+def compile_formula(formula, flowmeters):
+    """Parses and validates a formula once; raises FormulaError for anything but arithmetic on readings.
+
+    Allowed are numbers, + - * / **, parentheses, abs/min/max and the
+    F<i>_TODAY / F<i>_PREV readings of the selected flowmeters.
+    """
+    source = formula_source(formula, flowmeters)
+    if not source.strip():
+        raise FormulaError("The formula is empty")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula: {e.msg}") from None
+    variables = set()
+    try:
+        _validate(tree, flowmeters, variables)
+    except OverflowError:
+        raise FormulaError("A number in the formula is too large") from None
+    compiled = CompiledFormula(source, compile(tree, "<formula>", "eval"), flowmeters, tuple(sorted(variables)))
+    evaluate(compiled, np.ones(flowmeters), np.zeros(flowmeters))  # raises FormulaError for unusable formulas
+    return compiled
+
+
+def evaluate(compiled, current, previous):
+    """Consumption from current and previous readings of shape (..., flowmeters), for all rows at once.
+
+    Raises FormulaError when the formula cannot be evaluated, e.g. a constant
+    part overflows (plain Python floats raise instead of giving inf).
+    """
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    namespace = dict(FUNCTIONS)
+    for name in compiled.variables:
+        match = VARIABLE.fullmatch(name)
+        readings = current if match.group(2) == "TODAY" else previous
+        namespace[name] = readings[..., int(match.group(1)) - 1]
+    try:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            result = eval(compiled.code, {"__builtins__": {}}, namespace)  # validated: arithmetic on readings only
+        return np.broadcast_to(result, current.shape[:-1]).astype(np.float64)
+    except Exception as e:
+        raise FormulaError(f"The formula cannot be evaluated: {e}") from None
+
+
+def consumption_history(configurations, readings):
+    """Consumption of every equipment for every interval of a reading history, one formula evaluation per equipment.
+
+    readings has a row per reading time and a column per flowmeter (mass
+    readings, in time order). Each row's TODAY is its own reading and PREV the
+    row before, so the first row is NaN. configurations is the page's
+    {equipment: {"flowmeters": [...], "formula": ...}} dict; equipment without
+    flowmeters is left out.
+    """
+    values = readings.to_numpy(dtype=np.float64)
+    previous = np.vstack([np.full((1, values.shape[1]), np.nan), values[:-1]])
+    column = {flowmeter: i for i, flowmeter in enumerate(readings.columns)}
+    result = {}
+    for equipment, config in configurations.items():
+        if not config["flowmeters"]:
+            continue
+        compiled = compile_formula(config["formula"], len(config["flowmeters"]))
+        positions = [column[flowmeter] for flowmeter in config["flowmeters"]]
+        result[equipment] = evaluate(compiled, values[:, positions], previous[:, positions])
+    return pd.DataFrame(result, index=readings.index)
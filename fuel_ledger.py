@@ -0,0 +1,143 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+PREVIOUS_ROB = "Previous ROB"
+CURRENT_ROB = "Current ROB"
+
+
+class FuelLedger:
+    """Fuel quantities by row (Previous ROB, consumers, adjustments, Current ROB) and tank.
+
+    Everything lives in one float64 array, with row_index and tank_index mapping
+    labels to positions. Current ROB is kept up to date as
+
+        Previous ROB - sum(consumers) + sum(sign * adjustment)
+
+    where adjustments is {row label: sign}, e.g. {"Bunkered Qty": 1, "Debunkered Qty": -1}.
+    Updates shift Current ROB by the change in the edited cells instead of
+    re-summing the table.
+    """
+
+    def __init__(self, consumers, tanks, adjustments=None, previous_rob=None):
+        adjustments = dict(adjustments or {})
+        self.consumers = list(consumers)
+        self.tanks = list(tanks)
+        self.rows = [PREVIOUS_ROB] + self.consumers + list(adjustments) + [CURRENT_ROB]
+        self.row_index = {label: i for i, label in enumerate(self.rows)}
+        self.tank_index = {tank: j for j, tank in enumerate(self.tanks)}
+        if len(self.row_index) != len(self.rows) or len(self.tank_index) != len(self.tanks):
+            raise ValueError("FuelLedger row and tank labels must be unique")
+        # Contribution of each row to Current ROB; Current ROB itself contributes nothing
+        self.signs = np.array(
+            [1.0] + [-1.0] * len(self.consumers) + [float(sign) for sign in adjustments.values()] + [0.0]
+        )
+        self.table = np.zeros((len(self.rows), len(self.tanks)))
+        if previous_rob is not None:
+            self.set_row(PREVIOUS_ROB, previous_rob)
+
+    @property
+    def previous_rob(self):
+        return self.table[0]
+
+    @property
+    def consumption(self):
+        """Consumers × tanks view of the table."""
+        return self.table[1:1 + len(self.consumers)]
+
+    @property
+    def current_rob(self):
+        return self.table[-1]
+
+    @property
+    def net_change(self):
+        """Current ROB - Previous ROB per tank."""
+        return self.table[-1] - self.table[0]
+
+    def _editable_row(self, row):
+        i = self.row_index[row]
+        if i == len(self.rows) - 1:
+            raise ValueError(f"{CURRENT_ROB} is derived and cannot be set")
+        return i
+
+    def get(self, row, tank):
+        return float(self.table[self.row_index[row], self.tank_index[tank]])
+
+    def set(self, row, tank, value):
+        """Sets one cell and returns the tank's new Current ROB."""
+        i, j = self._editable_row(row), self.tank_index[tank]
+        value = float(value)
+        self.table[-1, j] += self.signs[i] * (value - self.table[i, j])
+        self.table[i, j] = value
+        return float(self.table[-1, j])
+
+    def set_row(self, row, values):
+        """Sets a whole row from a scalar, a sequence in tank order or a Series indexed by tank."""
+        i = self._editable_row(row)
+        if isinstance(values, pd.Series):
+            values = values.reindex(self.tanks)
+        values = np.nan_to_num(np.broadcast_to(np.asarray(values, dtype=np.float64), len(self.tanks)))
+        self.table[-1] += self.signs[i] * (values - self.table[i])
+        self.table[i] = values
+
+    def update(self, frame):
+        """Applies an edited table (e.g. from st.data_editor) and returns the number of changed cells.
+
+        Rows and columns are matched by label; unknown labels and the Current ROB
+        row are ignored, and cleared cells count as zero.
+        """
+        row_positions = [p for p, label in enumerate(frame.index) if label in self.row_index and label != CURRENT_ROB]
+        tank_positions = [p for p, tank in enumerate(frame.columns) if tank in self.tank_index]
+        if not row_positions or not tank_positions:
+            return 0
+        i = np.array([self.row_index[frame.index[p]] for p in row_positions])
+        j = np.array([self.tank_index[frame.columns[p]] for p in tank_positions])
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+            frame = frame.apply(pd.to_numeric, errors="coerce")
+        edited = np.nan_to_num(frame.to_numpy(dtype=np.float64)[np.ix_(row_positions, tank_positions)])
+        delta = edited - self.table[np.ix_(i, j)]
+        changed = np.nonzero(delta)
+        if not len(changed[0]):
+            return 0
+        rows_changed, tanks_changed = i[changed[0]], j[changed[1]]
+        self.table[rows_changed, tanks_changed] = edited[changed]
+        np.add.at(self.table[-1], tanks_changed, self.signs[rows_changed] * delta[changed])
+        return len(rows_changed)
+
+    def apply_edits(self, edited_rows):
+        """Applies the edited_rows of an st.data_editor showing frame(), one cell at a time.
+
+        edited_rows maps row positions to {tank: value}; edits to Current ROB are ignored.
+        """
+        for position, cells in edited_rows.items():
+            row = self.rows[int(position)]
+            if row == CURRENT_ROB:
+                continue
+            for tank, value in cells.items():
+                if tank in self.tank_index:
+                    self.set(row, tank, 0.0 if value is None else value)
+
+    def recompute(self):
+        """Rebuilds Current ROB from scratch, e.g. to shed accumulated rounding drift."""
+        self.table[-1] = self.signs[:-1] @ self.table[:-1]
+
+    def content_hash(self, *extra):
+        """Digest of the values and labels, plus any extra parts (e.g. headers), to memoize output on."""
+        digest = hashlib.blake2b(self.table.tobytes(), digest_size=16)
+        digest.update(repr((self.rows, self.tanks, extra)).encode())
+        return digest.hexdigest()
+
+    def frame(self, rows=None, columns=None):
+        """The table as a DataFrame for display.
+
+        Without rows the frame is a view of the ledger, so no data is copied;
+        selecting rows takes a copy of just those rows. columns relabels the
+        tanks, e.g. with formatted headers.
+        """
+        columns = self.tanks if columns is None else columns
+        if rows is None:
+            return pd.DataFrame(self.table, index=self.rows, columns=columns, copy=False)
+        return pd.DataFrame(
+            self.table[[self.row_index[label] for label in rows]], index=list(rows), columns=columns, copy=False
+        )
@@ -0,0 +1,228 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from tank_operations import NO_TANK, OP_BUNKERING, OP_CONSUMPTION, OP_DEBUNKERING, OP_SURVEY, OP_TRANSFER
+
+UNKNOWN_BDN = "Unknown"  # fuel of no recorded origin: bunkers without a BDN, gains found by survey, shortfalls
+TRACE_MASS = 0.001  # mt; smaller BDN residues in a tank are shared out over the rest of its contents
+
+
+class BdnSpec(NamedTuple):
+    bdn: str
+    fuel_type: str = None
+    viscosity: float = np.nan  # cSt at 50 °C
+    sulphur: float = np.nan  # % m/m
+
+
+def viscosity_blending_number(viscosity):
+    """Refutas viscosity blending number; numbers blend linearly by mass fraction."""
+    return 14.534 * np.log(np.log(np.asarray(viscosity, dtype=np.float64) + 0.8)) + 10.975
+
+
+def viscosity_from_blending_number(vbn):
+    return np.exp(np.exp((np.asarray(vbn, dtype=np.float64) - 10.975) / 14.534)) - 0.8
+
+
+class FuelLineage:
+    """How much of every BDN is in every tank, carried through bunkering, transfers and consumption.
+
+    Tanks are taken as perfectly mixed: a transfer, debunkering or consumption
+    takes each BDN in proportion to its share of the tank. Survey corrections
+    scale the tank's contents; a gain in an empty tank, and anything drawn
+    beyond what the tank holds, is booked to UNKNOWN_BDN. Every draw is kept
+    in attribution(), so consumption can be reported against the BDNs it came from.
+
+    Pro rata mixing never quite empties a tank of an old BDN, so residues
+    below TRACE_MASS are folded into the tank's other BDNs. That keeps the
+    composition vectors and the attribution of every draw short over years
+    of operations without changing any tank's total.
+    """
+
+    def __init__(self, tanks, bdns=(), opening=None):
+        self.tanks = list(tanks)
+        self.tank_index = {tank: i for i, tank in enumerate(self.tanks)}
+        self.specs = {}
+        self.bdn_index = {}
+        self._properties = np.zeros((16, 2))  # viscosity blending number and sulphur of every BDN
+        self._mass = np.zeros((len(self.tanks), 16))
+        self.add_bdn(UNKNOWN_BDN)
+        for spec in bdns:
+            self.add_bdn(*spec)
+        self.reset(opening)
+
+    def reset(self, opening=None):
+        """Empties the tanks, then fills them from opening, a {tank: (bdn, mass)} dict."""
+        self.opening = dict(opening or {})
+        self._mass[:] = 0.0
+        self._draws = []  # (operation seq, kind, tank, BDN columns, masses) of every draw
+        self.applied = 0  # operations of the synced ledger replayed so far
+        self.synced_version = 0
+        for tank, (bdn, mass) in self.opening.items():
+            self.bunker(tank, bdn, mass)
+
+    def add_bdn(self, bdn, fuel_type=None, viscosity=np.nan, sulphur=np.nan):
+        """Registers (or updates) a BDN's properties and returns its column."""
+        self.specs[bdn] = BdnSpec(bdn, fuel_type, viscosity, sulphur)
+        column = self._bdn_column(bdn)
+        self._properties[column] = (viscosity_blending_number(viscosity), sulphur)
+        return column
+
+    def _bdn_column(self, bdn):
+        bdn = UNKNOWN_BDN if bdn is None or bdn == "" else bdn
+        column = self.bdn_index.get(bdn)
+        if column is None:
+            if bdn not in self.specs:
+                self.specs[bdn] = BdnSpec(bdn)
+            column = self.bdn_index[bdn] = len(self.bdn_index)
+            if column == len(self._properties):
+                self._properties = np.concatenate([self._properties, np.zeros_like(self._properties)])
+                self._mass = np.concatenate([self._mass, np.zeros_like(self._mass)], axis=1)
+            self._properties[column] = (np.nan, np.nan)
+        return column
+
+    def bunker(self, tank, bdn, quantity):
+        column = self._bdn_column(bdn)  # may grow _mass, so before indexing it
+        self._mass[self.tank_index[tank], column] += quantity
+
+    def _take(self, row, quantity):
+        """Removes quantity from a tank pro rata and returns the mass taken from each BDN."""
+        contents = self._mass[row]
+        total = contents.sum()
+        if total <= 0:
+            taken = np.zeros_like(contents)
+        else:
+            taken = contents * (min(quantity, total) / total)
+            contents -= taken
+            np.maximum(contents, 0.0, out=contents)
+            self._fold_traces(row)
+        if quantity > total:
+            taken[self.bdn_index[UNKNOWN_BDN]] += quantity - max(total, 0.0)
+        return taken
+
+    def _fold_traces(self, row):
+        contents = self._mass[row]
+        traces = (contents > 0) & (contents < TRACE_MASS)
+        if traces.any():
+            total = contents.sum()
+            kept = total - contents[traces].sum()
+            if kept > 0:
+                contents[traces] = 0.0
+                contents *= total / kept
+
+    def transfer(self, from_tank, to_tank, quantity):
+        row = self.tank_index[to_tank]
+        taken = self._take(self.tank_index[from_tank], quantity)
+        self._mass[row] += taken
+        self._fold_traces(row)
+        return taken
+
+    def draw(self, tank, quantity, kind=OP_CONSUMPTION, seq=None):
+        """Debunkers or consumes quantity from a tank; returns the mass per BDN column."""
+        row = self.tank_index[tank]
+        taken = self._take(row, quantity)
+        columns = np.flatnonzero(taken)
+        self._draws.append((seq, kind, row, columns, taken[columns]))
+        return taken
+
+    def correct(self, tank, quantity):
+        """Applies a signed survey correction by scaling the tank's contents."""
+        row = self.tank_index[tank]
+        total = self._mass[row].sum()
+        if total > 0 and total + quantity >= 0:
+            self._mass[row] *= (total + quantity) / total
+        elif quantity > 0:
+            self._mass[row, self.bdn_index[UNKNOWN_BDN]] += quantity
+        else:
+            self._mass[row] = 0.0
+
+    def sync(self, ledger):
+        """Replays the operations of a TankOperationLedger not applied yet.
+
+        Operations appended after the last sync are replayed on top of the
+        current state; if one was back-dated into the part already replayed,
+        the whole log is replayed again from the opening contents.
+        """
+        seq = ledger.column("seq")
+        if self.applied and seq[:self.applied].max() >= self.synced_version:
+            self.reset(self.opening)
+        start = self.applied
+        tanks = ledger.tanks  # names of the ledger's tank indices
+        kinds = ledger.column("kind")[start:].tolist()
+        sources = ledger.column("from_tank")[start:].tolist()
+        destinations = ledger.column("to_tank")[start:].tolist()
+        quantities = ledger.column("quantity")[start:].tolist()
+        references = ledger.column("reference")[start:].tolist()
+        seqs = seq[start:].tolist()
+        for kind, source, destination, quantity, reference, op in zip(
+                kinds, sources, destinations, quantities, references, seqs):
+            if kind == OP_BUNKERING:
+                self.bunker(tanks[destination], reference, quantity)
+            elif kind == OP_TRANSFER:
+                self.transfer(tanks[source], tanks[destination], quantity)
+            elif kind in (OP_DEBUNKERING, OP_CONSUMPTION):
+                self.draw(tanks[source], quantity, kind, op)
+            elif kind == OP_SURVEY and destination != NO_TANK:
+                self.correct(tanks[destination], quantity)
+        self.applied = len(ledger)
+        self.synced_version = ledger.version
+        return self
+
+    @property
+    def bdns(self):
+        return list(self.bdn_index)
+
+    def composition(self):
+        """Mass (mt) of every BDN in every tank."""
+        n = len(self.bdn_index)
+        return pd.DataFrame(self._mass[:, :n], index=self.tanks, columns=self.bdns)
+
+    def fractions(self):
+        """Share of every BDN in every tank; rows of empty tanks are zero."""
+        mass = self._mass[:, :len(self.bdn_index)]
+        total = mass.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = np.where(total > 0, mass / total, 0.0)
+        return pd.DataFrame(shares, index=self.tanks, columns=self.bdns)
+
+    def blend(self):
+        """Mass, blended viscosity (Refutas) and sulphur of every tank.
+
+        A property is NaN when any BDN in the tank lacks it, rather than a
+        figure that silently leaves part of the fuel out.
+        """
+        mass = self._mass[:, :len(self.bdn_index)]
+        total = mass.sum(axis=1)
+        properties = self._properties[:len(self.bdn_index)]
+        present = mass > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            blended = (np.where(present[:, :, None], mass[:, :, None] * properties, 0.0)).sum(axis=1) / total[:, None]
+        blended[(present[:, :, None] & np.isnan(properties)).any(axis=1)] = np.nan
+        return pd.DataFrame({
+            "Mass (mt)": total,
+            "Viscosity (cSt)": viscosity_from_blending_number(blended[:, 0]),
+            "Sulphur (%)": blended[:, 1],
+        }, index=self.tanks)
+
+    def attribution(self):
+        """Every debunkering and consumption split by BDN: seq, operation, tank, bdn and mass."""
+        columns = ["seq", "operation", "tank", "bdn", "mass"]
+        if not self._draws:
+            return pd.DataFrame(columns=columns)
+        counts = [len(draw[3]) for draw in self._draws]
+        bdns = np.array(self.bdns, dtype=object)
+        tanks = np.array(self.tanks, dtype=object)
+        return pd.DataFrame({
+            "seq": np.repeat([draw[0] for draw in self._draws], counts),
+            "operation": np.repeat([draw[1] for draw in self._draws], counts),
+            "tank": tanks[np.repeat([draw[2] for draw in self._draws], counts)],
+            "bdn": bdns[np.concatenate([draw[3] for draw in self._draws])],
+            "mass": np.concatenate([draw[4] for draw in self._draws]),
+        }, columns=columns)
+
+    def consumed_by_bdn(self, kinds=(OP_CONSUMPTION,)):
+        """Total mass drawn from every BDN by the given kinds of operation."""
+        drawn = self.attribution()
+        drawn = drawn[drawn["operation"].isin(kinds)]
+        return drawn.groupby("bdn")["mass"].sum().reindex(self.bdns, fill_value=0.0)
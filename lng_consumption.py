@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Rows of the CTMS table
+PREVIOUS_CTMS_QTY = "Previous CTMS qty (m3)"
+CTMS_QTY = "CTMS qty (m3)"
+CARGO_LOADED = "Cargo loaded (m3)"
+CARGO_DISCHARGED = "Cargo discharged (m3)"
+DENSITY = "Density"  # t/m3 of the LNG in the tanks
+N2_CORRECTION = "N2 correction"  # mT of nitrogen in the boil-off sent to consumers
+TOTAL_LNG = "Total LNG consumption (mT)"
+
+HISTORY_COLUMNS = ["Consumed volume (m3)", TOTAL_LNG, "Hours", "Boil-off rate (%/day)"]
+
+
+def consumed_volume(previous_qty, qty, loaded=0.0, discharged=0.0):
+    """LNG volume (m3) gone to consumers between two CTMS gauges, net of cargo loaded and discharged."""
+    return (np.asarray(previous_qty, dtype=np.float64) - qty) + np.nan_to_num(loaded) - np.nan_to_num(discharged)
+
+
+def lng_consumption(previous_qty, qty, loaded=0.0, discharged=0.0, density=np.nan, n2_correction=0.0):
+    """LNG consumption (mT) from two successive CTMS gauges; scalars or arrays.
+
+    Nitrogen boils off first and is not fuel, so its mass in the gas sent to
+    the consumers (n2_correction) is deducted.
+    """
+    volume = consumed_volume(previous_qty, qty, loaded, discharged)
+    return volume * np.asarray(density, dtype=np.float64) - np.nan_to_num(n2_correction)
+
+
+def boil_off_rate(volume, cargo_volume, hours):
+    """Boil-off as % of the cargo volume per day."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.asarray(volume, dtype=np.float64) / cargo_volume / np.asarray(hours, dtype=np.float64) * 24.0 * 100.0
+    return np.where((np.asarray(hours) > 0) & (np.asarray(cargo_volume) > 0), rate, np.nan)
+
+
+def ctms_history(readings, time_col="timestamp", vessel_col=None):
+    """Consumption and boil-off of every interval of a CTMS gauge history, in one vectorized pass.
+
+    readings has one row per gauge with CTMS_QTY, and optionally CARGO_LOADED,
+    CARGO_DISCHARGED, DENSITY and N2_CORRECTION for the interval ending at that
+    gauge. Rows are ordered by vessel (when vessel_col is given) and time; the
+    first gauge of every vessel gets NaN. The boil-off rate is relative to the
+    previous gauge's volume. Returns HISTORY_COLUMNS aligned with readings.index.
+    """
+    n = len(readings)
+    if n == 0:
+        return pd.DataFrame(columns=HISTORY_COLUMNS, index=readings.index, dtype=np.float64)
+
+    def column(name, default):
+        if name not in readings:
+            return np.full(n, default)
+        return pd.to_numeric(readings[name], errors="coerce").to_numpy(dtype=np.float64)
+
+    times = pd.to_datetime(readings[time_col]).to_numpy(dtype="datetime64[ns]")
+    order = np.argsort(times, kind="stable")
+    first = np.zeros(n, dtype=bool)
+    first[0] = True
+    if vessel_col is not None:
+        vessel_codes = pd.factorize(readings[vessel_col])[0]
+        order = order[np.argsort(vessel_codes[order], kind="stable")]
+        first[1:] = vessel_codes[order][1:] != vessel_codes[order][:-1]
+
+    qty = column(CTMS_QTY, np.nan)[order]
+    previous = np.empty(n)
+    previous[0] = np.nan
+    previous[1:] = qty[:-1]
+    previous[first] = np.nan
+    hours = np.full(n, np.nan)
+    hours[1:] = (times[order][1:] - times[order][:-1]) / np.timedelta64(1, "h")
+    hours[first] = np.nan
+
+    loaded, discharged = column(CARGO_LOADED, 0.0)[order], column(CARGO_DISCHARGED, 0.0)[order]
+    volume = consumed_volume(previous, qty, loaded, discharged)
+    mass = lng_consumption(previous, qty, loaded, discharged, column(DENSITY, np.nan)[order], column(N2_CORRECTION, 0.0)[order])
+    history = np.empty((n, len(HISTORY_COLUMNS)))
+    history[order] = np.column_stack([volume, mass, hours, boil_off_rate(volume, previous, hours)])
+    return pd.DataFrame(history, index=readings.index, columns=HISTORY_COLUMNS)
@@ -0,0 +1,172 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# How the delta of an interval was obtained
+DELTA_FIRST = 0  # first report of a history, no previous reading
+DELTA_MEASURED = 1  # difference of two consecutive good readings
+DELTA_ROLLOVER = 2  # the counter wrapped past its capacity
+DELTA_RESET = 3  # the meter was reset, so the reading itself is the delta
+DELTA_BRIDGED = 4  # share of the change across defective readings, by elapsed hours
+DELTA_IMPUTED = 5  # rate of the neighbouring intervals times elapsed hours
+DELTA_UNRESOLVED = 6  # nothing to impute from
+
+DELTA_NAMES = {
+    DELTA_FIRST: "First report",
+    DELTA_MEASURED: "Measured",
+    DELTA_ROLLOVER: "Rollover",
+    DELTA_RESET: "Meter reset",
+    DELTA_BRIDGED: "Bridged over defective readings",
+    DELTA_IMPUTED: "Imputed from neighbours",
+    DELTA_UNRESOLVED: "Unresolved",
+}
+
+# Cumulative machinery counters of the report form. No rollover capacity is on record for
+# them, so callers pass capacities (rollover) for the counters that wrap.
+MACHINERY_COUNTERS = (
+    "M/E rev counter",
+    "kWhr",
+    "Main engine",
+    "AE-1",
+    "A/E 2",
+    "A/E 3",
+    "A/E 4",
+    "Boiler 1",
+    "Boiler 2",
+    "Scrubbers",
+    "Shaft gen",
+    "Air Comp 1",
+    "Air Comp 2",
+)
+
+
+class MeterDeltas(NamedTuple):
+    deltas: pd.DataFrame  # per-interval values, one column per counter
+    status: pd.DataFrame  # DELTA_* code of every value
+
+
+def _as_array(frame, columns, n, dtype, fill):
+    if frame is None:
+        return np.full((n, len(columns)), fill, dtype=dtype)
+    values = frame.reindex(columns=columns).to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.nan_to_num(values, nan=float(fill)).astype(dtype)
+
+
+def counter_deltas(readings, defective=None, reset=None, hours=None, groups=None, rollover=None):
+    """Per-interval deltas of cumulative counters, computed for all counters at once.
+
+    readings has one row per report in time order and one column per counter;
+    NaN is a missing reading. defective and reset are boolean frames of the
+    same shape (the Meter Defective and Reset Meter checkboxes), hours the
+    elapsed hours since the previous report, groups the vessel of each row
+    (rows of a vessel must be contiguous) and rollover a {counter: capacity}
+    dict for counters that wrap.
+
+    A reset row's delta is its reading. Across defective or missing readings
+    the change between the good readings on either side is shared out by
+    elapsed hours, unless a reset falls in between. Whatever remains is
+    imputed from the mean rate of the nearest known intervals on either side.
+    """
+    columns = list(readings.columns)
+    n, m = readings.shape
+    values = readings.to_numpy(dtype=np.float64)
+    good = ~np.isnan(values) & ~_as_array(defective, columns, n, bool, False)
+    is_reset = _as_array(reset, columns, n, bool, False)
+    weights = np.ones(n) if hours is None else pd.Series(hours).to_numpy(dtype=np.float64)
+    capacity = np.array([(rollover or {}).get(column) or np.nan for column in columns], dtype=np.float64)
+    group_codes = np.zeros(n, dtype=np.int64) if groups is None else pd.factorize(pd.Series(groups))[0]
+
+    position = np.arange(n)
+    first = np.ones(n, dtype=bool)
+    first[1:] = group_codes[1:] != group_codes[:-1]
+    group_start = np.maximum.accumulate(np.where(first, position, 0))
+    last_row = np.ones(n, dtype=bool)
+    last_row[:-1] = first[1:]
+    group_end = np.minimum.accumulate(np.where(last_row, position, n)[::-1])[::-1]
+
+    # Good reading at or before / at or after every row, limited to its vessel
+    at_or_before = np.maximum.accumulate(np.where(good, position[:, None], -1), axis=0)
+    before = np.full((n, m), -1)
+    before[1:] = at_or_before[:-1]
+    before[before < group_start[:, None]] = -1
+    after = np.minimum.accumulate(np.where(good, position[:, None], n)[::-1], axis=0)[::-1]
+    after[after > group_end[:, None]] = n
+
+    deltas = np.full((n, m), np.nan)
+    status = np.full((n, m), DELTA_IMPUTED, dtype=np.int8)
+
+    # Spans between good readings without a reset in between are known in total
+    resets_so_far = np.cumsum(is_reset, axis=0)
+    hours_so_far = np.concatenate([[0.0], np.cumsum(np.nan_to_num(weights))])
+    counter = np.broadcast_to(np.arange(m), (n, m))
+    spanned = (before >= 0) & (after < n)
+    lo, hi = np.where(spanned, before, 0), np.where(spanned, after, 0)
+    spanned &= resets_so_far[hi, counter] == resets_so_far[lo, counter]
+    total = values[hi, counter] - values[lo, counter]
+    wrapped = spanned & (total < 0) & ~np.isnan(capacity)
+    total = np.where(wrapped, total + capacity, total)
+    spanned &= total >= 0  # a drop without a reset or known capacity is not trusted
+    span_hours = hours_so_far[hi + 1] - hours_so_far[lo + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(span_hours > 0, np.nan_to_num(weights)[:, None] / span_hours, 1.0 / (hi - lo))
+        deltas[spanned] = (total * share)[spanned]
+    direct = spanned & (lo == position[:, None] - 1) & (hi == position[:, None])
+    status[spanned] = DELTA_BRIDGED
+    status[direct] = DELTA_MEASURED
+    status[direct & wrapped] = DELTA_ROLLOVER
+
+    anchored = good & is_reset
+    deltas[anchored] = values[anchored]
+    status[anchored] = DELTA_RESET
+    deltas[first] = np.nan
+    status[first] = DELTA_FIRST
+
+    # Everything else takes the mean rate of the nearest known intervals on either side
+    missing = status == DELTA_IMPUTED
+    if missing.any():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = pd.DataFrame(np.where(missing, np.nan, deltas / weights[:, None]))
+        by_group = rates.groupby(group_codes)
+        earlier, later = by_group.ffill().to_numpy(), by_group.bfill().to_numpy()
+        neighbours = np.where(np.isnan(earlier), later, np.where(np.isnan(later), earlier, (earlier + later) / 2))
+        imputed = neighbours * weights[:, None]
+        deltas[missing] = imputed[missing]
+        status[missing & np.isnan(imputed)] = DELTA_UNRESOLVED
+
+    return MeterDeltas(
+        pd.DataFrame(deltas, index=readings.index, columns=columns),
+        pd.DataFrame(status, index=readings.index, columns=columns),
+    )
+
+
+def history_deltas(reports, counters=MACHINERY_COUNTERS, rollover=None, vessel_col="vessel", time_col="timestamp"):
+    """counter_deltas over a report history with a column per counter.
+
+    Flags are read from "<counter> Defective" and "<counter> Reset" columns
+    when present. Reports are ordered by vessel and time, hours come from the
+    timestamps, and the result is aligned with reports.index. rollover is a
+    {counter: capacity} dict for counters that wrap.
+    """
+    names = [name for name in counters if name in reports]
+    vessel_codes = pd.factorize(reports[vessel_col])[0]
+    times = pd.to_datetime(reports[time_col]).to_numpy(dtype="datetime64[ns]")
+    order = np.argsort(times, kind="stable")
+    order = order[np.argsort(vessel_codes[order], kind="stable")]
+    ordered = reports.iloc[order]
+
+    def flags(suffix):
+        present = {name: f"{name} {suffix}" for name in names if f"{name} {suffix}" in reports}
+        return ordered[list(present.values())].set_axis(list(present), axis=1) if present else None
+
+    hours = np.zeros(len(order))
+    hours[1:] = (times[order][1:] - times[order][:-1]) / np.timedelta64(1, "h")
+    result = counter_deltas(
+        ordered[names].apply(pd.to_numeric, errors="coerce"),
+        defective=flags("Defective"),
+        reset=flags("Reset"),
+        hours=hours,
+        groups=vessel_codes[order],
+        rollover=rollover,
+    )
+    return MeterDeltas(result.deltas.reindex(reports.index), result.status.reindex(reports.index))
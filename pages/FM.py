@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import json
 
+from flow_formulas import FormulaError, compile_formula, consumption_history, evaluate
+from volume_correction import PRODUCT_BANDS, TEMP_RANGE_C, mass_in_air
+
 # Page configuration
 st.set_page_config(
     page_title="Vessel Consumption Calculator",
@@ -108,39 +112,29 @@ with admin_tab:
                 )
 
             if st.button('Save Equipment Configuration'):
-                st.session_state.configurations[equipment_type]['flowmeters'] = selected_flowmeters
-                if formula_type == 'Custom Formula':
-                    st.session_state.configurations[equipment_type]['formula'] = custom_formula
+                formula = custom_formula if formula_type == 'Custom Formula' else formula_type
+                try:
+                    # Parsed and checked once here; calculations reuse the compiled formula
+                    compile_formula(formula, len(selected_flowmeters))
+                except FormulaError as e:
+                    st.error(f'Configuration not saved: {e}')
                 else:
-                    st.session_state.configurations[equipment_type]['formula'] = formula_type
-                st.success(f'Configuration saved for {equipment_type}')
+                    st.session_state.configurations[equipment_type]['flowmeters'] = selected_flowmeters
+                    st.session_state.configurations[equipment_type]['formula'] = formula
+                    st.success(f'Configuration saved for {equipment_type}')
 
 with user_tab:
     st.header('Daily Consumption Recording')
 
     def convert_to_mass(volume, density, temperature):
-        temperature_factor = 1 - (0.00065 * (temperature - 15))
-        return volume * density * temperature_factor
+        """Volume (m³) at temperature to weight in air (mT), corrected to 15 °C with the ASTM D1250 tables; works on arrays."""
+        return mass_in_air(volume, density, temperature)
 
     def calculate_consumption(readings, formula_type):
         try:
-            if formula_type == 'Simple Difference':
-                return float(readings['current'][0]) - float(readings['previous'][0])
-            elif formula_type == 'Multiple Flowmeter Difference':
-                total = 0
-                for curr, prev in zip(readings['current'], readings['previous']):
-                    total += float(curr) - float(prev)
-                return total
-            elif isinstance(formula_type, str) and 'F' in formula_type:
-                variables = {}
-                for i, (curr, prev) in enumerate(zip(readings['current'], readings['previous']), 1):
-                    variables[f'F{i}_TODAY'] = float(curr)
-                    variables[f'F{i}_PREV'] = float(prev)
-                formula = formula_type
-                for var_name, value in variables.items():
-                    formula = formula.replace(var_name, str(value))
-                return eval(formula)
-        except Exception as e:
+            compiled = compile_formula(formula_type, len(readings['current']))
+            return float(evaluate(compiled, readings['current'], readings['previous']))
+        except FormulaError as e:
             st.error(f"Calculation error: {str(e)}")
             return None
 
@@ -200,8 +194,10 @@ with user_tab:
 
                     if fm_details['type'] == 'Volumetric':
                         density = st.number_input(
-                            'Density (kg/m³)',
-                            value=0.0,
+                            'Density at 15 °C (kg/m³)',
+                            min_value=PRODUCT_BANDS[0].density_min,
+                            max_value=PRODUCT_BANDS[-1].density_max,
+                            value=991.0,
                             key=f'{eq_type}_{fm}_density'
                         )
                         temperature = st.number_input(
@@ -219,19 +215,46 @@ with user_tab:
                     readings['previous'].append(previous)
 
             if st.button(f'Calculate {eq_type} Consumption'):
-                # Apply mass conversion if needed
-                for i, fm in enumerate(config['flowmeters']):
-                    if st.session_state.flowmeters[fm]['type'] == 'Volumetric':
-                        density = st.session_state[f'{eq_type}_{fm}_density']
-                        temperature = st.session_state[f'{eq_type}_{fm}_temp']
-                        readings['current'][i] = convert_to_mass(readings['current'][i], density, temperature)
-                        readings['previous'][i] = convert_to_mass(readings['previous'][i], density, temperature)
-
-                result = calculate_consumption(readings, config['formula'])
+                # Apply mass conversion if needed, to all volumetric flowmeters at once
+                volumetric = [i for i, fm in enumerate(config['flowmeters'])
+                              if st.session_state.flowmeters[fm]['type'] == 'Volumetric']
+                density = np.array([st.session_state[f'{eq_type}_{config["flowmeters"][i]}_density'] for i in volumetric])
+                temperature = np.array([st.session_state[f'{eq_type}_{config["flowmeters"][i]}_temp'] for i in volumetric])
+                for side in ('current', 'previous'):
+                    values = np.array(readings[side], dtype=np.float64)
+                    values[volumetric] = convert_to_mass(values[volumetric], density, temperature)
+                    readings[side] = values
+
+                if np.isnan(readings['current']).any() or np.isnan(readings['previous']).any():
+                    result = None
+                    st.error(
+                        f"Volume correction needs a density between {PRODUCT_BANDS[0].density_min:g} and "
+                        f"{PRODUCT_BANDS[-1].density_max:g} kg/m³ and a temperature between {TEMP_RANGE_C[0]:g} and {TEMP_RANGE_C[1]:g} °C."
+                    )
+                else:
+                    result = calculate_consumption(readings, config['formula'])
                 if result is not None:
                     calculation_results[eq_type] = result
                     st.success(f'{eq_type} Consumption: {result:.2f} units')
 
+    # Consumption over a history of readings, every equipment at once
+    with st.expander("📈 Consumption History"):
+        history_file = st.file_uploader(
+            "Flowmeter readings (CSV: a time column, then one column of mass readings per flowmeter)",
+            type=['csv'],
+            key='reading_history_file'
+        )
+        if history_file is not None:
+            history = pd.read_csv(history_file, index_col=0, parse_dates=True).sort_index()
+            configured = {
+                eq_type: config for eq_type, config in st.session_state.configurations.items()
+                if config['flowmeters'] and set(config['flowmeters']) <= set(history.columns)
+            }
+            try:
+                st.dataframe(consumption_history(configured, history), use_container_width=True)
+            except FormulaError as e:
+                st.error(f"Calculation error: {str(e)}")
+
     # Tank Levels Section
     st.markdown("---")
     st.subheader('🛢️ Tank Levels')
@@ -1,17 +1,61 @@
+import io
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import random
 import string
-import uuid
 from datetime import datetime
 
+from fuel_ledger import FuelLedger
+from fuel_lineage import FuelLineage
+from report_forms import current_vessel, get_report_store, recording_keys, scope_values, select_vessel
+from tank_calibration import (ANGLE, CALIBRATION_COLUMNS, SOUNDING, TABLE, TABLE_HEEL, TABLE_TRIM, TABLE_VOLUME, TANK,
+                              VALUE, CalibrationError, compile_calibration)
+from tank_operations import OP_BUNKERING, OP_DEBUNKERING, OP_SURVEY, TankOperationLedger
+from volume_correction import mass_in_air, volume_correction_factor
+from widget_keys import WidgetKeys
+
 st.set_page_config(layout="wide", page_title="Fuel Consumption Report - Tank Sounding Method")
 
+PAGE = "FOCMVP_v1"
+keys = WidgetKeys(PAGE)
+
 def generate_random_bdn_numbers():
     """Generates three unique random alphanumeric BDN numbers (8 characters)."""
     return [''.join(random.choices(string.ascii_uppercase + string.digits, k=8)) for _ in range(3)]
 
+@st.cache_resource(show_spinner=False)
+def load_calibration(data):
+    """Sounding tables of an uploaded CSV, compiled once and shared by every session.
+
+    Raises CalibrationError for files that are not readable CSV as well as for unusable tables.
+    """
+    try:
+        tables = pd.read_csv(io.BytesIO(data))
+    except (UnicodeDecodeError, pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+        raise CalibrationError(f"The file is not a readable CSV: {e}") from None
+    return compile_calibration(tables)
+
+@st.cache_resource(show_spinner=False)
+def example_calibration(tanks):
+    """Sounding tables of box shaped tanks with a sloping bottom, used until real tables are imported."""
+    frames = []
+    for i, tank in enumerate(tanks):
+        height, area, slope = 12.0 + 0.5 * i, 60.0 + 5.0 * i, 0.5  # m, m2, m of sloping bottom
+        soundings = np.round(np.arange(0.0, height + 0.001, 0.05), 2)
+        volumes = np.where(soundings < slope, area * soundings ** 2 / (2 * slope), area * (soundings - slope / 2))
+        frames.append(pd.DataFrame({TANK: tank, TABLE: TABLE_VOLUME, SOUNDING: soundings, ANGLE: np.nan, VALUE: volumes}))
+        # Sounding pipe 4 m aft of the tank centre over a 20 m long tank, 3 m off the centre line
+        grid_soundings, trims, heels = np.arange(0.0, height + 0.001, 1.0), np.arange(-1.0, 3.5, 0.5), np.arange(-3.0, 3.5, 0.5)
+        s, t = np.meshgrid(grid_soundings, trims, indexing="ij")
+        frames.append(pd.DataFrame({TANK: tank, TABLE: TABLE_TRIM, SOUNDING: s.ravel(), ANGLE: t.ravel(), VALUE: -t.ravel() * 4.0 / 20.0}))
+        s, h = np.meshgrid(grid_soundings, heels, indexing="ij")
+        side = 1.0 if i % 2 else -1.0
+        frames.append(pd.DataFrame({TANK: tank, TABLE: TABLE_HEEL, SOUNDING: s.ravel(), ANGLE: h.ravel(),
+                                    VALUE: -side * 3.0 * np.tan(np.radians(h.ravel()))}))
+    return compile_calibration(pd.concat(frames, ignore_index=True)[CALIBRATION_COLUMNS])
+
 def initialize_session_state():
     if 'consumers' not in st.session_state:
         st.session_state.consumers = [
@@ -56,16 +100,13 @@ def initialize_session_state():
         for tank in st.session_state.tanks:
             st.session_state.sulfur[tank] = np.random.uniform(0.05, 0.49)
 
-    # Initialize consumption_data_tank_sounding with fuel types as columns
-    if 'consumption_data_tank_sounding' not in st.session_state:
-        index = st.session_state.consumers
-        columns = st.session_state.fuel_type_columns
-        st.session_state.consumption_data_tank_sounding = pd.DataFrame(0, index=index, columns=columns)
-
-    if 'previous_rob_tank_sounding' not in st.session_state:
-        # Initialize with random values using fuel type columns
-        st.session_state.previous_rob_tank_sounding = pd.Series({fuel: np.random.uniform(100, 1000)
-                                                                 for fuel in st.session_state.fuel_type_columns})
+    # Tank Sounding consumption ledger with fuel types as columns
+    if 'tank_sounding_ledger' not in st.session_state:
+        st.session_state.tank_sounding_ledger = FuelLedger(
+            st.session_state.consumers,
+            st.session_state.fuel_type_columns,
+            previous_rob=np.random.uniform(100, 1000, len(st.session_state.fuel_type_columns)),
+        )
 
     # Initialize fuel grades for tanks (still needed for tank properties section)
     if 'fuel_grades' not in st.session_state:
@@ -73,11 +114,24 @@ def initialize_session_state():
         for tank in st.session_state.tanks:
             st.session_state.fuel_grades[tank] = random.choice(["LFO", "MGO", "HFO"])
 
-    # Initialize current_rob for tanks (still needed for tank properties section)
-    if 'current_rob' not in st.session_state:
-        st.session_state.current_rob = {}
-        for tank in st.session_state.tanks:
-            st.session_state.current_rob[tank] = np.random.uniform(50, 500)
+    # Every transfer, bunkering, debunkering and ROB correction of the tanks
+    if 'tank_operations' not in st.session_state:
+        st.session_state.tank_operations = TankOperationLedger(
+            st.session_state.tanks,
+            opening_rob=np.random.uniform(50, 500, len(st.session_state.tanks)),
+        )
+
+    # Raw soundings of the tanks, starting from soundings that match the opening ROB
+    if 'tank_soundings' not in st.session_state:
+        tanks = st.session_state.tanks
+        density = np.random.uniform(900, 990, len(tanks))
+        temperature = np.random.uniform(30, 50, len(tanks))
+        volume = st.session_state.tank_operations.opening_rob * 1000 / (density - 1.1) / volume_correction_factor(density, temperature)
+        st.session_state.tank_soundings = pd.DataFrame({
+            'Sounding (m)': np.round(example_calibration(tuple(tanks)).sounding_for_volume(tanks, volume), 2),
+            'Density @ 15°C': density,
+            'Temp (°C)': temperature,
+        }, index=tanks)
 
     # Initialize bunkering and debunkering entries
     if 'bunkering_entries' not in st.session_state:
@@ -92,45 +146,109 @@ def initialize_session_state():
             for _ in range(8)
         ]
 
-    # Initialize tank transfer history
-    if 'tank_transfer_history' not in st.session_state:
-        st.session_state.tank_transfer_history = []
+    # What share of each BDN is in each tank, starting from one BDN per tank
+    if 'fuel_lineage' not in st.session_state:
+        tanks = st.session_state.tanks
+        opening_rob = st.session_state.tank_operations.opening_rob
+        st.session_state.fuel_lineage = FuelLineage(
+            tanks,
+            bdns=[(bdn, None, st.session_state.viscosity[tank], st.session_state.sulfur[tank])
+                  for tank, bdn in zip(tanks, st.session_state.bdn_numbers)],
+            opening={tank: (bdn, rob) for tank, bdn, rob in zip(tanks, st.session_state.bdn_numbers, opening_rob)},
+        )
 
 def display_tank_sounding_report():
-    def create_editable_dataframe():
-        # New structure with fuel types as columns but WITHOUT the BDN Number row
-        index = ['Previous ROB'] + st.session_state.consumers + ['Current ROB']
-        columns = st.session_state.fuel_type_columns  # Use the fuel type columns
+    # Columns are the fuel types, WITHOUT the BDN Number row
+    ledger = st.session_state.tank_sounding_ledger
+    editor_key = keys("tank_sounding_editor")
 
-        df = pd.DataFrame(index=index, columns=columns)
-
-        # Set Previous ROB from session state or initialize with random values
-        df.loc['Previous ROB'] = st.session_state.previous_rob_tank_sounding
-
-        # Set consumption data from session state
-        df.loc[st.session_state.consumers] = st.session_state.consumption_data_tank_sounding
-
-        # Calculate Current ROB
-        consumption = pd.to_numeric(df.loc[st.session_state.consumers].sum(), errors='coerce').fillna(0)
-        df.loc['Current ROB'] = pd.to_numeric(df.loc['Previous ROB'], errors='coerce').fillna(0) - consumption
+    st.subheader("Tank Sounding Method Fuel Consumption Data")
+    # Edits are applied cell by cell before the rerun, so Current ROB is already up to date
+    st.data_editor(
+        ledger.frame(),
+        use_container_width=True,
+        num_rows="fixed",
+        key=editor_key,
+        on_change=lambda: ledger.apply_edits(st.session_state[editor_key]["edited_rows"]),
+    )
 
-        return df
+    return ledger.frame()
+
+def sounding_quantities(calibration, soundings, trim, heel):
+    """Volume, fill and mass of every tank from its raw sounding, all tanks in one pass."""
+    tanks = soundings.index
+    volume = calibration.volume(tanks, soundings['Sounding (m)'], trim, heel)
+    positions = calibration.positions(tanks)
+    capacity = np.where(positions >= 0, calibration.capacities[positions], np.nan)
+    mass = mass_in_air(volume, soundings['Density @ 15°C'].to_numpy(dtype=np.float64), soundings['Temp (°C)'].to_numpy(dtype=np.float64))
+    rob = np.array([st.session_state.tank_operations.rob(tank) for tank in tanks])
+    return soundings.assign(**{
+        'Volume (m3)': volume,
+        'Fill (%)': volume / capacity * 100,
+        'Mass (mT)': mass,
+        'Current ROB (mT)': rob,
+        'Difference (mT)': mass - rob,
+    })
+
+def apply_sounding_edits(editor_key):
+    soundings = st.session_state.tank_soundings
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        for column, value in changes.items():
+            if column in soundings.columns:
+                soundings.iloc[int(row), soundings.columns.get_loc(column)] = np.nan if value is None else value
+
+def display_tank_soundings():
+    """Tank quantities from raw soundings through the tanks' calibration tables."""
+    st.subheader("Tank Soundings")
+    tanks = st.session_state.tanks
+    calibration = example_calibration(tuple(tanks))
+    with st.expander("Tank Calibration Tables"):
+        calibration_file = st.file_uploader(
+            f"Sounding tables (CSV with columns {', '.join(CALIBRATION_COLUMNS)}; "
+            f"{TABLE} is {TABLE_VOLUME}, {TABLE_TRIM} or {TABLE_HEEL})",
+            type=['csv'],
+            key=keys("calibration_file")
+        )
+        if calibration_file is None:
+            st.caption("Example tables are used until the vessel's tables are imported.")
+        else:
+            try:
+                calibration = load_calibration(calibration_file.getvalue())
+            except CalibrationError as e:
+                st.error(f"Calibration tables not imported: {e}")
 
-    df = create_editable_dataframe()
+    col1, col2 = st.columns(2)
+    with col1:
+        trim = st.number_input("Trim (m, + by the stern)", value=0.0, step=0.1, format="%.2f", key=keys("sounding_trim"))
+    with col2:
+        heel = st.number_input("Heel (°, + to starboard)", value=0.0, step=0.1, format="%.1f", key=keys("sounding_heel"))
 
-    st.subheader("Tank Sounding Method Fuel Consumption Data")
-    edited_df = st.data_editor(
-        df,
+    quantities = sounding_quantities(calibration, st.session_state.tank_soundings, trim, heel)
+    editor_key = keys("tank_soundings_editor")
+    computed = ['Volume (m3)', 'Fill (%)', 'Mass (mT)', 'Current ROB (mT)', 'Difference (mT)']
+    st.data_editor(
+        quantities,
         use_container_width=True,
-        num_rows="dynamic",
-        key=f"tank_sounding_editor_{uuid.uuid4()}"
+        num_rows="fixed",
+        column_config={
+            'Sounding (m)': st.column_config.NumberColumn(min_value=0.0, step=0.01, format="%.2f"),
+            'Density @ 15°C': st.column_config.NumberColumn(min_value=0.0, step=0.1, format="%.1f"),
+            'Temp (°C)': st.column_config.NumberColumn(step=0.1, format="%.1f"),
+            **{column: st.column_config.NumberColumn(disabled=True, format="%.1f") for column in computed},
+        },
+        key=editor_key,
+        on_change=lambda: apply_sounding_edits(editor_key),
     )
 
-    # Save edited data back to session state
-    st.session_state.consumption_data_tank_sounding = edited_df.loc[st.session_state.consumers]
-    st.session_state.previous_rob_tank_sounding = edited_df.loc['Previous ROB']
+    outside = quantities.index[quantities['Mass (mT)'].isna()]
+    if len(outside):
+        st.warning(f"No quantity for {', '.join(outside)}: sounding, trim, heel, density or temperature is outside the tables.")
 
-    return edited_df
+    differs = quantities['Difference (mT)'].abs() >= 0.05
+    if st.button("Book Sounded ROB", disabled=not differs.any(), key=keys("book_sounded_rob")):
+        for tank, difference in quantities.loc[differs, 'Difference (mT)'].items():
+            st.session_state.tank_operations.append(OP_SURVEY, difference, to_tank=tank, reference="Tank sounding")
+        st.rerun()
 
 def display_additional_table():
     st.subheader("Additional Consumption Data")
@@ -168,7 +286,7 @@ def display_additional_table():
         use_container_width=True,
         num_rows="dynamic",
         column_config=column_config,
-        key=f"additional_consumption_editor_{uuid.uuid4()}"
+        key=keys("additional_consumption_editor")
     )
 
     return edited_additional_data
@@ -182,6 +300,21 @@ def classify_fuel_by_viscosity(fuel_type, viscosity):
             return 'LFO'
     return fuel_type
 
+def record_tank_entry(kind, entry, quantity, time):
+    """Books a bunkering or debunkering entry in the tank ledger, split evenly over its tanks."""
+    grade = entry.get('classified_as', entry.get('fuel_type'))
+    if kind == OP_BUNKERING and entry.get('bdn_number'):
+        st.session_state.fuel_lineage.add_bdn(
+            entry['bdn_number'], entry.get('fuel_type'), entry.get('viscosity', np.nan), entry.get('sulphur', np.nan)
+        )
+    share = quantity / len(entry['tanks'])
+    for tank in entry['tanks']:
+        if kind == OP_BUNKERING:
+            st.session_state.tank_operations.append(kind, share, time, to_tank=tank, to_grade=grade, reference=entry.get('bdn_number'))
+        else:
+            st.session_state.tank_operations.append(kind, share, time, from_tank=tank, from_grade=grade, reference=entry.get('bdn_number'))
+    entry['recorded'] = True
+
 def display_bunkering_details():
     st.markdown("<h4 style='font-size: 18px;'>Bunkering Details</h4>", unsafe_allow_html=True)
 
@@ -211,6 +344,15 @@ def display_bunkering_details():
                 step=0.1,
                 key=f"viscosity_{i}"
             )
+            entry['sulphur'] = st.number_input(
+                "Sulphur (% m/m)",
+                min_value=0.0,
+                max_value=5.0,
+                value=entry.get('sulphur', 0.5),
+                step=0.01,
+                format="%.2f",
+                key=f"sulphur_{i}"
+            )
 
             # Classify the fuel type based on viscosity
             if entry['fuel_type'] in ['HSFO', 'VLSFO', 'ULSFO']:
@@ -247,9 +389,14 @@ def display_bunkering_details():
             for tank in entry['tanks']:
                 st.session_state.fuel_grades[tank] = classify_fuel_by_viscosity(entry['fuel_type'], entry['viscosity'])
 
+        if st.button("Record Bunkering", key=f"record_bunkering_{i}",
+                     disabled=entry.get('recorded', False) or not entry['tanks'] or entry['mass'] <= 0):
+            record_tank_entry(OP_BUNKERING, entry, entry['mass'], datetime.combine(entry['delivery_date'], entry['delivery_time']))
+            st.success(f"Recorded {entry['mass']:.1f} MT bunkered into {', '.join(entry['tanks'])}")
+
     if st.button("➕ Add Bunkering Entry"):
         st.session_state.bunkering_entries.append({})
-        st.experimental_rerun()
+        st.rerun()
 def display_debunkering_details():
     st.markdown("<h4 style='font-size: 18px;'>Debunkering Details</h4>", unsafe_allow_html=True)
 
@@ -292,13 +439,19 @@ def display_debunkering_details():
             # Add tank selection
             entry['tanks'] = st.multiselect("Select Tanks", st.session_state.tanks, default=entry.get('tanks', []), key=f"debunkering_tanks_{i}")
 
+        if st.button("Record Debunkering", key=f"record_debunkering_{i}",
+                     disabled=entry.get('recorded', False) or not entry['tanks'] or entry['quantity'] <= 0):
+            record_tank_entry(OP_DEBUNKERING, entry, entry['quantity'], entry['date'])
+            st.success(f"Recorded {entry['quantity']:.1f} MT debunkered from {', '.join(entry['tanks'])}")
+
     if st.button("➕ Add Debunkering Entry"):
         st.session_state.debunkering_entries.append({})
-        st.experimental_rerun()
+        st.rerun()
 
 def display_tank_transfer_section():
     """Display and handle tank-to-tank transfer functionality"""
     st.subheader("Tank-to-Tank Transfer")
+    operations = st.session_state.tank_operations
 
     # Create columns for the transfer form
     col1, col2, col3 = st.columns(3)
@@ -321,7 +474,7 @@ def display_tank_transfer_section():
         transfer_quantity = st.number_input(
             "Quantity to Transfer (MT)",
             min_value=0.0,
-            max_value=float(st.session_state.current_rob.get(source_tank, 0)),
+            max_value=max(operations.rob(source_tank), 0.0),
             step=0.1,
             format="%.1f",
             key="transfer_quantity"
@@ -335,7 +488,7 @@ def display_tank_transfer_section():
         if source_tank == destination_tank:
             st.warning("Source and destination tanks cannot be the same.")
 
-        source_rob = st.session_state.current_rob.get(source_tank, 0)
+        source_rob = operations.rob(source_tank)
         if transfer_quantity > source_rob:
             st.error(f"Transfer quantity exceeds available ROB in {source_tank} ({source_rob:.1f} MT)")
 
@@ -352,61 +505,52 @@ def display_tank_transfer_section():
 
     # Process the transfer if button is clicked
     if transfer_button:
-        # Update ROB values
-        st.session_state.current_rob[source_tank] -= transfer_quantity
-        st.session_state.current_rob[destination_tank] += transfer_quantity
-
-        # Record the transfer in history
-        transfer_record = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'from_tank': source_tank,
-            'to_tank': destination_tank,
-            'quantity': transfer_quantity,
-            'from_fuel_grade': st.session_state.fuel_grades.get(source_tank),
-            'to_fuel_grade': st.session_state.fuel_grades.get(destination_tank)
-        }
-
-        st.session_state.tank_transfer_history.append(transfer_record)
+        destination_was_empty = operations.rob(destination_tank) <= 0
+
+        # Record the transfer; the ledger updates both tanks' ROB
+        operations.transfer(
+            source_tank,
+            destination_tank,
+            transfer_quantity,
+            time=datetime.now(),
+            from_grade=st.session_state.fuel_grades.get(source_tank),
+            to_grade=st.session_state.fuel_grades.get(destination_tank),
+        )
 
         # Show success message
         st.success(f"Successfully transferred {transfer_quantity:.1f} MT from {source_tank} to {destination_tank}")
 
         # If destination tank was empty, update its fuel grade to match source tank
-        if st.session_state.current_rob[destination_tank] - transfer_quantity <= 0:
+        if destination_was_empty:
             st.session_state.fuel_grades[destination_tank] = st.session_state.fuel_grades[source_tank]
             st.info(f"Fuel grade of {destination_tank} updated to {st.session_state.fuel_grades[source_tank]}")
 
-    # Display transfer history
-    if st.session_state.tank_transfer_history:
-        st.subheader("Transfer History")
-
-        # Create a DataFrame from the transfer history
-        history_df = pd.DataFrame(st.session_state.tank_transfer_history)
-
-        # Format the DataFrame for display
-        if not history_df.empty:
-            history_df = history_df.rename(columns={
-                'timestamp': 'Timestamp',
-                'from_tank': 'From Tank',
-                'to_tank': 'To Tank',
-                'quantity': 'Quantity (MT)',
-                'from_fuel_grade': 'Source Fuel Grade',
-                'to_fuel_grade': 'Destination Fuel Grade'
-            })
-
-            # Display the history table
-            st.dataframe(
-                history_df,
-                use_container_width=True,
-                column_config={
-                    'Quantity (MT)': st.column_config.NumberColumn(format="%.1f")
-                }
-            )
+    # Display the operation history, straight from the ledger's columns
+    if len(operations):
+        st.subheader("Tank Operation History")
+        st.dataframe(
+            operations.history(),
+            use_container_width=True,
+            column_config={
+                'Quantity (MT)': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
 
-            # Add a button to clear history
-            if st.button("Clear Transfer History"):
-                st.session_state.tank_transfer_history = []
-                st.experimental_rerun()
+def record_rob_corrections(editor_key, tanks):
+    """Books edited Current ROB cells as survey corrections, once each.
+
+    The editor reports every edit made so far on each change, so edits that
+    were already booked are remembered and skipped.
+    """
+    operations = st.session_state.tank_operations
+    booked = st.session_state.setdefault('booked_rob_edits', {})
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        tank, value = tanks[int(row)], changes.get('Current ROB')
+        if value is None or booked.get(tank) == value:
+            continue
+        booked[tank] = value
+        if value != operations.rob(tank):
+            operations.append(OP_SURVEY, value - operations.rob(tank), to_tank=tank, reference="Current ROB edit")
 
 def edit_tank_properties():
     # Add checkboxes for bunkering record, debunkering record, and Bunker Survey
@@ -445,8 +589,6 @@ def edit_tank_properties():
         if tank_name not in st.session_state.fuel_grades:
             # Assign one of the enhanced fuel grade options randomly
             st.session_state.fuel_grades[tank_name] = random.choice(fuel_grade_options)
-        if tank_name not in st.session_state.current_rob:
-            st.session_state.current_rob[tank_name] = np.random.uniform(50, 500)
 
     # Create the base DataFrame - Add BDN number column
     tank_props = pd.DataFrame({
@@ -454,7 +596,7 @@ def edit_tank_properties():
         'BDN Number': st.session_state.bdn_numbers,
         'Viscosity': [st.session_state.viscosity[f'Tank {i}'] for i in range(1, 9)],
         'Sulfur (%)': [st.session_state.sulfur[f'Tank {i}'] for i in range(1, 9)],
-        'Current ROB': [st.session_state.current_rob.get(f'Tank {i}', np.random.uniform(50, 500)) for i in range(1, 9)]
+        'Current ROB': [st.session_state.tank_operations.rob(f'Tank {i}') for i in range(1, 9)]
     }, index=[f'Tank {i}' for i in range(1, 9)])
 
     # Add columns based on checked options
@@ -500,11 +642,13 @@ def edit_tank_properties():
             'Survey Correction qty(mT)', min_value=-100.0, max_value=100.0, step=0.1, format="%.1f"
         )
 
+    editor_key = keys("edit_tank_properties_editor")
     edited_props = st.data_editor(
         tank_props,
         use_container_width=True,
         column_config=column_config,
-        key=f"edit_tank_properties_editor_{uuid.uuid4()}"
+        key=editor_key,
+        on_change=lambda: record_rob_corrections(editor_key, list(tank_props.index)),
     )
 
     # Update session state with edited values
@@ -513,11 +657,25 @@ def edit_tank_properties():
         st.session_state.viscosity[tank_name] = edited_props.loc[tank_name, 'Viscosity']
         st.session_state.sulfur[tank_name] = edited_props.loc[tank_name, 'Sulfur (%)']
         st.session_state.fuel_grades[tank_name] = edited_props.loc[tank_name, 'Fuel Grade']
-        st.session_state.current_rob[tank_name] = edited_props.loc[tank_name, 'Current ROB']
         st.session_state.bdn_numbers[i-1] = edited_props.loc[tank_name, 'BDN Number']
 
     return edited_props
 
+def display_fuel_lineage():
+    """Blend and BDN make-up of every tank, replayed from the tank operation log."""
+    lineage = st.session_state.fuel_lineage.sync(st.session_state.tank_operations)
+    st.subheader("Tank Blend by BDN")
+    st.dataframe(
+        lineage.blend().join(lineage.fractions().mul(100).loc[:, lambda shares: shares.any()]),
+        use_container_width=True,
+        column_config={
+            'Mass (mt)': st.column_config.NumberColumn(format="%.1f"),
+            'Viscosity (cSt)': st.column_config.NumberColumn(format="%.1f"),
+            'Sulphur (%)': st.column_config.NumberColumn(format="%.2f"),
+            **{bdn: st.column_config.NumberColumn(f"{bdn} (%)", format="%.1f") for bdn in lineage.bdns},
+        }
+    )
+
 def main():
     initialize_session_state()
 
@@ -525,20 +683,30 @@ def main():
     enhanced_fuel_grade_options = ['VLSFO - HFO', 'VLSFO - LFO', 'MGO', 'HSFO - HFO', 'HSFO- LFO', 'HFO', 'LFO']
     for tank in st.session_state.tanks:
         st.session_state.fuel_grades[tank] = random.choice(enhanced_fuel_grade_options)
-    st.title("Fuel Consumption Report - Tank Sounding Method")
+    select_vessel()
+    with recording_keys(PAGE):
+        st.title("Fuel Consumption Report - Tank Sounding Method")
 
-    # Display the tank sounding method report with fuel types as columns
-    display_tank_sounding_report()
+        # Display the tank sounding method report with fuel types as columns
+        display_tank_sounding_report()
 
-    # Display additional table for other consumption data
-    display_additional_table()
+        # Display additional table for other consumption data
+        display_additional_table()
 
-    # Tank properties editor is always shown (no checkbox needed)
-    st.subheader("Tank Properties")
-    edit_tank_properties()
+        display_tank_soundings()
+
+        # Tank properties editor is always shown (no checkbox needed)
+        st.subheader("Tank Properties")
+        edit_tank_properties()
+        display_fuel_lineage()
 
     if st.button("Submit Report", type="primary"):
-        st.success("Report submitted successfully!")
+        vessel = current_vessel()
+        if vessel is None:
+            st.error("Enter the vessel's IMO number in the sidebar before submitting.")
+        else:
+            get_report_store().save_report("Fuel Consumption", vessel, scope_values(PAGE))
+            st.success("Report submitted successfully!")
 
 if __name__ == "__main__":
     main()
@@ -3,10 +3,23 @@ import pandas as pd
 import numpy as np
 import random
 import string
-import uuid
+
+from consumption_model import (METHOD_BDN, METHOD_CTMS, METHOD_FLOWMETER, METHOD_SOUNDING, ABS_TOLERANCE,
+                               REL_TOLERANCE, ConsumptionModel)
+from lng_consumption import (CARGO_DISCHARGED, CARGO_LOADED, CTMS_QTY, DENSITY, N2_CORRECTION, PREVIOUS_CTMS_QTY,
+                             TOTAL_LNG, ctms_history, lng_consumption)
+from report_forms import current_vessel, get_report_store, recording_keys, scope_values, select_vessel
+from volume_correction import mass_in_air
+from widget_keys import WidgetKeys
 
 st.set_page_config(layout="wide", page_title="Fuel Consumption Report")
 
+PAGE = "FOC_data_collection"
+keys = WidgetKeys(PAGE)
+
+CTMS_FUELS = ['HFO', 'LFO', 'MGO/MDO', 'LNG']
+FUEL_TYPE_ALIASES = {"MGO": "MGO/MDO"}  # typed fuel names that differ from the report's fuel types
+
 def generate_random_bdn_numbers():
     """Generates three unique random alphanumeric BDN numbers (8 characters)."""
     return [''.join(random.choices(string.ascii_uppercase + string.digits, k=8)) for _ in range(3)]
@@ -41,13 +54,92 @@ def initialize_session_state():
     if 'consumption_data_fuel' not in st.session_state:
         st.session_state.consumption_data_fuel = pd.DataFrame(0, index=st.session_state.consumers, columns=st.session_state.fuel_types)
 
-    if 'consumption_data_tank' not in st.session_state:
-        st.session_state.consumption_data_tank = pd.DataFrame(0, index=st.session_state.consumers, columns=st.session_state.tanks)
+    if 'tank_fuel_types' not in st.session_state:
+        st.session_state.tank_fuel_types = {tank: random.choice(['LFO', 'MGO/MDO', 'HFO']) for tank in st.session_state.tanks}
+
+    if 'tank_bdn_numbers' not in st.session_state:
+        bdn_numbers = generate_random_bdn_numbers()
+        st.session_state.tank_bdn_numbers = {tank: bdn_numbers[i % 3] for i, tank in enumerate(st.session_state.tanks)}
+
+    if 'previous_rob_ctms' not in st.session_state:
+        st.session_state.previous_rob_ctms = pd.Series({fuel: np.random.uniform(100, 1000) for fuel in CTMS_FUELS})
 
     if 'consumption_data_flowmeter' not in st.session_state:
-        st.session_state.consumption_data_flowmeter = pd.DataFrame(0, index=st.session_state.consumers, 
-                                                                   columns=["Flowmeter In", "Flowmeter Out", "Temp at flowmeter", 
-                                                                            "Density @ 15°C", "Fuel Type", "Total Consumption (mT)"])
+        consumers = st.session_state.consumers
+        flowmeter_in = np.random.uniform(10, 50, len(consumers))
+        df = pd.DataFrame({
+            "Flowmeter In": flowmeter_in,
+            "Flowmeter Out": flowmeter_in * np.random.uniform(0.6, 0.95, len(consumers)),
+            "Temp at flowmeter": np.random.uniform(40, 130, len(consumers)),
+            "Density @ 15°C": np.random.uniform(840, 991, len(consumers)),
+            "Fuel Type": [random.choice(["LFO", "MGO/MDO", "HFO"]) for _ in consumers],
+        }, index=consumers)
+        df["Total Consumption (mT)"] = flowmeter_totals(df)
+        st.session_state.consumption_data_flowmeter = df
+
+    # CTMS gauges recorded so far; the latest one is the previous gauge of the next report
+    if 'ctms_readings' not in st.session_state:
+        st.session_state.ctms_readings = pd.DataFrame({
+            'timestamp': [pd.Timestamp.now().floor('min') - pd.Timedelta(days=1)],
+            CTMS_QTY: [np.random.uniform(100000, 150000)],
+            CARGO_LOADED: [0.0],
+            CARGO_DISCHARGED: [0.0],
+            DENSITY: [np.random.uniform(0.43, 0.47)],
+            N2_CORRECTION: [0.0],
+        })
+
+    if 'ctms_specific_data' not in st.session_state:
+        st.session_state.ctms_specific_data = new_ctms_gauge(st.session_state.ctms_readings.iloc[-1])
+
+    # Every method's figures in one model, so switching views only reads it; BDN and CTMS figures start unreported
+    if 'consumption_model' not in st.session_state:
+        consumers, tanks = st.session_state.consumers, st.session_state.tanks
+        model = ConsumptionModel(consumers, st.session_state.fuel_types, tanks, st.session_state.tank_fuel_types)
+        model.set_frame(METHOD_SOUNDING, pd.DataFrame(np.random.uniform(0, 50, (len(consumers), len(tanks))), index=consumers, columns=tanks))
+        st.session_state.consumption_model = model
+        update_flowmeter_figures()
+
+def new_ctms_gauge(previous):
+    """CTMS table of the next report, continuing from the previous gauge."""
+    df = pd.DataFrame({'Value': {
+        PREVIOUS_CTMS_QTY: previous[CTMS_QTY],
+        CTMS_QTY: previous[CTMS_QTY] - np.random.uniform(100, 300),
+        CARGO_LOADED: 0.0,
+        CARGO_DISCHARGED: 0.0,
+        DENSITY: previous[DENSITY],
+        N2_CORRECTION: 0.0,
+    }})
+    df.loc[TOTAL_LNG] = ctms_total(df['Value'])
+    return df
+
+def ctms_total(values):
+    return float(lng_consumption(values[PREVIOUS_CTMS_QTY], values[CTMS_QTY], values[CARGO_LOADED],
+                                 values[CARGO_DISCHARGED], values[DENSITY], values[N2_CORRECTION]))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_ctms_history(readings):
+    """Consumption and boil-off of every recorded CTMS interval, recomputed only when the readings change."""
+    return readings.join(ctms_history(readings, time_col='timestamp'))
+
+def update_flowmeter_figures():
+    df = st.session_state.consumption_data_flowmeter
+    st.session_state.consumption_model.set_consumer_totals(METHOD_FLOWMETER, df["Total Consumption (mT)"], df["Fuel Type"])
+
+def update_ctms_figures():
+    """CTMS LNG figures of the consumers from the gauge's total; True when the other methods' LNG figures split it."""
+    total = st.session_state.ctms_specific_data.loc[TOTAL_LNG, 'Value']
+    return st.session_state.consumption_model.set_fuel_total(METHOD_CTMS, 'LNG', total)
+
+def as_number(value):
+    """Number typed into an editor cell; blank or text is NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def flowmeter_totals(df):
+    """Consumption (mT) of every consumer: In - Out volume (m³) at flowmeter temperature, corrected to 15 °C and weighed in air."""
+    return mass_in_air(df["Flowmeter In"] - df["Flowmeter Out"], df["Density @ 15°C"], df["Temp at flowmeter"])
 
 def display_fuel_consumption_report():
     def create_editable_dataframe():
@@ -66,36 +158,59 @@ def display_fuel_consumption_report():
         df,
         use_container_width=True,
         num_rows="dynamic",
-        key=f"fuel_consumption_editor_{uuid.uuid4()}"
+        key=keys("fuel_consumption_editor")
     )
 
     st.session_state.consumption_data_fuel = edited_df.loc[st.session_state.consumers]
     st.session_state.previous_rob_fuel = edited_df.loc['Previous ROB']
 
-def display_bdn_consumption_report():
-    def create_editable_dataframe():
-        index = ['BDN Number', 'Previous ROB'] + st.session_state.consumers + ['Current ROB']
-        df = pd.DataFrame(index=index, columns=st.session_state.tanks)
-        bdn_numbers = generate_random_bdn_numbers()
-        df.loc['BDN Number'] = [bdn_numbers[i % 3] for i in range(len(st.session_state.tanks))]
-        df.loc['Previous ROB'] = st.session_state.previous_rob_tank
-        df.loc[st.session_state.consumers] = st.session_state.consumption_data_tank
-        total_consumption = pd.to_numeric(df.loc[st.session_state.consumers].sum(), errors='coerce').fillna(0)
-        df.loc['Current ROB'] = pd.to_numeric(df.loc['Previous ROB'], errors='coerce').fillna(0) - total_consumption
-        return df
-
-    df = create_editable_dataframe()
-    
-    st.subheader("BDN Based Fuel Consumption Data")
-    edited_df = st.data_editor(
+def tank_method_table(method, header_rows):
+    """Consumer x tank table of a tank based method, read from the consumption model."""
+    consumers = st.session_state.consumers
+    consumption = st.session_state.consumption_model.frame(method)
+    df = pd.DataFrame(index=header_rows + ['Previous ROB'] + consumers + ['Current ROB'], columns=st.session_state.tanks)
+    if 'Fuel Type' in header_rows:
+        df.loc['Fuel Type'] = pd.Series(st.session_state.tank_fuel_types)
+    if 'BDN Number' in header_rows:
+        df.loc['BDN Number'] = pd.Series(st.session_state.tank_bdn_numbers)
+    df.loc['Previous ROB'] = st.session_state.previous_rob_tank
+    df.loc[consumers] = consumption.astype(object).where(consumption.notna(), None)
+    df.loc['Current ROB'] = st.session_state.previous_rob_tank - consumption.sum()
+    return df
+
+def apply_tank_method_edits(method, editor_key, index):
+    """Writes edited cells of a tank based table into the consumption model and the tank details."""
+    model = st.session_state.consumption_model
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        label = index[int(row)]
+        for tank, value in changes.items():
+            if label == 'Fuel Type':
+                fuel = FUEL_TYPE_ALIASES.get(value, value)
+                if fuel in model.fuel_index:
+                    st.session_state.tank_fuel_types[tank] = fuel
+                    model.set_tank_fuel(tank, fuel)
+            elif label == 'BDN Number':
+                st.session_state.tank_bdn_numbers[tank] = value
+            elif label == 'Previous ROB':
+                st.session_state.previous_rob_tank[tank] = as_number(value)
+            elif label in model.consumer_index:
+                model.set_value(method, label, tank, as_number(value))
+
+def display_tank_method_report(method, header_rows, title, editor_name):
+    df = tank_method_table(method, header_rows)
+    editor_key = keys(editor_name)
+
+    st.subheader(title)
+    st.data_editor(
         df,
         use_container_width=True,
-        num_rows="dynamic",
-        key=f"bdn_consumption_editor_{uuid.uuid4()}"
+        num_rows="fixed",
+        key=editor_key,
+        on_change=lambda: apply_tank_method_edits(method, editor_key, df.index),
     )
 
-    st.session_state.consumption_data_tank = edited_df.loc[st.session_state.consumers]
-    st.session_state.previous_rob_tank = edited_df.loc['Previous ROB']
+def display_bdn_consumption_report():
+    display_tank_method_report(METHOD_BDN, ['BDN Number'], "BDN Based Fuel Consumption Data", "bdn_consumption_editor")
 
 def display_additional_table(fuel_type_view):
     st.subheader("Additional Consumption Data")
@@ -141,89 +256,71 @@ def display_additional_table(fuel_type_view):
         use_container_width=True,
         num_rows="dynamic",
         column_config=column_config,
-        key=f"additional_consumption_editor_{uuid.uuid4()}"
+        key=keys("additional_consumption_editor", fuel_type_view)
     )
 
     return edited_additional_data
 
+def apply_flowmeter_edits(editor_key):
+    """Writes edited cells into the flowmeter table and recomputes every consumer's total in one pass."""
+    df = st.session_state.consumption_data_flowmeter
+    fuel_index = st.session_state.consumption_model.fuel_index
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        for column, value in changes.items():
+            if column == "Fuel Type" and value not in fuel_index:
+                continue  # only the model's fuels can take the consumer's total
+            df.iloc[int(row), df.columns.get_loc(column)] = value
+    df["Total Consumption (mT)"] = flowmeter_totals(df)
+    update_flowmeter_figures()
+
 def display_flowmeter_method_report():
-    def create_editable_dataframe():
-        index = st.session_state.consumers
-        flowmeter_columns = [
-            "Flowmeter In", "Flowmeter Out", "Temp at flowmeter", 
-            "Density @ 15°C", "Fuel Type", "Total Consumption (mT)"
-        ]
-        df = pd.DataFrame(0, index=index, columns=flowmeter_columns)
-        fuel_types = ["LFO", "MGO", "HFO"]
-        for consumer in st.session_state.consumers:
-            row_data = [np.random.uniform(10, 50) for _ in range(len(flowmeter_columns) - 2)]
-            row_data.append(random.choice(fuel_types))
-            row_data.append(np.random.uniform(1, 10))
-            df.loc[consumer] = row_data
-        return df
+    editor_key = keys("flowmeter_consumption_editor")
 
-    df = create_editable_dataframe()
-    
     st.subheader("Flowmeter Method Fuel Consumption Data")
-    edited_df = st.data_editor(
-        df,
+    st.data_editor(
+        st.session_state.consumption_data_flowmeter,
         use_container_width=True,
         num_rows="fixed",
-        key=f"flowmeter_consumption_editor_{uuid.uuid4()}"
+        column_config={
+            "Total Consumption (mT)": st.column_config.NumberColumn(disabled=True, format="%.3f"),
+            "Fuel Type": st.column_config.SelectboxColumn(
+                "Fuel Type", options=st.session_state.consumption_model.fuels, required=True
+            ),
+        },
+        key=editor_key,
+        on_change=lambda: apply_flowmeter_edits(editor_key),
     )
 
-    st.session_state.consumption_data_flowmeter = edited_df
-
 def display_tank_sounding_report():
-    def create_editable_dataframe():
-        index = ['Fuel Type', 'BDN Number', 'Previous ROB'] + st.session_state.consumers + ['Current ROB']
-        tanks = [f'Tank {i}' for i in range(1, 9)]
-        df = pd.DataFrame(index=index, columns=tanks)
-        fuel_types = ["LFO", "MGO", "HFO"]
-        df.loc['Fuel Type'] = [random.choice(fuel_types) for _ in tanks]
-        bdn_numbers = generate_random_bdn_numbers()
-        df.loc['BDN Number'] = [bdn_numbers[i % 3] for i in range(len(tanks))]
-        df.loc['Previous ROB'] = [np.random.uniform(100, 1000) for _ in tanks]
-        for consumer in st.session_state.consumers:
-            df.loc[consumer] = [np.random.uniform(0, 50) for _ in tanks]
-        consumption = df.loc[st.session_state.consumers].sum()
-        df.loc['Current ROB'] = df.loc['Previous ROB'] - consumption
-        return df
-
-    df = create_editable_dataframe()
-    
-    st.subheader("Tank Sounding Method Fuel Consumption Data")
-    edited_df = st.data_editor(
-        df,
-        use_container_width=True,
-        num_rows="dynamic",
-        key=f"tank_sounding_editor_{uuid.uuid4()}"
-    )
+    display_tank_method_report(METHOD_SOUNDING, ['Fuel Type', 'BDN Number'], "Tank Sounding Method Fuel Consumption Data",
+                               "tank_sounding_editor")
 
-    st.session_state.consumption_data_tank_sounding = edited_df.loc[st.session_state.consumers]
-    st.session_state.previous_rob_tank_sounding = edited_df.loc['Previous ROB']
-
-def display_ctms_method_report():
+def display_ctms_method_report(lng_split):
     def create_editable_dataframe():
-        index = ['Previous ROB'] + st.session_state.consumers + ['Current ROB']
-        columns = ['HFO', 'LFO', 'MGO/MDO', 'LNG']
-        df = pd.DataFrame(0, index=index, columns=columns)
-        df.loc['Previous ROB'] = [np.random.uniform(100, 1000) for _ in range(len(columns))]
-        for consumer in st.session_state.consumers:
-            df.loc[consumer] = [np.random.uniform(0, 50) for _ in range(len(columns))]
-        df.loc['Current ROB'] = df.loc['Previous ROB'] - df.loc[st.session_state.consumers].sum()
+        consumption = st.session_state.consumption_model.frame(METHOD_CTMS)[CTMS_FUELS]
+        total = consumption.sum()
+        total['LNG'] = st.session_state.ctms_specific_data.loc[TOTAL_LNG, 'Value']  # also when it is not split
+        df = pd.DataFrame(index=['Previous ROB'] + st.session_state.consumers + ['Current ROB'], columns=CTMS_FUELS, dtype=np.float64)
+        df.loc['Previous ROB'] = st.session_state.previous_rob_ctms
+        df.loc[st.session_state.consumers] = consumption
+        df.loc['Current ROB'] = st.session_state.previous_rob_ctms - total
         return df
 
-    def create_ctms_specific_dataframe():
-        index = ['CTMS qty (m3)', 'Cargo loaded (m3)', 'Cargo discharged (m3)', 'Density', 'N2 correction', 'Total LNG consumption (mT)']
-        df = pd.DataFrame(0, index=index, columns=['Value'])
-        df.loc['CTMS qty (m3)'] = np.random.uniform(1000, 5000)
-        df.loc['Cargo loaded (m3)'] = np.random.uniform(500, 2000)
-        df.loc['Cargo discharged (m3)'] = np.random.uniform(500, 2000)
-        df.loc['Density'] = np.random.uniform(0.4, 0.5)
-        df.loc['N2 correction'] = np.random.uniform(-5, 5)
-        df.loc['Total LNG consumption (mT)'] = np.random.uniform(50, 200)
-        return df
+    def apply_consumer_edits(editor_key, index):
+        model = st.session_state.consumption_model
+        for row, changes in st.session_state[editor_key]["edited_rows"].items():
+            label = index[int(row)]
+            for fuel, value in changes.items():
+                if label == 'Previous ROB':
+                    st.session_state.previous_rob_ctms[fuel] = as_number(value)
+                elif label in model.consumer_index:
+                    model.set_value(METHOD_CTMS, label, fuel, as_number(value))
+
+    def apply_ctms_edits(editor_key):
+        df = st.session_state.ctms_specific_data
+        for row, changes in st.session_state[editor_key]["edited_rows"].items():
+            df.iloc[int(row), 0] = changes.get('Value', df.iloc[int(row), 0])
+        df.loc[TOTAL_LNG, 'Value'] = ctms_total(df['Value'])
 
     st.subheader("CTMS Method Fuel Consumption Data")
     
@@ -231,29 +328,72 @@ def display_ctms_method_report():
     
     with col1:
         df = create_editable_dataframe()
+        consumer_key = keys("ctms_method_editor")
         edited_df = st.data_editor(
             df,
             use_container_width=True,
-            num_rows="dynamic",
-            key=f"ctms_method_editor_{uuid.uuid4()}"
+            num_rows="fixed",
+            key=consumer_key,
+            disabled=['LNG'],
+            on_change=lambda: apply_consumer_edits(consumer_key, df.index),
         )
-
-        st.session_state.consumption_data_ctms = edited_df.loc[st.session_state.consumers]
-        st.session_state.previous_rob_ctms = edited_df.loc['Previous ROB']
+        if lng_split:
+            st.caption(f"LNG figures split the gauges' {TOTAL_LNG} in proportion to the other methods' LNG figures.")
+        else:
+            st.caption(f"No other method reports LNG per consumer, so the gauges' {TOTAL_LNG} is not split across consumers.")
 
     with col2:
-        ctms_df = create_ctms_specific_dataframe()
-        edited_ctms_df = st.data_editor(
-            ctms_df,
+        readings = st.session_state.ctms_readings
+        # A fresh editor for every new gauge, so edits of the last one do not carry over
+        ctms_key = keys("ctms_specific_editor", len(readings))
+        st.data_editor(
+            st.session_state.ctms_specific_data,
             use_container_width=True,
             num_rows="fixed",
-            key=f"ctms_specific_editor_{uuid.uuid4()}"
+            key=ctms_key,
+            on_change=lambda: apply_ctms_edits(ctms_key),
         )
+        edited_ctms_df = st.session_state.ctms_specific_data
+        st.caption(f"{TOTAL_LNG} is computed from the gauges, cargo operations, density and N2 correction.")
 
-        st.session_state.ctms_specific_data = edited_ctms_df
+        if st.button("Record CTMS Gauge"):
+            values = edited_ctms_df['Value']
+            reading = {'timestamp': pd.Timestamp.now().floor('min')}
+            reading.update({name: values[name] for name in (CTMS_QTY, CARGO_LOADED, CARGO_DISCHARGED, DENSITY, N2_CORRECTION)})
+            st.session_state.ctms_readings = pd.concat([readings, pd.DataFrame([reading])], ignore_index=True)
+            st.session_state.ctms_specific_data = new_ctms_gauge(st.session_state.ctms_readings.iloc[-1])
+            st.rerun()
+
+    if len(st.session_state.ctms_readings) > 1:
+        st.markdown("CTMS history")
+        st.dataframe(cached_ctms_history(st.session_state.ctms_readings), use_container_width=True)
 
     return edited_df, edited_ctms_df
 
+def display_method_reconciliation():
+    """Figures of every consumer and fuel on which the methods disagree beyond the tolerances."""
+    with st.expander("⚖️ Method Reconciliation"):
+        col1, col2 = st.columns(2)
+        with col1:
+            rel_tolerance = st.number_input("Tolerance (%)", min_value=0.0, value=REL_TOLERANCE * 100, step=0.5,
+                                            key=keys("reconciliation_rel_tolerance")) / 100
+        with col2:
+            abs_tolerance = st.number_input("Minimum difference (mT)", min_value=0.0, value=ABS_TOLERANCE, step=0.1,
+                                            key=keys("reconciliation_abs_tolerance"))
+        figures = st.session_state.consumption_model.reconcile(rel_tolerance, abs_tolerance)
+        breached = figures.groupby(["Consumer", "Fuel"])["Breach"].transform("any")
+        if not breached.any():
+            st.success("All methods agree within the tolerances.")
+            return
+        st.warning(f"{figures.loc[breached, ['Consumer', 'Fuel']].drop_duplicates().shape[0]} consumer/fuel figures differ between methods.")
+        st.dataframe(
+            figures[breached].style.apply(
+                lambda row: ["background-color: #ffd6d6" if row["Breach"] else ""] * len(row), axis=1
+            ).format(precision=3),
+            use_container_width=True,
+            hide_index=True,
+        )
+
 def display_bunkering_details():
     st.markdown("<h4 style='font-size: 18px;'>Bunkering Details</h4>", unsafe_allow_html=True)
     if 'bunkering_entries' not in st.session_state:
@@ -280,7 +420,7 @@ def display_bunkering_details():
         entry['tanks'] = st.multiselect("Select Tanks", st.session_state.tanks, key=f"bunkering_tanks_{i}")
     if st.button("➕ Add Bunkering Entry"):
         st.session_state.bunkering_entries.append({})
-        st.experimental_rerun()
+        st.rerun()
 
 def display_debunkering_details():
     st.markdown("<h4 style='font-size: 18px;'>Debunkering Details</h4>", unsafe_allow_html=True)
@@ -300,7 +440,7 @@ def display_debunkering_details():
         entry['tanks'] = st.multiselect("Select Tanks", st.session_state.tanks, key=f"debunkering_tanks_{i}")
     if st.button("➕ Add Debunkering Entry"):
         st.session_state.debunkering_entries.append({})
-        st.experimental_rerun()
+        st.rerun()
 
 def edit_tank_properties():
     st.write("Edit tank properties:")
@@ -390,7 +530,7 @@ def edit_tank_properties():
         tank_props,
         use_container_width=True,
         column_config=column_config,
-        key=f"edit_tank_properties_editor_{uuid.uuid4()}"
+        key=keys("edit_tank_properties_editor")
     )
     
     for i in range(1, 9):
@@ -424,45 +564,57 @@ def edit_tank_properties():
 def main():
     initialize_session_state()
 
-    st.title("Fuel Consumption Report")
-
-    col1, col2, col3, col4, col5 = st.columns(5)
-    with col1:
-        fuel_type_view = st.checkbox("Fuel Type based", value=True)
-    with col2:
-        bdn_view = st.checkbox("BDN based", value=False)
-    with col3:
-        flowmeter_method = st.checkbox("Flowmeter Method", value=False)
-    with col4:
-        tank_sounding_method = st.checkbox("Tank Sounding Method", value=False)
-    with col5:
-        ctms_method = st.checkbox("CTMS Method", value=False)
-
-    if sum([fuel_type_view, bdn_view, flowmeter_method, tank_sounding_method, ctms_method]) > 1:
-        st.warning("Please select only one view type.")
-        st.stop()
-    elif not fuel_type_view and not bdn_view and not flowmeter_method and not tank_sounding_method and not ctms_method:
-        st.warning("Please select a view type.")
-        st.stop()
+    select_vessel()
+    with recording_keys(PAGE):
+        st.title("Fuel Consumption Report")
 
-    if fuel_type_view:
-        display_fuel_consumption_report()
-    elif bdn_view:
-        display_bdn_consumption_report()
-    elif flowmeter_method:
-        display_flowmeter_method_report()
-    elif tank_sounding_method:
-        display_tank_sounding_report()
-    elif ctms_method:
-        display_ctms_method_report()
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            fuel_type_view = st.checkbox("Fuel Type based", value=True)
+        with col2:
+            bdn_view = st.checkbox("BDN based", value=False)
+        with col3:
+            flowmeter_method = st.checkbox("Flowmeter Method", value=False)
+        with col4:
+            tank_sounding_method = st.checkbox("Tank Sounding Method", value=False)
+        with col5:
+            ctms_method = st.checkbox("CTMS Method", value=False)
+
+        if sum([fuel_type_view, bdn_view, flowmeter_method, tank_sounding_method, ctms_method]) > 1:
+            st.warning("Please select only one view type.")
+            st.stop()
+        elif not fuel_type_view and not bdn_view and not flowmeter_method and not tank_sounding_method and not ctms_method:
+            st.warning("Please select a view type.")
+            st.stop()
+
+        # Before any view reads the model, so every view and the reconciliation see the latest gauge
+        lng_split = update_ctms_figures()
+        if fuel_type_view:
+            display_fuel_consumption_report()
+        elif bdn_view:
+            display_bdn_consumption_report()
+        elif flowmeter_method:
+            display_flowmeter_method_report()
+        elif tank_sounding_method:
+            display_tank_sounding_report()
+        elif ctms_method:
+            display_ctms_method_report(lng_split)
     
-    display_additional_table(fuel_type_view)
 
-    if st.checkbox("Edit Tank Properties"):
-        edit_tank_properties()
+        display_method_reconciliation()
+
+        display_additional_table(fuel_type_view)
+
+        if st.checkbox("Edit Tank Properties"):
+            edit_tank_properties()
 
     if st.button("Submit Report", type="primary"):
-        st.success("Report submitted successfully!")
+        vessel = current_vessel()
+        if vessel is None:
+            st.error("Enter the vessel's IMO number in the sidebar before submitting.")
+        else:
+            get_report_store().save_report("Fuel Consumption", vessel, scope_values(PAGE))
+            st.success("Report submitted successfully!")
 
 if __name__ == "__main__":
     main()
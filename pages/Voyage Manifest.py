@@ -142,7 +142,7 @@ def voyage_itinerary():
                 new_row = pd.DataFrame([{"Leg ID": insert_index + 0.5}])
                 voyage['itinerary'] = pd.concat([voyage['itinerary'].iloc[:insert_index+1], new_row, voyage['itinerary'].iloc[insert_index+1:]], ignore_index=True)
                 voyage['itinerary']['Leg ID'] = range(len(voyage['itinerary']))
-                st.experimental_rerun()
+                st.rerun()
 
     # Display leg details
     show_leg_details = st.checkbox("Show Leg Details", value=voyage.get('show_leg_details', False))
@@ -315,7 +315,7 @@ def display_voyage_manifest():
     with col2:
         if st.button("Toggle Edit Mode"):
             st.session_state.edit_mode = not st.session_state.edit_mode
-            st.experimental_rerun()
+            st.rerun()
 
     with col3:
         if st.button("Open Voyage"):
@@ -376,7 +376,7 @@ def display_past_voyages():
             with col4:
                 if st.button("View", key=f"view_{voyage['id']}"):
                     st.session_state.current_voyage = voyage
-                    st.experimental_rerun()
+                    st.rerun()
 
 def main():
     st.title("Voyage Manifest")
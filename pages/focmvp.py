@@ -3,11 +3,16 @@ import pandas as pd
 import numpy as np
 import random
 import string
-import uuid
 from datetime import datetime
 
+from report_forms import current_vessel, get_report_store, recording_keys, scope_values, select_vessel
+from widget_keys import WidgetKeys
+
 st.set_page_config(layout="wide", page_title="Tank Sounding Method")
 
+PAGE = "focmvp"
+keys = WidgetKeys(PAGE)
+
 def generate_random_bdn_numbers():
     """Generates three unique random alphanumeric BDN numbers (8 characters)."""
     return [''.join(random.choices(string.ascii_uppercase + string.digits, k=8)) for _ in range(3)]
@@ -126,7 +131,7 @@ def display_tank_sounding_report():
             
         if st.button("➕ Add Bunkering Entry"):
             st.session_state.bunkering_entries.append({})
-            st.experimental_rerun()
+            st.rerun()
 
     # Debunkering section
     if debunkering_record:
@@ -147,7 +152,7 @@ def display_tank_sounding_report():
             
         if st.button("➕ Add Debunkering Entry"):
             st.session_state.debunkering_entries.append({})
-            st.experimental_rerun()
+            st.rerun()
 
     # Tank sounding data table
     st.subheader("Fuel Consumption Data")
@@ -157,7 +162,7 @@ def display_tank_sounding_report():
         df,
         use_container_width=True,
         num_rows="dynamic",
-        key=f"tank_sounding_editor_{uuid.uuid4()}"
+        key=keys("tank_sounding_editor")
     )
 
     # Tank transfer section
@@ -188,7 +193,7 @@ def display_tank_sounding_report():
                     format="%.1f"
                 )
             },
-            key=f"tank_transfer_editor_{uuid.uuid4()}"
+            key=keys("tank_transfer_editor")
         )
 
     # Additional consumption data table
@@ -222,15 +227,22 @@ def display_tank_sounding_report():
                 max_chars=50
             )
         },
-        key=f"additional_consumption_editor_{uuid.uuid4()}"
+        key=keys("additional_consumption_editor")
     )
 
     if st.button("Submit Report", type="primary"):
-        st.success("Report submitted successfully!")
+        vessel = current_vessel()
+        if vessel is None:
+            st.error("Enter the vessel's IMO number in the sidebar before submitting.")
+        else:
+            get_report_store().save_report("Fuel Consumption", vessel, scope_values(PAGE))
+            st.success("Report submitted successfully!")
 
 def main():
     initialize_session_state()
-    display_tank_sounding_report()
+    select_vessel()
+    with recording_keys(PAGE):
+        display_tank_sounding_report()
 
 if __name__ == "__main__":
     main()
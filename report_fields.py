@@ -0,0 +1,174 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+from report_sequence import REPORT_TYPES
+from widget_keys import unique_keys
+
+PORTS = [
+    "Singapore", "Rotterdam", "Shanghai", "Ningbo-Zhoushan", "Guangzhou Harbor", "Busan",
+    "Qingdao", "Hong Kong", "Tianjin", "Port Klang", "Antwerp", "Dubai Ports", "Xiamen",
+    "Kaohsiung", "Hamburg", "Los Angeles", "Tanjung Pelepas", "Laem Chabang", "New York-New Jersey",
+    "Dalian", "Tanjung Priok", "Valencia", "Colombo", "Ho Chi Minh City", "Algeciras"
+]
+
+# Define report structures
+REPORT_STRUCTURES = {report_type: ["Vessel Data", "Voyage Data", "Event Data", "Position", "Cargo", "Fuel Consumption", "ROB", "Fuel Allocation", "Machinery", "Weather", "Draft"] for report_type in REPORT_TYPES}
+REPORT_STRUCTURES["ETA update"] = ["Vessel Data", "Voyage Data", "Position"]
+
+# Define section fields
+SECTION_FIELDS = {
+    "Vessel Data": ["Vessel Name", "Vessel IMO"],
+    "Voyage Data": ["Local Date", "Local Time", "UTC Offset", "Voyage ID", "Segment ID", "From Port", "To Port"],
+    "Event Data": ["Event Type", "Time Elapsed (hours)", "Sailing Time (hours)", "Anchor Time (hours)", "DP Time (hours)", "Ice Time (hours)", "Maneuvering (hours)", "Loading/Unloading (hours)", "Drifting (hours)"],
+    "Position": ["Latitude Degrees", "Latitude Minutes", "Latitude Direction", "Longitude Degrees", "Longitude Minutes", "Longitude Direction"],
+    "Cargo": ["Cargo Weight (mt)"],
+    "Fuel Consumption": {
+        "Main Engine": ["ME LFO (mt)", "ME MGO (mt)", "ME LNG (mt)", "ME Other (mt)", "ME Other Fuel Type"],
+        "Auxiliary Engines": ["AE LFO (mt)", "AE MGO (mt)", "AE LNG (mt)", "AE Other (mt)", "AE Other Fuel Type"],
+        "Boilers": ["Boiler LFO (mt)", "Boiler MGO (mt)", "Boiler LNG (mt)", "Boiler Other (mt)", "Boiler Other Fuel Type"]
+    },
+    "ROB": ["LFO ROB (mt)", "MGO ROB (mt)", "LNG ROB (mt)", "Other ROB (mt)", "Other Fuel Type ROB", "Total Fuel ROB (mt)"],
+    "Fuel Allocation": {
+        "Cargo Heating": ["Cargo Heating LFO (mt)", "Cargo Heating MGO (mt)", "Cargo Heating LNG (mt)", "Cargo Heating Other (mt)", "Cargo Heating Other Fuel Type"],
+        "Dynamic Positioning (DP)": ["DP LFO (mt)", "DP MGO (mt)", "DP LNG (mt)", "DP Other (mt)", "DP Other Fuel Type"]
+    },
+    "Machinery": {
+        "Main Engine": ["ME Load (kW)", "ME Load Percentage (%)", "ME Speed (RPM)", "ME Propeller Pitch (m)", "ME Propeller Pitch Ratio", "ME Shaft Generator Power (kW)", "ME Charge Air Inlet Temp (°C)", "ME Scav. Air Pressure (bar)", "ME SFOC (g/kWh)", "ME SFOC ISO Corrected (g/kWh)"],
+        "Auxiliary Engines": {
+            "Auxiliary Engine 1": ["AE1 Load (kW)", "AE1 Charge Air Inlet Temp (°C)", "AE1 Charge Air Pressure (bar)", "AE1 SFOC (g/kWh)", "AE1 SFOC ISO Corrected (g/kWh)"],
+            "Auxiliary Engine 2": ["AE2 Load (kW)", "AE2 Charge Air Inlet Temp (°C)", "AE2 Charge Air Pressure (bar)", "AE2 SFOC (g/kWh)", "AE2 SFOC ISO Corrected (g/kWh)"],
+            "Auxiliary Engine 3": ["AE3 Load (kW)", "AE3 Charge Air Inlet Temp (°C)", "AE3 Charge Air Pressure (bar)", "AE3 SFOC (g/kWh)", "AE3 SFOC ISO Corrected (g/kWh)"]
+        }
+    },
+    "Weather": {
+        "Wind": ["Wind Direction (degrees)", "Wind Speed (knots)", "Wind Force (Beaufort)"],
+        "Sea State": ["Sea State Direction (degrees)", "Sea State Force (Douglas scale)", "Sea State Period (seconds)"],
+        "Swell": ["Swell Direction (degrees)", "Swell Height (meters)", "Swell Period (seconds)"],
+        "Current": ["Current Direction (degrees)", "Current Speed (knots)"],
+        "Temperature": ["Air Temperature (°C)", "Sea Temperature (°C)"]
+    },
+    "Draft": {
+        "Actual": ["Actual Forward Draft (m)", "Actual Aft Draft (m)", "Displacement (mt)", "Water Depth (m)"]
+    }
+}
+
+# Define validation rules
+VALIDATION_RULES = {
+    "ME LFO (mt)": {"min": 0, "max": 25},
+    "ME MGO (mt)": {"min": 0, "max": 25},
+    "ME LNG (mt)": {"min": 0, "max": 25},
+    "ME Other (mt)": {"min": 0, "max": 25},
+    "AE LFO (mt)": {"min": 0, "max": 3},
+    "AE MGO (mt)": {"min": 0, "max": 3},
+    "AE LNG (mt)": {"min": 0, "max": 3},
+    "AE Other (mt)": {"min": 0, "max": 3},
+    "Boiler LFO (mt)": {"min": 0, "max": 4},
+    "Boiler MGO (mt)": {"min": 0, "max": 4},
+    "Boiler LNG (mt)": {"min": 0, "max": 4},
+    "Boiler Other (mt)": {"min": 0, "max": 4},
+}
+
+UNIT_MARKERS = ["(%)", "(mt)", "(kW)", "(°C)", "(bar)", "(g/kWh)", "(knots)", "(meters)", "(seconds)", "(degrees)"]
+COMPASS_POINTS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+ME_FUEL_FIELDS = ["ME LFO (mt)", "ME MGO (mt)", "ME LNG (mt)", "ME Other (mt)"]
+AE_FUEL_FIELDS = ["AE LFO (mt)", "AE MGO (mt)", "AE LNG (mt)", "AE Other (mt)"]
+
+
+class FieldSpec(NamedTuple):
+    label: str
+    key: str
+    kind: str  # "text", "number", "select", "date" or "time"
+    params: dict  # extra widget arguments (bounds, step, format, options)
+    default: str = None  # prefill value name, resolved when the form is rendered
+    hint: str = None  # message shown after the field
+
+
+class FieldGroup(NamedTuple):
+    subsection: str
+    fields: tuple
+
+
+def field_key(prefix, field):
+    return f"{prefix}_{field.lower().replace(' ', '_')}"
+
+
+# Fields with a fixed widget and prefilled value
+FIXED_FIELDS = {
+    "Vessel Name": ("text", {}, "vessel_name"),
+    "Vessel IMO": ("text", {}, "imo_number"),
+    "Local Date": ("date", {}, "current_date"),
+    "Local Time": ("time", {}, "current_time"),
+    "UTC Offset": ("text", {}, "utc_offset"),
+    "From Port": ("select", {"options": PORTS}, "from_port"),
+    "To Port": ("select", {"options": PORTS}, "to_port"),
+    "Voyage ID": ("text", {}, "voyage_id"),
+    "Segment ID": ("text", {}, "segment_id"),
+    "Event Type": ("text", {}, "report_type"),
+    "Latitude Degrees": ("number", {"min_value": 0, "max_value": 89}, "lat_deg"),
+    "Latitude Minutes": ("number", {"min_value": 0.0, "max_value": 59.99, "format": "%.2f"}, "lat_min"),
+    "Latitude Direction": ("select", {"options": ["N", "S"]}, "lat_dir"),
+    "Longitude Degrees": ("number", {"min_value": 0, "max_value": 179}, "lon_deg"),
+    "Longitude Minutes": ("number", {"min_value": 0.0, "max_value": 59.99, "format": "%.2f"}, "lon_min"),
+    "Longitude Direction": ("select", {"options": ["E", "W"]}, "lon_dir"),
+}
+
+
+def compile_field(field, prefix):
+    """Resolves the widget for one field, in the order the form has always used."""
+    key = field_key(prefix, field)
+    if field in FIXED_FIELDS:
+        kind, params, default = FIXED_FIELDS[field]
+        hint = "ais_position" if field == "Longitude Direction" else None
+        return FieldSpec(field, key, kind, params, default, hint=hint)
+    if field in ME_FUEL_FIELDS:
+        default = "me_lfo" if field == "ME LFO (mt)" else None
+        hint = "mfm_figures" if field == "ME Other (mt)" else None
+        return FieldSpec(field, key, "number", {"min_value": 0.0, "max_value": 25.0, "step": 0.1}, default, hint)
+    if field in AE_FUEL_FIELDS:
+        default = "ae_lfo" if field == "AE LFO (mt)" else None
+        hint = "mfm_figures" if field == "AE Other (mt)" else None
+        return FieldSpec(field, key, "number", {"min_value": 0.0, "max_value": 3.0, "step": 0.1}, default, hint)
+    if field.startswith("Boiler"):
+        return FieldSpec(field, key, "number", {"min_value": 0.0, "max_value": 4.0, "step": 0.1})
+    if field in VALIDATION_RULES:
+        rule = VALIDATION_RULES[field]
+        return FieldSpec(field, key, "number", {"min_value": rule["min"], "max_value": rule["max"]})
+    if "SFOC" in field:
+        return FieldSpec(field, key, "number", {}, hint="computed_sfoc")
+    if any(unit in field for unit in UNIT_MARKERS):
+        return FieldSpec(field, key, "number", {})
+    if "Direction" in field and "degrees" not in field:
+        return FieldSpec(field, key, "select", {"options": COMPASS_POINTS})
+    return FieldSpec(field, key, "text", {})
+
+
+def compile_groups(fields, prefix, subsection=None):
+    if isinstance(fields, list):
+        return [FieldGroup(subsection, tuple(compile_field(field, prefix) for field in fields))]
+    if isinstance(fields, dict):
+        groups = []
+        for name, subfields in fields.items():
+            groups += compile_groups(subfields, f"{prefix}_{name}", name)
+        return groups
+    raise TypeError(f"Unexpected field type under {prefix}: {type(fields)}")
+
+
+@lru_cache(maxsize=None)
+def compile_report(report_type):
+    """Flat field-spec table for a report type: a tuple of (section, groups) pairs."""
+    return tuple(
+        (section, tuple(compile_groups(SECTION_FIELDS.get(section, []), f"{report_type}_{section}")))
+        for section in REPORT_STRUCTURES.get(report_type, [])
+    )
+
+
+# Compile every report type once at import, and check that no two fields share a widget key
+for _report_type in REPORT_STRUCTURES:
+    compile_report(_report_type)
+FIELD_KEYS = unique_keys(
+    spec.key
+    for report_type in REPORT_STRUCTURES
+    for _, groups in compile_report(report_type)
+    for group in groups
+    for spec in group.fields
+)
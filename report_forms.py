@@ -0,0 +1,102 @@
+import datetime
+import os
+from contextlib import contextmanager
+
+import streamlit as st
+
+from engine_sfoc import SfocCache, reference_pressures
+from report_store import ReportStore, session_values
+
+VESSEL_IMO = os.getenv("VESSEL_IMO", "1234567")  # selected until the user enters another IMO number
+# Configured vessel profiles, {imo: {field label: value}}: report prefill values and engine shop test data
+# such as "ME Shop Test Scav. Air Pressure (bar)"
+VESSEL_PROFILES = {}
+
+# Widget values a collapsed section keeps; data editor and uploader states cannot be written back
+SECTION_VALUE_TYPES = (str, int, float, list, datetime.date, datetime.time)
+
+
+def keep_section_values(keys):
+    """Keeps the values of widgets that are not rendered in this run.
+
+    Streamlit drops a widget's state when the widget is not rendered on a
+    full rerun; writing the value back makes it plain session state, which
+    survives and fills the widget when it is rendered again.
+    """
+    for key in keys:
+        if isinstance(st.session_state.get(key), SECTION_VALUE_TYPES):
+            st.session_state[key] = st.session_state[key]
+
+
+def recorded_keys(scope, part=None):
+    """Keys recorded for one part (e.g. a section) of a page or form."""
+    return st.session_state.setdefault("widget_keys", {}).setdefault(scope, {}).setdefault(part, set())
+
+
+@contextmanager
+def recording_keys(scope, part=None):
+    """Records the keys added to the session state while rendering, i.e. the keys of the widgets built inside."""
+    keys = recorded_keys(scope, part)
+    known = set(st.session_state.keys())
+    try:
+        yield keys
+    finally:  # also when the page stops or reruns part way
+        keys.update(set(st.session_state.keys()) - known)
+
+
+def scope_values(scope):
+    """Values of the widgets recorded for a page or form, as stored with its report."""
+    keys = set().union(*st.session_state.get("widget_keys", {}).get(scope, {}).values())
+    return session_values({key: value for key, value in st.session_state.items() if key in keys})
+
+
+@st.fragment
+def display_report_section(scope, label, render, *args):
+    """Renders one report section of a form as an independently rerunnable fragment.
+
+    The expander tracks its open state, so a collapsed section builds no widgets,
+    and editing a field inside it reruns only that section. The keys a section
+    adds to the session state are recorded for the form's scope, so collapsing
+    it keeps its values and submitting saves only the form's own fields.
+    """
+    with st.expander(label, key=f"section_{label}", on_change="rerun") as section:
+        if section.open:
+            with recording_keys(scope, label):
+                render(*args)
+        else:
+            keep_section_values(recorded_keys(scope, label))
+
+
+def current_vessel():
+    """IMO number of the vessel reports are filed for, None when none is entered."""
+    return str(st.session_state.get("vessel_imo") or "").strip() or None
+
+
+def select_vessel():
+    """Sidebar input of the vessel's IMO number, shared by every page; returns current_vessel()."""
+    # Writing the value back keeps it while pages without the input run
+    st.session_state.vessel_imo = st.session_state.get("vessel_imo", VESSEL_IMO)
+    st.sidebar.text_input("Vessel IMO Number", key="vessel_imo")
+    return current_vessel()
+
+
+def vessel_pressures(vessel):
+    """Reference charge/scavenge air pressures of the vessel's engines; NaN for engines corrected for temperature only."""
+    return reference_pressures(VESSEL_PROFILES.get(vessel))
+
+
+@st.cache_resource
+def get_report_store():
+    """Report store shared by every session and page (REPORT_DB_URL, SQLite file by default)."""
+    return ReportStore(os.getenv("REPORT_DB_URL", "sqlite:///reports.db"))
+
+
+@st.cache_resource
+def get_sfoc_cache():
+    """SFOC results of stored reports, shared by every session and page."""
+    return SfocCache()
+
+
+def stored_sfoc(vessel):
+    """SFOC and ISO corrected SFOC of the vessel's stored reports, by report id; only new or edited reports are computed."""
+    return get_sfoc_cache().get(get_report_store().load_reports(vessel=vessel), vessel_pressures(vessel))
@@ -0,0 +1,822 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from event_intervals import EventIntervals
+from fuel_ledger import PREVIOUS_ROB, FuelLedger
+from meter_deltas import DELTA_NAMES, MACHINERY_COUNTERS, history_deltas
+from report_forms import current_vessel, display_report_section, get_report_store, scope_values, select_vessel
+from report_positions import dms_to_decimal, haversine_nm
+from report_store import expand_extra
+from rob_chain import RobChain
+from widget_keys import WidgetKeys
+
+REPORT_SECTIONS = (
+    "Voyage Information",
+    "Events",
+    "Speed, Position and Navigation",
+    "Weather and Sea Conditions",
+    "Cargo and Stability",
+    "Fuel Consumption",
+    "Machinery",
+    "Environmental Compliance",
+    "Miscellaneous Consumables",
+)
+FUEL_ADJUSTMENTS = {"Bunkered Qty": 1, "Debunkered Qty": -1, "Bunker Survey Correction": 1}  # row -> sign in Current ROB
+
+
+class ReportPageSpec(NamedTuple):
+    page: str  # widget key scope
+    report_type: str  # report type submissions are stored under
+    event_checkboxes: tuple  # columns of event checkboxes
+    event_label: str = "Events"
+    events_title: str = "Events"
+    special_events_label: str = "Special Events"
+    event_times: tuple = ()  # (label, key name) of extra event timestamps, in LT and UTC
+    bunkering: bool = False  # bunkering/debunkering entries in Fuel Consumption
+    waste_landed: bool = False  # landed-ashore quantities in Environmental Compliance
+    sections: tuple = REPORT_SECTIONS
+
+
+def voyage_information(spec, key):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.text_input("Voyage ID", key=key("voyage_id"))
+        
+        st.write("Last Port")
+        dep_col1, dep_col2 = st.columns(2)
+        with dep_col1:
+            st.text_input("", key="voyage_from", placeholder="Name")
+        with dep_col2:
+            st.text_input("", key="voyage_fromunlo", placeholder="UNLOCODE")
+                
+    with col2:
+        st.text_input("Segment ID", key=key("segment_id"))
+        
+        st.write("Next Port")
+        next_col1, next_col2 = st.columns(2)
+        with next_col1:
+            st.text_input("", key="voyage_to", placeholder="Name")
+        with next_col2:
+            st.text_input("", key="voyage_tounlo", placeholder="UNLOCODE")
+                        
+    with col3:
+        st.selectbox("Vessel Condition", ["", "Laden", "Ballast"], key=key("vessel_condition"))
+        st.date_input("ETA Date Time (LT)", value=datetime.now(), key="eta")
+        st.text_input("Speed Order (CP)", key="speed_order")
+        st.text_input("Charter Type", key="charter_type")
+
+
+def special_events():
+    columns = [
+        "Event", "Start Date Time", "Start Lat", "Start Long", "End Date Time",
+        "End Lat", "End Long", "Distance Travelled", "Total Consumption", "Consumption Tank Name"
+    ]
+    
+    if 'special_events_df' not in st.session_state:
+        default_row = {
+            "Event": "Off-hire",
+            "Start Date Time": datetime.now(),
+            "Start Lat": "0.0",
+            "Start Long": "0.0",
+            "End Date Time": datetime.now(),
+            "End Lat": "0.0",
+            "End Long": "0.0",
+            "Distance Travelled": 0.0,
+            "Total Consumption": 0.0,
+            "Consumption Tank Name": "Tank 1"
+        }
+        st.session_state.special_events_df = pd.DataFrame([default_row])
+
+    edited_df = st.data_editor(
+        st.session_state.special_events_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "Event": st.column_config.SelectboxColumn(
+                "Event", width="medium",
+                options=[
+                    "Off-hire", "ECA Transit", "Fuel Changeover", "Stoppage",
+                    "Deviation - Heavy weather", "Deviation - SAR operation",
+                    "Deviation - Navigational area Warning", "Deviation - Med-evac",
+                    "Deviation - Others", "Transiting Special Area - JWC area",
+                    "Transiting Special Area - IWL", "Transiting Special Area - ICE regions",
+                    "Transiting Special Area - HRA"
+                ],
+            ),
+            "Start Date Time": st.column_config.DatetimeColumn(
+                "Start Date Time", format="DD/MM/YYYY HH:mm", step=60
+            ),
+            "End Date Time": st.column_config.DatetimeColumn(
+                "End Date Time", format="DD/MM/YYYY HH:mm", step=60
+            ),
+            "Distance Travelled": st.column_config.NumberColumn(
+                "Distance Travelled", min_value=0, max_value=1000, step=0.1, format="%.1f"
+            ),
+            "Total Consumption": st.column_config.NumberColumn(
+                "Total Consumption", min_value=0, max_value=1000, step=0.1, format="%.1f"
+            ),
+            "Consumption Tank Name": st.column_config.SelectboxColumn(
+                "Consumption Tank Name", options=[f"Tank {i}" for i in range(1, 9)]
+            ),
+        }
+    )
+
+    intervals = EventIntervals(edited_df)
+    # Distance Travelled follows from the start and end positions once both are entered
+    derived = intervals.distances()
+    edited_df["Distance Travelled"] = derived.round(1).where(derived > 0, edited_df["Distance Travelled"])
+    st.session_state.special_events_df = edited_df
+
+    for label in intervals.invalid():
+        st.warning(f"Row {label + 1}: the {edited_df.at[label, 'Event']} event ends before it starts.")
+    for first, second, kind in intervals.overlaps().itertuples(index=False):
+        relation = "lies within" if kind == "nested" else "overlaps"
+        st.error(f"Row {second + 1} {relation} row {first + 1}: {edited_df.at[first, 'Event']} events cannot overlap.")
+
+
+def events(spec, key):
+    st.subheader(spec.events_title)
+
+    st.write(spec.event_label)
+    for column, labels in zip(st.columns(len(spec.event_checkboxes)), spec.event_checkboxes):
+        with column:
+            for label in labels:
+                st.checkbox(label, key=key(label))
+
+    st.write(spec.special_events_label)
+    special_events()
+
+
+def speed_position_and_navigation(spec, key):
+    st.subheader("Speed, Position and Distance")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.selectbox("Ship Mean Time", options=list(range(-12, 13)), key="ship_mean_time")
+        st.selectbox("Clocks Advanced/Retarded", ["", "Advanced", "Retarded"], key="clocks_change")
+        distance_observed = st.number_input("Distance Observed (nm)", min_value=0.0, step=0.1, value=0.00, key=key("distance_observed"))
+        sog_observed = st.number_input("Obs Speed (SOG) (kts)", min_value=0.0, step=0.1, key=key("obs_speed_sog"))
+        st.number_input("Course (°)", min_value=0, max_value=359, step=1, key=key("course"))
+        
+    with col2:
+        st.time_input("Date Time (Local)", value=datetime.now().time(), key=key("local_time"))
+        st.number_input("Clocks Changed By (minutes)", min_value=0, step=1, key="clocks_change_minutes")
+        st.number_input("Distance Through Water (nm)", min_value=0.0, step=0.1, key=key("distance_through_water"))
+        st.number_input("EM Log Speed (LOG) (kts)", min_value=0.0, step=0.1, key=key("em_log_speed"))
+        st.number_input("Heading (°)", min_value=0, max_value=359, step=1, key=key("heading"))
+        
+    with col3:
+        st.time_input("Date Time (UTC)", value=datetime.now().time(), key=key("utc_time"))
+        st.text("Latitude")
+        lat_col1, lat_col2, lat_col3, lat_col4 = st.columns([2, 2, 2, 1])
+        with lat_col1:
+            lat_deg = st.number_input("Deg", min_value=0, max_value=90, step=1, key="lat_degree")
+        with lat_col2:
+            lat_min = st.number_input("Min", min_value=0, max_value=59, step=1, key="lat_minute")
+        with lat_col3:
+            lat_sec = st.number_input("Sec", min_value=0, max_value=59, step=1, key="lat_second")
+        with lat_col4:
+            lat_dir = st.selectbox("", ["N", "S"], key="lat_direction")
+        st.number_input("Distance To Go (nm)", min_value=0.0, step=0.1, value=0.00, key=key("distance_togo"))
+        st.text_input("Observed Slip", key="obs_slip")
+        st.text_input("Ordered Speed", key=key("speed_order"))
+        
+    with col4:
+        hours = st.number_input("Time Since Last Report (hours)", min_value=0.0, step=0.1, key="time_since_last_report")
+        st.text("Longitude")
+        lon_col1, lon_col2, lon_col3, lon_col4 = st.columns([2, 2, 2, 1])
+        with lon_col1:
+            lon_deg = st.number_input("Deg", min_value=0, max_value=180, step=1, key="lon_degree")
+        with lon_col2:
+            lon_min = st.number_input("Min", min_value=0, max_value=59, step=1, key="lon_minute")
+        with lon_col3:
+            lon_sec = st.number_input("Sec", min_value=0, max_value=59, step=1, key="lon_second")
+        with lon_col4:
+            lon_dir = st.selectbox("", ["E", "W"], key="lon_direction")
+        st.number_input("Engine Distance (nm)", min_value=0.0, step=0.1, key=key("engine_distance"))
+        st.text_input("True Slip", key="true_slip")
+        idl_crossing = st.checkbox("IDL Crossing", key="idl_crossing")
+        if idl_crossing:
+            st.selectbox("IDL Direction", ["East", "West"], key="idl_direction")
+
+    last_position = st.session_state.get('last_report_position')
+    if last_position is not None:
+        # Cross-check the typed distance and speed against the great circle from the last report
+        lat = dms_to_decimal(lat_deg, lat_min, lat_sec, lat_dir)
+        lon = dms_to_decimal(lon_deg, lon_min, lon_sec, lon_dir)
+        distance = float(haversine_nm(*last_position, lat, lon))
+        sog = distance / hours if hours else None
+        st.caption(
+            f"Great-circle distance from the last report: {distance:.1f} nm"
+            + (f", SOG {sog:.1f} kts over {hours:g} h" if sog is not None else "")
+        )
+        if distance_observed and abs(distance_observed - distance) > max(1.0, 0.05 * distance):
+            st.warning(f"Distance Observed differs from the {distance:.1f} nm between the reported positions.")
+        if sog is not None and sog_observed and abs(sog_observed - sog) > max(0.5, 0.05 * sog):
+            st.warning(f"Obs Speed (SOG) differs from the {sog:.1f} kts implied by positions and time.")
+
+    if spec.event_times:
+        st.subheader("Additional Event Times")
+        col1, col2 = st.columns(2)
+        for zone, column in (("LT", col1), ("UTC", col2)):
+            with column:
+                for label, name in spec.event_times:
+                    st.date_input(f"{label} Date ({zone})", key=f"{name}_date_{zone.lower()}")
+                    st.time_input(f"{label} Time ({zone})", key=f"{name}_time_{zone.lower()}")
+
+
+def weather_and_sea_conditions(spec, key):
+    st.subheader("Weather and Sea Conditions")
+    
+    six_hourly = st.checkbox("6-hourly Weather Reports", key="six_hourly_weather")
+    
+    if not six_hourly:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.number_input("True Wind Speed (kts)", min_value=0.0, step=0.1, key=key("true_wind_speed"))
+            st.number_input("Sea Height (m)", min_value=0.0, step=0.1, key=key("sea_height"))
+            st.selectbox("BF Scale", range(13), key=key("bf_scale"))
+        with col2:
+            st.number_input("True Wind Direction (°)", min_value=0, max_value=359, step=1, key=key("true_wind_direction"))
+            st.number_input("Sea Direction (°)", min_value=0, max_value=359, step=1, key=key("sea_direction"))
+            st.selectbox("Sea State (Douglas)", range(10), key=key("douglas_sea_state"))
+        with col3:
+            st.number_input("Significant Wave Height (m)", min_value=0.0, step=0.1, key=key("sig_wave_height"))
+            st.number_input("Swell Height (m) (DSS)", min_value=0.0, step=0.1, key=key("swell_height"))
+            st.number_input("Air Temp (°C)", min_value=-50.0, max_value=50.0, step=0.1, key=key("air_temp"))
+        with col4:
+            st.number_input("Wave Direction (°)", min_value=0, max_value=359, step=1, key=key("wave_direction"))
+            st.number_input("Swell Direction (°)", min_value=0, max_value=359, step=1, key=key("swell_direction"))
+            st.number_input("Sea Water Temp (°C)", min_value=-2.0, max_value=35.0, step=0.1, key=key("sea_water_temp"))
+    else:
+        weather_data = {
+            "Date Time": [pd.NaT] * 4,
+            "True Wind Speed (kts)": [0.0] * 4,
+            "True Wind Direction (°)": [0] * 4,
+            "BF Scale": [0] * 4,
+            "Sea Height (m)": [0.0] * 4,
+            "Sea Direction (°)": [0] * 4,
+            "Sea State (Douglas)": [0] * 4,
+            "Significant Wave Height (m)": [0.0] * 4,
+            "Wave Direction (°)": [0] * 4,
+            "Swell Height (m) (DSS)": [0.0] * 4,
+            "Swell Direction (°)": [0] * 4,
+            "Air Temp (°C)": [0.0] * 4,
+            "Sea Water Temp (°C)": [0.0] * 4
+        }
+        
+        df = pd.DataFrame(weather_data)
+        
+        edited_df = st.data_editor(
+            df,
+            column_config={
+                "Date Time": st.column_config.DatetimeColumn(
+                    "Date Time",
+                    min_value=datetime(2023, 1, 1),
+                    max_value=datetime(2025, 12, 31),
+                    format="DD/MM/YYYY HH:mm",
+                    step=60,
+                ),
+                "BF Scale": st.column_config.SelectboxColumn(
+                    "BF Scale",
+                    options=list(range(13)),
+                    required=True,
+                ),
+                "Sea State (Douglas)": st.column_config.SelectboxColumn(
+                    "Sea State (Douglas)",
+                    options=list(range(10)),
+                    required=True,
+                ),
+            },
+            hide_index=True,
+            key="weather_table"
+        )
+
+
+def cargo_and_stability(spec, key):
+    st.subheader("Cargo and Stability")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.number_input("FWD Draft (m)", min_value=0.0, step=0.01, key=key("fwd_draft"))
+        st.number_input("Cargo Weight (MT)", min_value=0.0, step=0.1, key=key("cargo_weight"))
+        st.number_input("GM (m)", min_value=0.0, step=0.01, key=key("gm"))
+        
+    with col2:
+        st.number_input("Mid Draft (m)", min_value=0.0, step=0.01, key=key("mid_draft"))
+        st.number_input("Ballast Quantity (m³)", min_value=0.0, step=0.1, key=key("ballast_qty"))
+        st.number_input("LCG (m)", min_value=0.0, step=0.01, key=key("lcg"))
+    with col3:
+        st.number_input("AFT Draft (m)", min_value=0.0, step=0.01, key=key("aft_draft"))
+        st.number_input("Displacement (MT)", min_value=0.0, step=0.1, key=key("displacement"))
+        st.number_input("Water Plane Co-efficient", min_value=0.0, step=0.01, key=key("water_plane_coefficient"))
+        
+        
+    with col4:
+        st.number_input("Freeboard (m)", min_value=0.0, step=0.01, key=key("freeboard"))
+        st.number_input("Cb (Block Co-efficient)", min_value=0.0, step=0.01, key=key("cb"))
+
+
+FUEL_TABLE_CSS = """
+<style>
+    .dataframe tbody th {
+        font-weight: bold;
+        text-align: left;
+    }
+    .dataframe th.italic-row {
+        font-style: italic;
+    }
+    .dataframe th.boiler-subsection {
+        padding-left: 30px !important;
+        font-style: italic;
+    }
+</style>
+"""
+ITALIC_CONSUMERS = ['Boiler 1', 'Boiler 2', 'DPP1', 'DPP2', 'DPP3']
+
+
+def row_label_classes(labels):
+    """CSS class of each row label: indented consumers are boiler subsections, a few are italic."""
+    labels = np.asarray(labels, dtype=str)
+    return np.where(
+        np.char.startswith(labels, '    '), 'boiler-subsection',
+        np.where(np.isin(labels, ITALIC_CONSUMERS), 'italic-row', ''),
+    )
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def fuel_table_html(content_hash, _ledger, _rows, _headers):
+    """The fuel table as HTML, memoized on content_hash so an unchanged table is not re-serialized."""
+    values = _ledger.table[[_ledger.row_index[row] for row in _rows]]
+    cells = np.char.add(np.char.add('<td>', np.char.mod('%.2f', values)), '</td>')
+    classes = row_label_classes(_rows)
+    head = ''.join(f'<th style="text-align: center;">{header}</th>' for header in _headers)
+    body = ''.join(
+        f'<tr><th class="{css_class}">{row.strip()}</th>{"".join(row_cells)}</tr>'
+        for row, css_class, row_cells in zip(_rows, classes, cells)
+    )
+    return (
+        f'{FUEL_TABLE_CSS}<table border="1" class="dataframe">'
+        f'<thead><tr><th></th>{head}</tr></thead><tbody>{body}</tbody></table>'
+    )
+
+
+def fuel_consumption(spec, key):
+    if 'consumers' not in st.session_state:
+        st.session_state.consumers = [
+            'Main Engine', 'Aux Engine1', 'Aux Engine2', 'Aux Engine3',
+            'Boiler 1',
+            '    Boiler 1 - Cargo Heating',
+            '    Boiler 1 - Discharge',
+            'Boiler 2',
+            '    Boiler 2 - Cargo Heating',
+            '    Boiler 2 - Discharge',
+            'IGG', 'Incinerator',
+            'DPP1', 'DPP2', 'DPP3'
+        ]
+    if 'tanks' not in st.session_state:
+        st.session_state.tanks = [f'Tank {i}' for i in range(1, 9)]
+    if 'viscosity' not in st.session_state:
+        st.session_state.viscosity = {tank: np.random.uniform(20, 100) for tank in st.session_state.tanks}
+    if 'sulfur' not in st.session_state:
+        st.session_state.sulfur = {tank: np.random.uniform(0.05, 0.49) for tank in st.session_state.tanks}
+    if 'fuel_ledger' not in st.session_state:
+        st.session_state.fuel_ledger = FuelLedger(
+            st.session_state.consumers,
+            st.session_state.tanks,
+            adjustments=FUEL_ADJUSTMENTS,
+            previous_rob=get_rob_chain().last_rob,
+        )
+    if 'bunkering_entries' not in st.session_state:
+        st.session_state.bunkering_entries = []
+    if 'debunkering_entries' not in st.session_state:
+        st.session_state.debunkering_entries = []
+    if 'bunker_survey_correction' not in st.session_state:
+        st.session_state.bunker_survey_correction = pd.Series({tank: 0.0 for tank in st.session_state.tanks})
+
+    st.title('Fuel Consumption Tracker')
+
+    bunkering_happened = debunkering_happened = False
+    if spec.bunkering:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bunkering_happened = st.checkbox("Bunkering Happened")
+        with col2:
+            debunkering_happened = st.checkbox("Debunkering Happened")
+        with col3:
+            bunker_survey = st.checkbox("Bunker Survey")
+    else:
+        bunker_survey = st.checkbox("Bunker Survey")
+
+    if bunkering_happened:
+        st.markdown("<h4 style='font-size: 18px;'>Bunkering Details</h4>", unsafe_allow_html=True)
+        for i, entry in enumerate(st.session_state.bunkering_entries):
+            st.markdown(f"<h5 style='font-size: 16px;'>Bunkering Entry {i+1}</h5>", unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                entry['bdn_number'] = st.text_input("Bunker Delivery Note Number", key=f"bdn_number_{i}")
+                entry['delivery_date'] = st.date_input("Bunker Delivery Date", key=f"delivery_date_{i}")
+                entry['delivery_time'] = st.time_input("Bunker Delivery Time", key=f"delivery_time_{i}")
+            with col2:
+                entry['imo_number'] = st.text_input("IMO number", key=f"imo_number_{i}")
+                entry['fuel_type'] = st.text_input("Fuel Type", key=f"fuel_type_{i}")
+                entry['mass'] = st.number_input("Mass (mt)", min_value=0.0, step=0.1, key=f"mass_{i}")
+            with col3:
+                entry['lower_heating_value'] = st.number_input("Lower heating value (MJ/kg)", min_value=0.0, step=0.1, key=f"lower_heating_value_{i}")
+                entry['eu_ghg_intensity'] = st.number_input("EU GHG emission intensity (gCO2eq/MJ)", min_value=0.0, step=0.1, key=f"eu_ghg_intensity_{i}")
+                entry['imo_ghg_intensity'] = st.number_input("IMO GHG emission intensity (gCO2eq/MJ)", min_value=0.0, step=0.1, key=f"imo_ghg_intensity_{i}")
+                entry['lcv_eu'] = st.number_input("Lower Calorific Value (EU) (MJ/kg)", min_value=0.0, step=0.1, key=f"lcv_eu_{i}")
+                entry['sustainability'] = st.text_input("Sustainability", key=f"sustainability_{i}")
+        if st.button("➕ Add Bunkering Entry"):
+            st.session_state.bunkering_entries.append({})
+            st.rerun()
+
+    if debunkering_happened:
+        st.markdown("<h4 style='font-size: 18px;'>Debunkering Details</h4>", unsafe_allow_html=True)
+        for i, entry in enumerate(st.session_state.debunkering_entries):
+            st.markdown(f"<h5 style='font-size: 16px;'>Debunkering Entry {i+1}</h5>", unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                entry['date'] = st.date_input("Date of Debunkering", key=f"debunker_date_{i}")
+                entry['quantity'] = st.number_input("Quantity Debunkered (mt)", min_value=0.0, step=0.1, key=f"debunker_qty_{i}")
+            with col2:
+                entry['bdn_number'] = st.text_input("BDN Number of Debunkered Oil", key=f"debunker_bdn_{i}")
+                entry['receipt_file'] = st.file_uploader("Upload Receipt", type=['pdf', 'jpg', 'png'], key=f"receipt_file_{i}")
+        if st.button("➕ Add Debunkering Entry"):
+            st.session_state.debunkering_entries.append({})
+            st.rerun()
+
+    if bunker_survey:
+        st.text_area("Bunker Survey Comments", key="bunker_survey_comments")
+
+    def format_column_header(tank):
+        viscosity = st.session_state.viscosity.get(tank, 0)
+        sulfur = st.session_state.sulfur.get(tank, 0)
+        return f"{tank}<br>Visc: {viscosity:.1f}<br>Sulfur: {sulfur:.2f}%"
+
+    ledger = st.session_state.fuel_ledger
+    # Inactive adjustments are zeroed so they drop out of Current ROB
+    bunkered = np.zeros(len(ledger.tanks))
+    if bunkering_happened:
+        bunkered[0] = sum(entry.get('mass', 0) for entry in st.session_state.bunkering_entries)
+    debunkered = np.zeros(len(ledger.tanks))
+    if debunkering_happened:
+        debunkered[0] = sum(entry.get('quantity', 0) for entry in st.session_state.debunkering_entries)
+    ledger.set_row('Bunkered Qty', bunkered)
+    ledger.set_row('Debunkered Qty', debunkered)
+    ledger.set_row('Bunker Survey Correction', st.session_state.bunker_survey_correction if bunker_survey else 0)
+
+    shown = {'Bunkered Qty': bunkering_happened, 'Debunkered Qty': debunkering_happened, 'Bunker Survey Correction': bunker_survey}
+    rows = tuple(row for row in ledger.rows if shown.get(row, True))
+    headers = tuple(format_column_header(tank) for tank in ledger.tanks)
+
+    st.write("Fuel Consumption Data:")
+    st.markdown(fuel_table_html(ledger.content_hash(rows, headers), ledger, rows, headers), unsafe_allow_html=True)
+
+    def display_additional_table():
+        st.write("Additional Consumption Data:")
+        additional_data = pd.DataFrame({
+            'Work': [0, 0, 0, 0],
+            'SFOC': [0, 0, 0, ''],
+            'Tank Name': ['', '', '', '']
+        }, index=['Reefer container', 'Cargo cooling', 'Heating/Discharge pump', 'Shore-Side Electricity'])
+        custom_css = """
+        <style>
+            .additional-table th {
+                text-align: center !important;
+            }
+            .additional-table td {
+                text-align: center !important;
+            }
+            .grey-out {
+                background-color: #f0f0f0 !important;
+                color: #888 !important;
+            }
+        </style>
+        """
+        st.markdown(custom_css, unsafe_allow_html=True)
+        table_html = additional_data.to_html(classes='additional-table', escape=False)
+        table_html = table_html.replace('<td></td>', '<td>-</td>')
+        table_html = table_html.replace('<td>Shore-Side Electricity</td><td>0</td><td></td><td></td>', 
+                                        '<td>Shore-Side Electricity</td><td>0</td><td class="grey-out">-</td><td class="grey-out">-</td>')
+        st.markdown(table_html, unsafe_allow_html=True)
+
+    display_additional_table()
+
+    def edit_tank_properties():
+        st.write("Edit tank properties:")
+        tank_props = pd.DataFrame({
+            'Viscosity': st.session_state.viscosity,
+            'Sulfur (%)': st.session_state.sulfur
+        })
+        edited_props = st.data_editor(
+            tank_props,
+            use_container_width=True,
+            column_config={
+                'Viscosity': st.column_config.NumberColumn(
+                    'Viscosity', min_value=20.0, max_value=100.0, step=0.1, format="%.1f"
+                ),
+                'Sulfur (%)': st.column_config.NumberColumn(
+                    'Sulfur (%)', min_value=0.05, max_value=0.49, step=0.01, format="%.2f"
+                )
+            }
+        )
+        st.session_state.viscosity = edited_props['Viscosity'].to_dict()
+        st.session_state.sulfur = edited_props['Sulfur (%)'].to_dict()
+
+    if st.checkbox("Edit Tank Properties"):
+        edit_tank_properties()
+
+
+# Key names of each machinery counter's reading and, where the form has them, its Meter Defective and Reset Meter checkboxes
+COUNTER_KEYS = {
+    "M/E rev counter": ("me_rev_counter", "me_rev_counter_defective", "me_rev_counter_reset"),
+    "kWhr": ("avg_kw", "kwhr_defective", "kwhr_reset"),
+    "Main engine": ("main_engine_hours", None, None),
+    "AE-1": ("ae_1_hours", None, None),
+    "A/E 2": ("ae_2_hours", None, None),
+    "A/E 3": ("ae_3_hours", None, None),
+    "A/E 4": ("ae_4_hours", None, None),
+    "Boiler 1": ("boiler1_hours", None, None),
+    "Boiler 2": ("boiler2_hours", None, None),
+    "Scrubbers": ("scrubbers_hours", None, None),
+    "Shaft gen": ("shaft_gen_hours", None, None),
+    "Air Comp 1": ("comp1_hours", None, None),
+    "Air Comp 2": ("comp2_hours", None, None),
+}
+COUNTER_COLUMNS = [
+    column for counter in MACHINERY_COUNTERS for column in (counter, f"{counter} Defective", f"{counter} Reset")
+]
+
+
+def counter_values(key):
+    """Machinery counter readings and flags of the form, named as history_deltas reads them."""
+    values = {}
+    for counter, (reading, defective, reset) in COUNTER_KEYS.items():
+        values[counter] = st.session_state.get(key.name(reading))
+        if defective:
+            values[f"{counter} Defective"] = bool(st.session_state.get(key.name(defective)))
+            values[f"{counter} Reset"] = bool(st.session_state.get(key.name(reset)))
+    return values
+
+
+def stored_counter_readings(vessel):
+    """Counter readings of the vessel's stored reports, loaded once per vessel until the next submit."""
+    cached = st.session_state.get("counter_history")
+    if cached is None or cached["vessel"] != vessel:
+        reports = expand_extra(get_report_store().load_reports(vessel=vessel)) if vessel else pd.DataFrame()
+        cached = {"vessel": vessel, "readings": reports.reindex(columns=["submitted_at"] + COUNTER_COLUMNS)}
+        st.session_state.counter_history = cached
+    return cached["readings"]
+
+
+def draft_counter_deltas(key):
+    """Delta of every counter since the vessel's last stored report, and how it was obtained."""
+    draft = pd.DataFrame([{"submitted_at": datetime.now(), **counter_values(key)}])
+    readings = pd.concat([stored_counter_readings(current_vessel()), draft], ignore_index=True)
+    result = history_deltas(readings.assign(vessel=0), time_col="submitted_at")
+    return pd.DataFrame({
+        "Since Last Report": result.deltas.iloc[-1],
+        "Obtained": result.status.iloc[-1].map(DELTA_NAMES),
+    })
+
+
+def machinery(spec, key):
+    st.subheader("Machinery")
+    st.subheader("Main Engine")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        me_rev_col1, me_rev_col2, me_rev_col3 = st.columns([2,1,1])
+        with me_rev_col1:
+            st.number_input("M/E rev counter", min_value=0, step=1, key=key("me_rev_counter"))
+        with me_rev_col2:
+            st.markdown('<p style="font-size: 10px;">Meter Defective</p>', unsafe_allow_html=True)
+            st.checkbox("", key=key("me_rev_counter_defective"), label_visibility="collapsed")
+        with me_rev_col3:
+            st.markdown('<p style="font-size: 10px;">Reset Meter</p>', unsafe_allow_html=True)
+            st.checkbox("", key=key("me_rev_counter_reset"), label_visibility="collapsed")
+        
+        st.number_input("ME TC RPM", min_value=0.0, step=0.1, key=key("me_tc1_rpm"))
+        st.number_input("Exhaust Max. Temp.(C)", min_value=0.0, step=0.1, key=key("exhaust_max_temp"))
+        
+    with col2:
+        st.number_input("ME RPM", min_value=0.0, step=0.1, key=key("me_rpm"))
+        st.number_input("Scavenge pressure(BAR)", min_value=0.0, step=0.01, key=key("scavenge_pressure"))
+        st.number_input("Exhaust Min. Temp.(C)", min_value=0.0, step=0.1, key=key("exhaust_min_temp"))
+        
+    with col3:
+        kwhr_col1, kwhr_col2, kwhr_col3 = st.columns([2,1,1])
+        with kwhr_col1:
+            st.number_input("kWhr", min_value=0.0, step=0.1, key=key("avg_kw"))
+        with kwhr_col2:
+            st.markdown('<p style="font-size: 10px;">Meter Defective</p>', unsafe_allow_html=True)
+            st.checkbox("", key=key("kwhr_defective"), label_visibility="collapsed")
+        with kwhr_col3:
+            st.markdown('<p style="font-size: 10px;">Reset Meter</p>', unsafe_allow_html=True)
+            st.checkbox("", key=key("kwhr_reset"), label_visibility="collapsed")
+        
+        st.number_input("SFOC", min_value=0.0, step=0.1, key=key("sfoc"))
+    
+    with col4:
+        st.number_input("Shaft Power", min_value=0.0, max_value=100.0, step=0.1, key=key("mcr"))
+        st.number_input("Slip", min_value=0.0, max_value=100.0, step=0.1, key=key("slip"))
+        
+
+    st.subheader("Auxiliary Engines")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.number_input("Avg A/E power 1", min_value=0.0, step=0.1, key=key("avg_ae_power_1"))
+    with col2:
+        st.number_input("Avg A/E power 2", min_value=0.0, step=0.1, key=key("avg_ae_power_2"))
+    with col3:
+        st.number_input("Avg A/E power 3", min_value=0.0, step=0.1, key=key("avg_ae_power_3"))
+    with col4:
+        st.number_input("Avg A/E power 4", min_value=0.0, step=0.1, key=key("avg_ae_power_4"))
+
+    st.subheader("Running Hours")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.number_input("Main engine", min_value=0.0, step=0.1, key=key("main_engine_hours"))
+        st.number_input("AE-1", min_value=0.0, step=0.1, key=key("ae_1_hours"))
+        st.number_input("Boiler 1", min_value=0.0, step=0.1, key=key("boiler1_hours"))
+    with col2:
+        st.number_input("Scrubbers", min_value=0.0, step=0.1, key=key("scrubbers_hours"))
+        st.number_input("A/E 2", min_value=0.0, step=0.1, key=key("ae_2_hours"))
+        st.number_input("Boiler 2", min_value=0.0, step=0.1, key=key("boiler2_hours"))
+        
+    with col3:
+        st.number_input("Shaft gen", min_value=0.0, step=0.1, key=key("shaft_gen_hours"))
+        st.number_input("A/E 3", min_value=0.0, step=0.1, key=key("ae_3_hours"))
+        st.number_input("Air Comp 1", min_value=0.0, step=0.1, key=key("comp1_hours"))
+        
+    with col4:
+
+        st.number_input("A/E 4", min_value=0.0, step=0.1, key=key("ae_4_hours"))
+        
+        st.number_input("Air Comp 2", min_value=0.0, step=0.1, key=key("comp2_hours"))
+
+    st.subheader("Counters Since Last Report")
+    st.dataframe(draft_counter_deltas(key), use_container_width=True,
+                 column_config={"Since Last Report": st.column_config.NumberColumn(format="%.1f")})
+
+
+def environmental_compliance(spec, key):
+    st.subheader("Environmental Compliance")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.number_input("Sludge ROB (MT)", min_value=0.0, step=0.1, key=key("sludge_rob"))
+        st.number_input("Bilge Water Quantity (m³)", min_value=0.0, step=0.1, key=key("bilge_water_qty"))
+    if spec.waste_landed:
+        with col2:
+            st.number_input("Sludge Landed Ashore (MT)", min_value=0.0, step=0.1, key=key("sludge_landed"))
+            st.number_input("Food waste Disposed (m³)", min_value=0.0, step=0.1, key=key("food_waste"))
+        with col3:
+            st.number_input("Bilge Water Landed Ashore (m³)", min_value=0.0, step=0.1, key=key("bilge_landed"))
+            st.number_input("Food waste Landed (m³)", min_value=0.0, step=0.1, key=key("food_wastel"))
+            st.number_input("Garbage landed (m³)", min_value=0.0, step=0.1, key=key("garbage_waste"))
+    else:
+        with col2:
+            st.number_input("Sludge Burnt in Incinerator (MT)", min_value=0.0, step=0.1, key=key("sludge_burnt"))
+        with col3:
+            st.number_input("Bilge Water Pumped Out through 15ppm Equipment (m³)", min_value=0.0, step=0.1, key=key("bilge_pumped_out"))
+
+
+def miscellaneous_consumables(spec, key):
+    st.subheader("Miscellaneous Consumables")
+    st.markdown("Fresh Water")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        #st.number_input("Fresh Water Bunkered (m³)", min_value=0.0, step=0.1, key=key("fw_bunkered"))
+        st.number_input("Fresh Water Consumption - Drinking (m³)", min_value=0.0, step=0.1, key=key("fw_consumption_drinking"))
+        st.number_input("Fresh Water Produced (m³)", min_value=0.0, step=0.1, key=key("fw_produced"))
+    with col2:
+        st.number_input("Fresh Water Consumption - Technical (m³)", min_value=0.0, step=0.1, key=key("fw_consumption_technical"))
+        
+    with col3:
+        st.number_input("Fresh Water Consumption - Washing (m³)", min_value=0.0, step=0.1, key=key("fw_consumption_washing"))
+        st.number_input("Fresh Water ROB (m³)", min_value=0.0, step=0.1, key=key("fw_rob"))
+
+    st.markdown("Lubricating Oil")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.number_input("ME Cylinder Oil High BN ROB (liters)", min_value=0, step=1, key=key("me_cyl_oil_high_bn_rob"))
+        st.number_input("ME Cylinder Oil Consumption (liters)", min_value=0, step=1, key=key("me_cyl_oil_consumption"))
+        
+    with col2:
+        st.number_input("ME System Oil ROB (liters)", min_value=0, step=1, key=key("me_system_oil_rob"))
+        st.number_input("ME System Oil Consumption (liters)", min_value=0, step=1, key=key("me_system_oil_consumption"))
+    with col3:
+        st.number_input("ME Cylinder Oil Low BN ROB (liters)", min_value=0, step=1, key=key("me_cyl_oil_low_bn_rob"))
+        st.number_input("AE System Oil ROB (liters)", min_value=0, step=1, key=key("ae_system_oil_rob"))
+        
+    with col4:
+        st.number_input("ME Cylinder Oil Feed Rate (g/kWh)", min_value=0.0, step=0.1, key=key("me_cyl_oil_feed_rate"))
+        st.number_input("AE System Oil Consumption (liters)", min_value=0, step=1, key=key("ae_system_oil_consumption"))
+
+
+SECTION_RENDERERS = {
+    "Voyage Information": voyage_information,
+    "Events": events,
+    "Speed, Position and Navigation": speed_position_and_navigation,
+    "Weather and Sea Conditions": weather_and_sea_conditions,
+    "Cargo and Stability": cargo_and_stability,
+    "Fuel Consumption": fuel_consumption,
+    "Machinery": machinery,
+    "Environmental Compliance": environmental_compliance,
+    "Miscellaneous Consumables": miscellaneous_consumables,
+}
+
+
+@lru_cache(maxsize=None)
+def compile_report_page(spec):
+    """(section, renderer) pairs of a page spec, resolved once per process."""
+    return tuple((section, SECTION_RENDERERS[section]) for section in spec.sections)
+
+
+def session_position(state):
+    """Decimal (latitude, longitude) entered in the Speed, Position and Navigation section."""
+    lat = dms_to_decimal(state.get('lat_degree', 0), state.get('lat_minute', 0), state.get('lat_second', 0), state.get('lat_direction', 'N'))
+    lon = dms_to_decimal(state.get('lon_degree', 0), state.get('lon_minute', 0), state.get('lon_second', 0), state.get('lon_direction', 'E'))
+    return float(lat), float(lon)
+
+
+def get_rob_chain():
+    """ROB chain of the voyage reported in this session; the next report starts from its last ROB."""
+    if 'rob_chain' not in st.session_state:
+        tanks = st.session_state.get('tanks') or [f'Tank {i}' for i in range(1, 9)]
+        st.session_state.rob_chain = RobChain(tanks, np.random.uniform(100, 1000, len(tanks)))
+    return st.session_state.rob_chain
+
+
+def display_vessel_information():
+    st.markdown("<h2 style='text-align: center;'>Vessel Information</h2>", unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.text(f"IMO Number: {select_vessel() or '-'}")
+    with col2:
+        st.text("Vessel Name: Ocean Explorer")  # Random value
+    with col3:
+        st.text("Vessel Type: Tanker")  # Random value
+
+
+def render_section(render, spec, key):
+    key.release()  # a section fragment rerunning on its own claims its keys again
+    render(spec, key)
+
+
+def display_report_form(spec):
+    keys = WidgetKeys(spec.page)
+    scope = (spec.page, spec.report_type)
+    for section, render in compile_report_page(spec):
+        display_report_section(scope, f"#### {section}", render_section, render, spec, keys.section(section))
+
+    if st.button("Submit Report", type="primary", key=keys(spec.report_type, "submit_report")):
+        submit_report_form(spec, keys, scope)
+    display_rob_amendment(keys.section(spec.report_type, "Amend ROB"))
+
+
+def submit_report_form(spec, keys, scope):
+    vessel = current_vessel()
+    if vessel is None:
+        st.error("Enter the vessel's IMO number in the sidebar before submitting.")
+        return
+    values = {**scope_values(scope), **counter_values(keys.section("Machinery"))}
+    report_id = get_report_store().save_report(spec.report_type, vessel, values)
+    st.session_state.pop("counter_history", None)  # reload with this report next time
+    # Carry this report's Current ROB into the next report's Previous ROB
+    chain = get_rob_chain()
+    ledger = st.session_state.pop('fuel_ledger', None)
+    chain.append(report_id, ledger.net_change if ledger is not None else np.zeros(len(chain.tanks)))
+    if 'lat_degree' in st.session_state:
+        st.session_state.last_report_position = session_position(st.session_state)
+    st.success("Report submitted successfully!")
+
+
+def display_rob_amendment(key):
+    """Amends a submitted report's net ROB change (e.g. a late survey correction); the reports after it follow."""
+    chain = get_rob_chain()
+    if not len(chain):
+        return
+    with st.expander("Amend a Submitted Report"):
+        report_id = st.selectbox("Report", chain.reports, format_func=lambda report: f"Report {report}", key=key("report"))
+        row = chain.position[report_id]
+        rob = pd.DataFrame(
+            {"Net Change (mt)": chain.net_change[row], "Current ROB (mt)": chain.current_rob[row]}, index=chain.tanks
+        )
+        edited = st.data_editor(rob, use_container_width=True, disabled=["Current ROB (mt)"],
+                                key=key("net_change", report_id))
+        if st.button("Amend Report", key=key("amend")):
+            affected = chain.amend(report_id, edited["Net Change (mt)"].to_numpy(dtype=np.float64))
+            # The draft starts from the latest report's Current ROB, which moved with the amendment
+            if 'fuel_ledger' in st.session_state:
+                st.session_state.fuel_ledger.set_row(PREVIOUS_ROB, chain.last_rob)
+            st.success(f"ROB recomputed for {len(affected)} report(s): {', '.join(map(str, affected))}")
+
+
+def display_report_page(spec, title):
+    display_vessel_information()
+    st.markdown(f"<h2 style='text-align: center;'>{title}</h2>", unsafe_allow_html=True)
+    display_report_form(spec)
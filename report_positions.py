@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_NM = 3440.065
+HOURS_PER_DAY = 24.0
+SOUTH_OR_WEST = ("S", "W", "s", "w")
+
+# Position columns of stored reports, by field label
+LATITUDE_COLUMNS = ("Latitude Degrees", "Latitude Minutes", "Latitude Seconds", "Latitude Direction")
+LONGITUDE_COLUMNS = ("Longitude Degrees", "Longitude Minutes", "Longitude Seconds", "Longitude Direction")
+
+
+def dms_to_decimal(degrees, minutes=0.0, seconds=0.0, hemisphere="N"):
+    """Signed decimal degrees from degree/minute/second and N/S/E/W; scalars or arrays."""
+    magnitude = (
+        np.asarray(degrees, dtype=np.float64)
+        + np.asarray(minutes, dtype=np.float64) / 60.0
+        + np.asarray(seconds, dtype=np.float64) / 3600.0
+    )
+    hemisphere = np.asarray(hemisphere, dtype=object)
+    # Hash lookup rather than numpy string ops, which are slow over millions of rows
+    south_or_west = pd.Series(hemisphere.ravel()).isin(SOUTH_OR_WEST).to_numpy().reshape(hemisphere.shape)
+    return np.where(south_or_west, -magnitude, magnitude)
+
+
+def longitude_delta(lon1, lon2):
+    """Eastward longitude change wrapped to [-180, 180), so a leg across the date line stays short."""
+    return (np.asarray(lon2, dtype=np.float64) - lon1 + 180.0) % 360.0 - 180.0
+
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    """Great-circle distance in nautical miles; arrays broadcast."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2.0
+    half_dlambda = np.radians(longitude_delta(lon1, lon2)) / 2.0
+    a = np.sin(half_dphi) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(half_dlambda) ** 2
+    return 2.0 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def initial_course(lat1, lon1, lat2, lon2):
+    """True course in degrees [0, 360) at the start of the great-circle leg."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlambda = np.radians(longitude_delta(lon1, lon2))
+    x = np.sin(dlambda) * np.cos(phi2)
+    y = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlambda)
+    return np.degrees(np.arctan2(x, y)) % 360.0
+
+
+def idl_shift_hours(idl_direction):
+    """Hours to add to a ship's-time interval for an International Date Line crossing.
+
+    Crossing eastbound the date is repeated, so local time runs 24 hours short;
+    crossing westbound a date is skipped and local time runs 24 hours long.
+    """
+    direction = np.char.lower(np.asarray(pd.Series(idl_direction).fillna("").to_numpy(), dtype=str))
+    return np.select([direction == "east", direction == "west"], [HOURS_PER_DAY, -HOURS_PER_DAY], 0.0)
+
+
+def positions(reports, latitude=LATITUDE_COLUMNS, longitude=LONGITUDE_COLUMNS):
+    """Decimal latitude and longitude of every report; missing seconds count as zero."""
+    def column(name, default):
+        if name in reports:
+            return reports[name].fillna(default).to_numpy()
+        return np.full(len(reports), default)
+
+    lat = dms_to_decimal(*(column(name, default) for name, default in zip(latitude, (np.nan, 0.0, 0.0, "N"))))
+    lon = dms_to_decimal(*(column(name, default) for name, default in zip(longitude, (np.nan, 0.0, 0.0, "E"))))
+    return lat, lon
+
+
+def report_legs(reports, vessel_col="vessel", time_col="timestamp", idl_col=None):
+    """Distance, elapsed time, SOG and course from each report's previous report, in one vectorized pass.
+
+    Rows are ordered by vessel and timestamp; the first report of every vessel
+    gets NaN. Without idl_col the timestamps are taken as UTC. With idl_col
+    (IDL Direction, "East"/"West" on the report that crossed, empty otherwise)
+    they are ship's time, corrected by the 24 hours the crossing adds or removes.
+    Returns a DataFrame aligned with reports.index.
+    """
+    columns = ["latitude", "longitude", "distance_nm", "hours", "sog_kts", "course"]
+    n = len(reports)
+    if n == 0:
+        return pd.DataFrame(columns=columns, index=reports.index, dtype=np.float64)
+
+    lat, lon = positions(reports)
+    vessel_codes = pd.factorize(reports[vessel_col])[0]
+    times = pd.to_datetime(reports[time_col]).to_numpy(dtype="datetime64[ns]")
+    # Two stable sorts are much faster than np.lexsort on datetime keys
+    order = np.argsort(times, kind="stable")
+    order = order[np.argsort(vessel_codes[order], kind="stable")]
+    lat, lon, times = lat[order], lon[order], times[order]
+    first = np.ones(n, dtype=bool)
+    first[1:] = vessel_codes[order][1:] != vessel_codes[order][:-1]
+
+    distance = np.full(n, np.nan)
+    hours = np.full(n, np.nan)
+    course = np.full(n, np.nan)
+    distance[1:] = haversine_nm(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    course[1:] = initial_course(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    hours[1:] = (times[1:] - times[:-1]) / np.timedelta64(1, "h")
+    if idl_col is not None:
+        hours += idl_shift_hours(reports[idl_col].to_numpy()[order])
+    distance[first] = hours[first] = course[first] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sog = np.where(hours > 0, distance / hours, np.nan)
+
+    legs = np.empty((n, len(columns)))
+    legs[order] = np.column_stack([lat, lon, distance, hours, sog, course])
+    return pd.DataFrame(legs, index=reports.index, columns=columns)
@@ -0,0 +1,174 @@
+import csv
+import random
+import string
+from datetime import datetime
+
+import pytz
+
+from report_fields import FIXED_FIELDS, PORTS
+
+VESSEL_PREFIXES = ["MV", "SS", "MT", "MSC", "CMA CGM", "OOCL", "Maersk", "Evergreen", "Cosco", "NYK"]
+VESSEL_NAMES = ["Horizon", "Voyager", "Pioneer", "Adventurer", "Explorer", "Discovery", "Navigator", "Endeavour", "Challenger", "Trailblazer"]
+
+
+def generate_random_position():
+    lat_deg = random.randint(0, 89)
+    lat_min = round(random.uniform(0, 59.99), 2)
+    lat_dir = random.choice(['N', 'S'])
+    lon_deg = random.randint(0, 179)
+    lon_min = round(random.uniform(0, 59.99), 2)
+    lon_dir = random.choice(['E', 'W'])
+    return lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir
+
+def generate_random_consumption():
+    me_lfo = round(random.uniform(20, 25), 1)
+    ae_lfo = round(random.uniform(2, 3), 1)
+    return me_lfo, ae_lfo
+
+
+def generate_random_vessel_name():
+    return f"{random.choice(VESSEL_PREFIXES)} {random.choice(VESSEL_NAMES)}"
+
+def generate_random_imo():
+    return ''.join(random.choices(string.digits, k=7))
+
+
+def decimal_to_position(lat, lon):
+    """Splits decimal degrees into the degree/minute/direction prefill values."""
+    lat_deg, lat_min = divmod(abs(lat) * 60, 60)
+    lon_deg, lon_min = divmod(abs(lon) * 60, 60)
+    return {
+        "lat_deg": int(lat_deg),
+        "lat_min": min(round(lat_min, 2), 59.99),
+        "lat_dir": "N" if lat >= 0 else "S",
+        "lon_deg": int(lon_deg),
+        "lon_min": min(round(lon_min, 2), 59.99),
+        "lon_dir": "E" if lon >= 0 else "W",
+    }
+
+
+def random_source(report_type, vessel):
+    """Demo values used when no other source knows the vessel."""
+    me_lfo, ae_lfo = generate_random_consumption()
+    lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir = generate_random_position()
+    from_port = random.choice(PORTS)
+    to_port = random.choice([p for p in PORTS if p != from_port])
+    voyage_type = random.choice(['L', 'B'])
+    return {
+        "me_lfo": me_lfo,
+        "ae_lfo": ae_lfo,
+        "lat_deg": lat_deg,
+        "lat_min": lat_min,
+        "lat_dir": lat_dir,
+        "lon_deg": lon_deg,
+        "lon_min": lon_min,
+        "lon_dir": lon_dir,
+        "from_port": from_port,
+        "to_port": to_port,
+        "voyage_id": f"{random.randint(10, 99)}{voyage_type}",
+        "segment_id": str(random.randint(1, 5)),
+        "vessel_name": generate_random_vessel_name(),
+        "imo_number": generate_random_imo(),
+    }
+
+
+def clock_source(report_type, vessel):
+    now = datetime.now()
+    return {
+        "current_date": now.date(),
+        "current_time": now.time().replace(second=0, microsecond=0),
+        "utc_offset": datetime.now(pytz.timezone('UTC')).astimezone().strftime('%z'),
+    }
+
+
+def vessel_profile_source(profiles):
+    """Source backed by configured vessel profiles: {imo: {"Vessel Name": ..., ...}}."""
+    def source(report_type, vessel):
+        profile = profiles.get(vessel)
+        if profile is None:
+            return None
+        return {"imo_number": vessel, **report_values_to_prefill(profile)}
+    return source
+
+
+def last_report_source(get_last_report):
+    """Source backed by the vessel's last submitted report.
+
+    get_last_report(vessel, report_type) returns that report's values keyed by field label, or None.
+    """
+    def source(report_type, vessel):
+        report = get_last_report(vessel, report_type)
+        if not report:
+            return None
+        return report_values_to_prefill(report)
+    return source
+
+
+def ais_file_source(path):
+    """Source reading the latest position per vessel from a CSV of imo,timestamp,lat,lon rows.
+
+    Stands in for an AIS feed until one is connected.
+    """
+    latest = {}
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["imo"] not in latest or row["timestamp"] > latest[row["imo"]]["timestamp"]:
+                    latest[row["imo"]] = row
+    except (OSError, KeyError):
+        latest = {}
+
+    def source(report_type, vessel):
+        row = latest.get(vessel)
+        if row is None:
+            return None
+        return decimal_to_position(float(row["lat"]), float(row["lon"]))
+    return source
+
+
+def report_values_to_prefill(values):
+    """Maps report values keyed by field label to prefill value names.
+
+    Stored numbers come back as floats, so they are returned in the type of the field's bounds.
+    """
+    prefill = {}
+    for label, value in values.items():
+        if label in FIXED_FIELDS and value not in (None, ""):
+            kind, params, name = FIXED_FIELDS[label]
+            if kind == "number" and isinstance(params.get("min_value"), int):
+                value = int(value)
+            prefill[name] = value
+    return prefill
+
+
+class PrefillProvider:
+    """Combines prefill sources; later sources override earlier ones."""
+
+    def __init__(self, sources):
+        self.sources = list(sources)
+
+    def values(self, report_type, vessel):
+        values = {}
+        for source in self.sources:
+            values.update(source(report_type, vessel) or {})
+        values["report_type"] = report_type
+        return values
+
+
+def get_draft_prefill(session_state, provider, report_type, vessel):
+    """Prefill values for the current report draft, kept in session state.
+
+    They are only recomputed when the report type or vessel changes, or
+    after discard_draft_prefill().
+    """
+    draft_key = (report_type, vessel)
+    cached = session_state.get("draft_prefill")
+    if cached is None or cached["key"] != draft_key:
+        cached = {"key": draft_key, "values": provider.values(report_type, vessel)}
+        session_state["draft_prefill"] = cached
+    return cached["values"]
+
+
+def discard_draft_prefill(session_state):
+    """Drops the cached prefill once its draft is submitted, so the next draft is prefilled afresh."""
+    session_state.pop("draft_prefill", None)
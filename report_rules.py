@@ -0,0 +1,158 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from report_fields import AE_FUEL_FIELDS, ME_FUEL_FIELDS, SECTION_FIELDS, VALIDATION_RULES
+
+BOILER_FUEL_FIELDS = [field for field in SECTION_FIELDS["Fuel Consumption"]["Boilers"] if field.endswith("(mt)")]
+ROB_FIELDS = ["LFO ROB (mt)", "MGO ROB (mt)", "LNG ROB (mt)", "Other ROB (mt)"]
+TOTAL_ROB_FIELD = "Total Fuel ROB (mt)"
+
+
+class Rule(NamedTuple):
+    name: str
+    kind: str  # "range", "sum_max", "implies_zero" or "sum_equals"
+    fields: tuple  # fields a violation is reported on
+    params: dict
+    message: str
+    severity: str = "error"  # "error" blocks submission, "warning" is shown as a hint
+
+
+class Violation(NamedTuple):
+    rule: str
+    field: str
+    severity: str
+    message: str
+    value: float
+
+
+RULES = (
+    *(
+        Rule(
+            f"{field} range", "range", (field,), limits,
+            f"Value must be between {limits['min']} and {limits['max']}",
+        )
+        for field, limits in VALIDATION_RULES.items()
+    ),
+    Rule(
+        "ME consumption", "sum_max", tuple(ME_FUEL_FIELDS), {"max": 25},
+        "Total ME consumption exceeds expected consumption of 25.", "warning",
+    ),
+    Rule(
+        "AE consumption", "sum_max", tuple(AE_FUEL_FIELDS), {"max": 3},
+        "Total AE consumption exceeds expected consumption of 3.", "warning",
+    ),
+    Rule(
+        "Boiler at high ME load", "implies_zero", tuple(BOILER_FUEL_FIELDS),
+        {"when_sum_of": tuple(ME_FUEL_FIELDS), "exceeds": 15},
+        "Since Main Engine is running at more than 50% load, Boiler consumption is expected to be zero.", "warning",
+    ),
+    Rule(
+        "Total fuel ROB", "sum_equals", (TOTAL_ROB_FIELD,), {"parts": tuple(ROB_FIELDS), "tolerance": 0.1},
+        "Total Fuel ROB doesn't match the sum of individual fuel ROBs.",
+    ),
+)
+
+
+def _sum(columns, fields):
+    # Missing parts count as zero, as in the form where untouched fields are empty
+    return sum(np.nan_to_num(columns(field)) for field in fields)
+
+
+def _compile_rule(rule):
+    """Returns check(columns) -> [(field, violating row mask, observed values)] for one rule.
+
+    columns(field) gives the float64 values of a field for every report, NaN when
+    missing; missing values never violate a rule.
+    """
+    p = rule.params
+    if rule.kind == "range":
+        field = rule.fields[0]
+
+        def check(columns):
+            values = columns(field)
+            return [(field, (values < p["min"]) | (values > p["max"]), values)]
+    elif rule.kind == "sum_max":
+        def check(columns):
+            # Reported on the fields that contribute to the excess total
+            total = _sum(columns, rule.fields)
+            return [(field, (total > p["max"]) & (columns(field) > 0), total) for field in rule.fields]
+    elif rule.kind == "implies_zero":
+        def check(columns):
+            active = _sum(columns, p["when_sum_of"]) > p["exceeds"]
+            return [(field, active & (columns(field) > 0), columns(field)) for field in rule.fields]
+    elif rule.kind == "sum_equals":
+        field = rule.fields[0]
+
+        def check(columns):
+            reported = columns(field)
+            return [(field, np.abs(reported - _sum(columns, p["parts"])) > p["tolerance"], reported)]
+    else:
+        raise ValueError(f"Unknown rule kind: {rule.kind}")
+    return check
+
+
+COMPILED_RULES = tuple((rule, _compile_rule(rule)) for rule in RULES)
+
+
+def _run(columns):
+    for rule, check in COMPILED_RULES:
+        for field, mask, values in check(columns):
+            yield rule, field, np.flatnonzero(mask), values
+
+
+def evaluate_rules(reports):
+    """Checks every rule against a DataFrame of reports (one row each, columns named by field label).
+
+    Returns one row per violated (report, field) with the report's index label.
+    """
+    n = len(reports)
+    cache = {}
+
+    def columns(field):
+        if field not in cache:
+            if field in reports:
+                cache[field] = pd.to_numeric(reports[field], errors="coerce").to_numpy(dtype=np.float64)
+            else:
+                cache[field] = np.full(n, np.nan)
+        return cache[field]
+
+    frames = [
+        pd.DataFrame({
+            "report": reports.index[rows],
+            "rule": rule.name,
+            "field": field,
+            "severity": rule.severity,
+            "message": rule.message,
+            "value": values[rows],
+        })
+        for rule, field, rows, values in _run(columns)
+        if len(rows)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["report", "rule", "field", "severity", "message", "value"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def evaluate_report(values):
+    """Checks every rule against one report given as {field label: value}."""
+    def columns(field):
+        value = values.get(field)
+        try:
+            return np.array([np.nan if value is None else float(value)])
+        except (TypeError, ValueError):
+            return np.array([np.nan])
+
+    return [
+        Violation(rule.name, field, rule.severity, rule.message, float(observed[0]))
+        for rule, field, rows, observed in _run(columns)
+        if len(rows)
+    ]
+
+
+def violations_by_field(violations):
+    by_field = {}
+    for violation in violations:
+        by_field.setdefault(violation.field, []).append(violation)
+    return by_field
@@ -0,0 +1,258 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Define report types
+REPORT_TYPES = [
+    "Arrival", "Departure", "Begin of offhire", "End of offhire", "Arrival STS",
+    "Departure STS", "STS", "Begin canal passage", "End canal passage",
+    "Begin of sea passage", "End of sea passage", "Begin Anchoring/Drifting",
+    "End Anchoring/Drifting", "Noon (Position) - Sea passage", "Noon (Position) - Port",
+    "Noon (Position) - River", "Noon (Position) - Stoppage", "ETA update",
+    "Begin fuel change over", "End fuel change over", "Change destination (Deviation)",
+    "Begin of deviation", "End of deviation", "Entering special area", "Leaving special area"
+]
+
+# Reports that may only follow a given report (Noon reports are always allowed)
+SEQUENCE_RULES = {
+    "Arrival STS": ["Departure STS"],
+    "Begin of offhire": ["End of offhire"],
+    "Begin fuel change over": ["End fuel change over"],
+    "Begin canal passage": ["End canal passage"],
+    "Begin Anchoring/Drifting": ["End Anchoring/Drifting"],
+    "Begin of deviation": ["End of deviation"],
+    "Departure": ["Begin of sea passage", "Noon (Position) - Sea passage"],
+    "Departure STS": ["Begin of sea passage", "Noon (Position) - Sea passage"],
+    "End Anchoring/Drifting": ["Begin of sea passage", "Noon (Position) - Sea passage"],
+}
+
+# Begin/End pairs: an End report needs its Begin to be open, and a Begin cannot be reopened
+PAIRED_REPORTS = {
+    "Begin of offhire": "End of offhire",
+    "Arrival STS": "Departure STS",
+    "Begin canal passage": "End canal passage",
+    "Begin of sea passage": "End of sea passage",
+    "Begin Anchoring/Drifting": "End Anchoring/Drifting",
+    "Begin fuel change over": "End fuel change over",
+    "Begin of deviation": "End of deviation",
+    "Entering special area": "Leaving special area",
+}
+
+REPORT_INDEX = {report: i for i, report in enumerate(REPORT_TYPES)}
+NO_REPORT = len(REPORT_TYPES)  # "last report" index of an empty history
+ALL_REPORTS_MASK = (1 << len(REPORT_TYPES)) - 1
+
+
+def _mask(reports):
+    mask = 0
+    for report in reports:
+        mask |= 1 << REPORT_INDEX[report]
+    return mask
+
+
+def _compile_follower_masks():
+    """Allowed-next bitmask for every possible last report, from SEQUENCE_RULES."""
+    noon_mask = _mask(r for r in REPORT_TYPES if r.startswith("Noon"))
+    restricted_mask = _mask(r for followers in SEQUENCE_RULES.values() for r in followers)
+    masks = []
+    for report in REPORT_TYPES:
+        if report in SEQUENCE_RULES:
+            masks.append(_mask(SEQUENCE_RULES[report]) | noon_mask)
+        else:
+            masks.append((ALL_REPORTS_MASK & ~restricted_mask) | noon_mask)
+    masks.append(ALL_REPORTS_MASK)  # NO_REPORT: any report can start a history
+    return tuple(masks)
+
+
+FOLLOWER_MASKS = _compile_follower_masks()
+# End reports that may follow each last report, given their pair may be open. Only SEQUENCE_RULES
+# restrict them; elsewhere FOLLOWER_MASKS leaves Ends out because they need their Begin.
+END_FOLLOWER_MASKS = tuple(
+    _mask(SEQUENCE_RULES[report]) if report in SEQUENCE_RULES else _mask(PAIRED_REPORTS.values())
+    for report in REPORT_TYPES
+) + (ALL_REPORTS_MASK,)
+# Pair index of each report index, -1 when the report does not open/close a pair
+PAIR_OPENS = tuple(list(PAIRED_REPORTS).index(r) if r in PAIRED_REPORTS else -1 for r in REPORT_TYPES)
+PAIR_CLOSES = tuple(
+    list(PAIRED_REPORTS.values()).index(r) if r in PAIRED_REPORTS.values() else -1 for r in REPORT_TYPES
+)
+BEGIN_MASKS = tuple(_mask([begin]) for begin in PAIRED_REPORTS)
+END_MASKS = tuple(_mask([end]) for end in PAIRED_REPORTS.values())
+ALL_ENDS_MASK = _mask(PAIRED_REPORTS.values())
+
+
+class SequenceState(NamedTuple):
+    last: int = NO_REPORT
+    open_pairs: tuple = ()  # pair indices of the open Begin reports, in the order they were opened
+    closed_pairs: frozenset = frozenset()  # pair indices whose last report in the history was the End
+
+
+@lru_cache(maxsize=None)
+def allowed_mask(state):
+    """Bitmask of the reports that may follow the given state.
+
+    An open Begin cannot be reopened. An End may close any open pair, in any
+    order, since pairs overlap in practice (e.g. a sea passage ends inside a
+    special area). A history may start in the middle of a pair, so an End
+    whose pair does not appear in it is allowed too, as far as SEQUENCE_RULES
+    allow it after the last report; only an End of a pair already closed is
+    refused.
+    """
+    if state.last == NO_REPORT:
+        # Without history we cannot know which pairs are open, so allow everything
+        return ALL_REPORTS_MASK
+    open_begins = 0
+    for pair in state.open_pairs:
+        open_begins |= BEGIN_MASKS[pair]
+    closed_ends = 0
+    for pair in state.closed_pairs:
+        closed_ends |= END_MASKS[pair]
+    ends = ALL_ENDS_MASK & ~closed_ends & END_FOLLOWER_MASKS[state.last]
+    return ((FOLLOWER_MASKS[state.last] & ~ALL_ENDS_MASK) | ends) & ~open_begins
+
+
+def advance(state, report):
+    """Returns the state after submitting report (validity is not checked)."""
+    index = REPORT_INDEX[report]
+    open_pairs, closed_pairs = state.open_pairs, state.closed_pairs
+    if PAIR_CLOSES[index] >= 0:
+        open_pairs = tuple(pair for pair in open_pairs if pair != PAIR_CLOSES[index])
+        closed_pairs = closed_pairs | {PAIR_CLOSES[index]}
+    if PAIR_OPENS[index] >= 0:
+        if PAIR_OPENS[index] not in open_pairs:
+            open_pairs += (PAIR_OPENS[index],)
+        closed_pairs = closed_pairs - {PAIR_OPENS[index]}
+    return SequenceState(index, open_pairs, closed_pairs)
+
+
+def replay(reports):
+    state = SequenceState()
+    for report in reports:
+        state = advance(state, report)
+    return state
+
+
+def valid_next_reports(last_reports):
+    """Report types that can validly follow the whole report history."""
+    mask = allowed_mask(replay(last_reports))
+    return [report for i, report in enumerate(REPORT_TYPES) if mask >> i & 1]
+
+
+def is_valid_next(last_reports, new_report):
+    if new_report not in REPORT_INDEX:
+        return False
+    return bool(allowed_mask(replay(last_reports)) >> REPORT_INDEX[new_report] & 1)
+
+
+def open_reports(last_reports):
+    """Begin reports in the history that still wait for their End report, earliest first."""
+    begins = list(PAIRED_REPORTS)
+    return [begins[pair] for pair in replay(last_reports).open_pairs]
+
+
+# Violation flags returned by validate_report_history (combined with bitwise OR)
+VIOLATION_UNKNOWN_REPORT = 1
+VIOLATION_INVALID_TRANSITION = 2
+VIOLATION_END_WITHOUT_BEGIN = 4
+VIOLATION_BEGIN_ALREADY_OPEN = 8
+VIOLATION_UNCLOSED_BEGIN = 16
+
+VIOLATION_NAMES = {
+    VIOLATION_UNKNOWN_REPORT: "Unknown report type",
+    VIOLATION_INVALID_TRANSITION: "Report cannot follow the previous report",
+    VIOLATION_END_WITHOUT_BEGIN: "End report of a pair that is already closed",
+    VIOLATION_BEGIN_ALREADY_OPEN: "Begin report while the same pair is already open",
+    VIOLATION_UNCLOSED_BEGIN: "Begin report never closed by its End report",
+}
+
+FOLLOWER_TABLE = np.array(
+    [[mask >> i & 1 for i in range(len(REPORT_TYPES))] for mask in FOLLOWER_MASKS], dtype=bool
+)
+END_FOLLOWER_TABLE = np.array(
+    [[mask >> i & 1 for i in range(len(REPORT_TYPES))] for mask in END_FOLLOWER_MASKS], dtype=bool
+)
+PAIR_OF_REPORT = np.array([max(PAIR_OPENS[i], PAIR_CLOSES[i]) for i in range(len(REPORT_TYPES))], dtype=np.int16)
+IS_BEGIN_REPORT = np.array([pair >= 0 for pair in PAIR_OPENS])
+IS_END_REPORT = np.array([pair >= 0 for pair in PAIR_CLOSES])
+
+# State of a report's pair before the report, as tracked by advance()
+PAIR_UNSEEN = 0
+PAIR_OPEN = 1
+PAIR_CLOSED = 2
+
+
+def describe_violations(code):
+    return [name for flag, name in VIOLATION_NAMES.items() if code & flag]
+
+
+def _starts_group(*keys):
+    """True where a row starts a new run of equal keys (rows must be sorted by keys)."""
+    starts = np.zeros(len(keys[0]), dtype=bool)
+    starts[:1] = True
+    for key in keys:
+        starts[1:] |= key[1:] != key[:-1]
+    return starts
+
+
+def validate_report_history(df, vessel_col="vessel", time_col="timestamp", report_col="report_type"):
+    """Validates every vessel's full report sequence in one vectorized pass.
+
+    Rows are ordered by vessel and timestamp, and each row is checked the way
+    is_valid_next() checks it against the vessel's earlier rows, so a row is
+    flagged exactly when the report form would refuse it. On top of that, a
+    Begin report still open at the end of a history is flagged as unclosed.
+    Returns an int Series of VIOLATION_* flags aligned with df.index
+    (0 means the row is valid).
+    """
+    n = len(df)
+    codes = np.zeros(n, dtype=np.int16)
+    if n == 0:
+        return pd.Series(codes, index=df.index, name="violations")
+
+    vessel_codes = pd.factorize(df[vessel_col])[0]
+    order = np.lexsort((df[time_col].to_numpy(), vessel_codes))
+    vessel = vessel_codes[order]
+    report = pd.Categorical(df[report_col].to_numpy()[order], categories=REPORT_TYPES).codes.astype(np.int16)
+    sorted_codes = np.zeros(n, dtype=np.int16)
+
+    known = report >= 0
+    sorted_codes[~known] |= VIOLATION_UNKNOWN_REPORT
+    safe_report = np.where(known, report, 0)
+
+    # State of each row's pair before the row: the pair's previous Begin/End event of the same vessel
+    pair_state = np.full(n, PAIR_UNSEEN, dtype=np.int8)
+    events = np.flatnonzero(known & (PAIR_OF_REPORT[safe_report] >= 0))
+    if len(events):
+        pair = PAIR_OF_REPORT[report[events]]
+        events = events[np.lexsort((events, pair, vessel[events]))]
+        is_begin = IS_BEGIN_REPORT[report[events]]
+        state = np.empty(len(events), dtype=np.int8)
+        state[0] = PAIR_UNSEEN
+        state[1:] = np.where(is_begin[:-1], PAIR_OPEN, PAIR_CLOSED)
+        new_group = _starts_group(vessel[events], PAIR_OF_REPORT[report[events]])
+        state[new_group] = PAIR_UNSEEN
+        pair_state[events] = state
+        # A Begin that is the last event of its pair was never closed
+        last_in_group = np.ones(len(events), dtype=bool)
+        last_in_group[:-1] = new_group[1:]
+        sorted_codes[events[is_begin & last_in_group]] |= VIOLATION_UNCLOSED_BEGIN
+
+    # Every other check is against the previous report of the same vessel; the first
+    # report of a history (or one after an unknown report) can be anything
+    previous = np.empty(n, dtype=np.int16)
+    previous[0] = NO_REPORT
+    previous[1:] = report[:-1]
+    previous[_starts_group(vessel) | (previous < 0)] = NO_REPORT
+    checked = known & (previous != NO_REPORT)
+    is_end = IS_END_REPORT[safe_report]
+    follows = np.where(
+        is_end, END_FOLLOWER_TABLE[previous, safe_report], FOLLOWER_TABLE[previous, safe_report]
+    )
+    sorted_codes[checked & ~follows] |= VIOLATION_INVALID_TRANSITION
+    sorted_codes[checked & IS_BEGIN_REPORT[safe_report] & (pair_state == PAIR_OPEN)] |= VIOLATION_BEGIN_ALREADY_OPEN
+    sorted_codes[checked & is_end & (pair_state == PAIR_CLOSED)] |= VIOLATION_END_WITHOUT_BEGIN
+
+    codes[order] = sorted_codes
+    return pd.Series(codes, index=df.index, name="violations")
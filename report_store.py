@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+import pandas as pd
+
+from report_fields import compile_report
+from report_sequence import REPORT_TYPES
+
+SQL_TYPES = {"number": "DOUBLE PRECISION", "text": "TEXT", "select": "TEXT", "date": "DATE", "time": "TIME"}
+HEADER_COLUMNS = ["report_type", "vessel", "submitted_at"]
+NULL = "\\N"  # NULL marker of the COPY stream
+UUID_SUFFIX = re.compile(r"_[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def column_name(label):
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+
+
+def _report_columns():
+    """One column per form field of any report type, typed by its widget.
+
+    Only the compiled report forms (report_fields) declare their fields; the
+    page forms of report_pages build theirs while rendering, so their values
+    have no column of their own and are kept in extra.
+    """
+    columns = {}
+    for report_type in REPORT_TYPES:
+        for _, groups in compile_report(report_type):
+            for group in groups:
+                for spec in group.fields:
+                    columns.setdefault(spec.label, (column_name(spec.label), SQL_TYPES[spec.kind]))
+    return columns
+
+
+REPORT_COLUMNS = _report_columns()  # field label -> (column, SQL type)
+FIELD_COLUMNS = [column for column, _ in REPORT_COLUMNS.values()]
+LABEL_OF_COLUMN = {column: label for label, (column, _) in REPORT_COLUMNS.items()}
+INSERT_COLUMNS = HEADER_COLUMNS + FIELD_COLUMNS + ["extra"]
+
+
+def _to_sql(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def session_values(session_state, skip_prefixes=("section_",)):
+    """Widget values of the current page, skipping expander state and per-run uuid keys."""
+    return {
+        key: value
+        for key, value in session_state.items()
+        if isinstance(key, str)
+        and not key.startswith(skip_prefixes)
+        and not UUID_SUFFIX.search(key)
+        and isinstance(value, (str, int, float, date, time))
+    }
+
+
+def expand_extra(reports):
+    """Stored reports with the values kept in the extra column as columns of their own.
+
+    Readers of page form reports go through this, since those values are stored in extra.
+    """
+    extra = pd.DataFrame([json.loads(value) if value else {} for value in reports["extra"]], index=reports.index)
+    return reports.drop(columns="extra").join(extra)
+
+
+class ReportStore:
+    """Submitted reports in PostgreSQL (pooled psycopg2 connections) or SQLite.
+
+    url is "postgresql://..." or "sqlite:///path" (four slashes for an absolute
+    path, "sqlite://" alone keeps the database in memory). Values of the compiled report forms map to one
+    typed column per field. Every other value is kept as JSON in the extra column. That covers all the
+    widget values of the page forms (keyed by widget key), so extra is the main store of page form reports.
+    SQL queries see only the typed columns; readers get the rest from load_reports() through expand_extra().
+    """
+
+    def __init__(self, url, min_connections=1, max_connections=5):
+        self.url = url
+        self.is_postgres = url.startswith(("postgresql://", "postgres://"))
+        if self.is_postgres:
+            from psycopg2.pool import ThreadedConnectionPool
+
+            self._pool = ThreadedConnectionPool(min_connections, max_connections, url)
+            self.placeholder = "%s"
+        else:
+            path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else ""
+            # One shared connection, serialized by a lock, stands in for the pool
+            self._sqlite = sqlite3.connect(path or ":memory:", check_same_thread=False)
+            self._sqlite_lock = threading.Lock()
+            self.placeholder = "?"
+        self.create_schema()
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection, committing on success and rolling back on error."""
+        if self.is_postgres:
+            conn = self._pool.getconn()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._pool.putconn(conn)
+        else:
+            with self._sqlite_lock:
+                try:
+                    yield self._sqlite
+                    self._sqlite.commit()
+                except Exception:
+                    self._sqlite.rollback()
+                    raise
+
+    def create_schema(self):
+        id_column = "id BIGSERIAL PRIMARY KEY" if self.is_postgres else "id INTEGER PRIMARY KEY AUTOINCREMENT"
+        field_columns = ",\n".join(f"    {column} {sql_type}" for column, sql_type in REPORT_COLUMNS.values())
+        with self.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS reports (\n    {id_column},\n"
+                "    report_type TEXT NOT NULL,\n    vessel TEXT,\n    submitted_at TIMESTAMP NOT NULL,\n"
+                f"{field_columns},\n    extra TEXT\n)"
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS reports_vessel_time ON reports (vessel, submitted_at)")
+            cur.close()
+
+    def _row(self, report_type, vessel, values, submitted_at):
+        fields = {REPORT_COLUMNS[label][0]: _to_sql(v) for label, v in values.items() if label in REPORT_COLUMNS}
+        extra = {key: _to_sql(v) for key, v in values.items() if key not in REPORT_COLUMNS}
+        return (
+            [report_type, vessel, _to_sql(submitted_at or datetime.now())]
+            + [fields.get(column) for column in FIELD_COLUMNS]
+            + [json.dumps(extra) if extra else None]
+        )
+
+    def save_report(self, report_type, vessel, values, submitted_at=None):
+        """Stores one report given as {field label: value} and returns its id."""
+        row = self._row(report_type, vessel, values, submitted_at)
+        sql = (
+            f"INSERT INTO reports ({', '.join(INSERT_COLUMNS)}) "
+            f"VALUES ({', '.join([self.placeholder] * len(INSERT_COLUMNS))})"
+        )
+        with self.connection() as conn:
+            cur = conn.cursor()
+            if self.is_postgres:
+                cur.execute(sql + " RETURNING id", row)
+                report_id = cur.fetchone()[0]
+            else:
+                cur.execute(sql, row)
+                report_id = cur.lastrowid
+            cur.close()
+        return report_id
+
+    def bulk_load(self, reports):
+        """Loads a DataFrame of past reports in one statement and returns the row count.
+
+        Needs report_type, vessel and submitted_at columns; the other columns
+        are field labels, and the ones without a typed column (e.g. page form
+        widget keys) go to extra. PostgreSQL loads through
+        COPY, SQLite through a single executemany.
+        """
+        known = [label for label in reports.columns if label in REPORT_COLUMNS]
+        fields = reports[known].set_axis([REPORT_COLUMNS[label][0] for label in known], axis=1)
+        frame = pd.concat([reports[HEADER_COLUMNS], fields], axis=1).reindex(columns=HEADER_COLUMNS + FIELD_COLUMNS)
+        leftover = reports.columns.difference(HEADER_COLUMNS + known)
+        if len(leftover):
+            frame["extra"] = [json.dumps(row, default=str) for row in reports[leftover].to_dict("records")]
+        else:
+            frame["extra"] = None
+        frame["submitted_at"] = pd.to_datetime(frame["submitted_at"])
+
+        with self.connection() as conn:
+            cur = conn.cursor()
+            if self.is_postgres:
+                buffer = io.StringIO()
+                frame.to_csv(buffer, header=False, index=False, na_rep=NULL, quoting=csv.QUOTE_MINIMAL)
+                buffer.seek(0)
+                cur.copy_expert(
+                    f"COPY reports ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+                    buffer,
+                )
+            else:
+                frame["submitted_at"] = frame["submitted_at"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+                for column in frame.columns[frame.dtypes == object]:
+                    frame[column] = frame[column].map(_to_sql, na_action="ignore")
+                rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+                cur.executemany(
+                    f"INSERT INTO reports ({', '.join(INSERT_COLUMNS)}) "
+                    f"VALUES ({', '.join(['?'] * len(INSERT_COLUMNS))})",
+                    rows,
+                )
+            cur.close()
+        return len(frame)
+
+    def _where(self, vessel, report_type):
+        conditions, params = [], []
+        if vessel is not None:
+            conditions.append(f"vessel = {self.placeholder}")
+            params.append(vessel)
+        if report_type is not None:
+            conditions.append(f"report_type = {self.placeholder}")
+            params.append(report_type)
+        return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    def load_reports(self, vessel=None, report_type=None):
+        """Stored reports ordered by submission time, with columns named by field label.
+
+        Values without a typed column stay JSON in the extra column; expand_extra() spreads them out.
+        """
+        where, params = self._where(vessel, report_type)
+        with self.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f"SELECT id, {', '.join(INSERT_COLUMNS)} FROM reports{where} ORDER BY submitted_at, id", params)
+            rows = cur.fetchall()
+            cur.close()
+        frame = pd.DataFrame(rows, columns=["id"] + INSERT_COLUMNS).set_index("id")
+        return frame.rename(columns=LABEL_OF_COLUMN)
+
+    def last_report(self, vessel, report_type=None):
+        """Values of the vessel's latest stored report keyed by field label, extra values included; None without one."""
+        where, params = self._where(vessel, report_type)
+        with self.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT {', '.join(FIELD_COLUMNS + ['extra'])} FROM reports{where} ORDER BY submitted_at DESC, id DESC LIMIT 1",
+                params,
+            )
+            row = cur.fetchone()
+            cur.close()
+        if row is None:
+            return None
+        values = {LABEL_OF_COLUMN[column]: value for column, value in zip(FIELD_COLUMNS, row) if value is not None}
+        return {**(json.loads(row[-1]) if row[-1] else {}), **values}
+
+    def close(self):
+        if self.is_postgres:
+            self._pool.closeall()
+        else:
+            self._sqlite.close()
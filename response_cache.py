@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(user_input):
+    """Lower-cases, collapses whitespace and drops trailing punctuation."""
+    text = re.sub(r"\s+", " ", user_input.strip().lower())
+    return text.rstrip("?!. ")
+
+
+def make_cache_key(user_input, last_reports):
+    return json.dumps([normalize_prompt(user_input), list(last_reports)])
+
+
+class ResponseCache:
+    """LRU cache with TTL eviction, persisted to a JSON file on local disk.
+
+    Concurrent requests for the same key are coalesced: the first caller
+    computes the value and the others wait for its result.
+    """
+
+    def __init__(self, path=None, max_entries=512, ttl_seconds=6 * 60 * 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._in_flight = {}  # key -> {"event": Event, "value": ..., "error": ...}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, stored_at, value in entries:
+            if now - stored_at < self.ttl_seconds:
+                self._entries[key] = (stored_at, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        entries = [[key, stored_at, value] for key, (stored_at, value) in self._entries.items()]
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._save()
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, calling compute() at most once per key at a time."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            flight = self._in_flight.get(key)
+            if flight is None:
+                self.misses += 1
+                flight = {"event": threading.Event(), "value": None, "error": None}
+                self._in_flight[key] = flight
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            flight["event"].wait()
+            if flight["error"] is not None:
+                raise flight["error"]
+            return flight["value"]
+
+        try:
+            flight["value"] = compute()
+            self.put(key, flight["value"])
+        except Exception as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight["event"].set()
+        return flight["value"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,101 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+class RobChain:
+    """Per-tank ROB carried from report to report through a voyage (COSP, Noons, EOSP, Arrival, ...).
+
+    Each report records its net change (Current ROB - Previous ROB), and its
+    Previous ROB is the Current ROB of the report it follows, or the opening
+    ROB for the first one. The dependency graph links every report to the
+    reports that follow it, so amending a report shifts the Current ROB of its
+    downstream reports by the amendment and leaves everything upstream alone.
+    """
+
+    def __init__(self, tanks, opening_rob):
+        self.tanks = list(tanks)
+        self.opening_rob = np.asarray(opening_rob, dtype=np.float64).copy()
+        self.reports = []  # report ids in submission order, which is a topological order
+        self.position = {}  # report id -> row of net_change and current_rob
+        self.follows = {}  # report id -> report it follows, None for the first
+        self.dependents = {}  # report id -> reports that follow it
+        self._net_change = np.zeros((16, len(self.tanks)))
+        self._current_rob = np.zeros((16, len(self.tanks)))
+
+    def __len__(self):
+        return len(self.reports)
+
+    @property
+    def net_change(self):
+        return self._net_change[:len(self.reports)]
+
+    @property
+    def current_rob(self):
+        """Reports × tanks Current ROB."""
+        return self._current_rob[:len(self.reports)]
+
+    @property
+    def last_rob(self):
+        """Current ROB of the latest report, i.e. the Previous ROB of the next one."""
+        return self._current_rob[len(self.reports) - 1].copy() if self.reports else self.opening_rob.copy()
+
+    def _rob_before(self, report_id):
+        previous = self.follows[report_id]
+        return self.opening_rob if previous is None else self._current_rob[self.position[previous]]
+
+    def append(self, report_id, net_change, follows=None):
+        """Adds a report after follows (the latest report by default) and returns its Current ROB."""
+        if report_id in self.position:
+            raise ValueError(f"Report {report_id!r} is already in the chain")
+        if follows is None and self.reports:
+            follows = self.reports[-1]
+        n = len(self.reports)
+        if n == len(self._net_change):
+            self._net_change = np.concatenate([self._net_change, np.zeros_like(self._net_change)])
+            self._current_rob = np.concatenate([self._current_rob, np.zeros_like(self._current_rob)])
+        self.reports.append(report_id)
+        self.position[report_id] = n
+        self.follows[report_id] = follows
+        self.dependents[report_id] = []
+        if follows is not None:
+            self.dependents[follows].append(report_id)
+        self._net_change[n] = net_change
+        self._current_rob[n] = self._rob_before(report_id) + self._net_change[n]
+        return self._current_rob[n].copy()
+
+    def downstream(self, report_id):
+        """Reports whose ROB depends on report_id, in chain order."""
+        found, queue = [], deque(self.dependents[report_id])
+        while queue:
+            report = queue.popleft()
+            found.append(report)
+            queue.extend(self.dependents[report])
+        return sorted(found, key=self.position.__getitem__)
+
+    def amend(self, report_id, net_change):
+        """Replaces a report's net change and returns the reports that were recomputed.
+
+        ROB is additive along the chain, so the report and everything downstream
+        move by the same per-tank shift.
+        """
+        row = self.position[report_id]
+        shift = np.asarray(net_change, dtype=np.float64) - self._net_change[row]
+        self._net_change[row] += shift
+        affected = [report_id] + self.downstream(report_id)
+        self._current_rob[[self.position[report] for report in affected]] += shift
+        return affected
+
+    def recompute(self):
+        """Rebuilds every Current ROB from the opening ROB and the net changes."""
+        for report_id in self.reports:
+            row = self.position[report_id]
+            self._current_rob[row] = self._rob_before(report_id) + self._net_change[row]
+
+    def previous_rob(self, report_id):
+        return self._rob_before(report_id).copy()
+
+    def frame(self):
+        """Current ROB by report and tank."""
+        return pd.DataFrame(self.current_rob, index=self.reports, columns=self.tanks)
@@ -0,0 +1,204 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Columns of an imported calibration table; one row per table entry
+TANK = "Tank"
+TABLE = "Table"
+SOUNDING = "Sounding (m)"
+ANGLE = "Angle"
+VALUE = "Value"
+CALIBRATION_COLUMNS = [TANK, TABLE, SOUNDING, ANGLE, VALUE]
+
+# Kinds of table; the correction tables give a correction (m) to add to the observed sounding
+TABLE_VOLUME = "Volume"  # Value: volume (m3) at the sounding on even keel; no Angle
+TABLE_TRIM = "Trim"  # Angle: trim (m, + by the stern)
+TABLE_HEEL = "Heel"  # Angle: heel (degrees, + to starboard)
+
+
+class CalibrationError(ValueError):
+    pass
+
+
+class _Axis(NamedTuple):
+    """Ascending nodes of every tank, tank after tank, searchable for all tanks at once."""
+    nodes: np.ndarray
+    keys: np.ndarray  # nodes shifted by tank x span, so one searchsorted serves every tank
+    start: np.ndarray  # first node of each tank
+    count: np.ndarray  # nodes of each tank, 0 without a table
+    low: float
+    span: float
+
+
+def _axis(per_tank):
+    count = np.array([len(nodes) for nodes in per_tank], dtype=np.int64)
+    nodes = np.concatenate(per_tank) if count.any() else np.zeros(1)
+    low, high = nodes.min(), nodes.max()
+    span = high - low + 1.0
+    tank = np.repeat(np.arange(len(per_tank)), count)
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    return _Axis(nodes, tank * span + (nodes[:len(tank)] - low), start, count, low, span)
+
+
+def _locate(axis, tank, x):
+    """Lower node of every x in its tank's nodes and the fraction of the way to the next node."""
+    i = np.searchsorted(axis.keys, tank * axis.span + (x - axis.low), side="right") - 1
+    i = np.clip(i, axis.start[tank], axis.start[tank] + axis.count[tank] - 2)
+    low, high = axis.nodes[i], axis.nodes[i + 1]
+    return i, (x - low) / (high - low)
+
+
+class CompiledCalibration:
+    """Sounding tables of a vessel's tanks, compiled once into flat arrays.
+
+    volume() interpolates any number of soundings of any tanks in one
+    vectorized pass: the trim and heel corrections bilinearly in their
+    (sounding x angle) grids, then the volume linearly in the sounding table.
+    """
+
+    def __init__(self, tanks, volume_tables, trim_tables, heel_tables):
+        self.tanks = list(tanks)
+        self._tank_index = pd.Index(self.tanks)
+        self._soundings = _axis([table[0] for table in volume_tables])
+        self._volumes = np.concatenate([table[1] for table in volume_tables])
+        self._volume_keys = _axis([table[1] for table in volume_tables])  # for sounding_for_volume()
+        self.heights = np.array([table[0][-1] for table in volume_tables])
+        self.capacities = np.array([table[1][-1] for table in volume_tables])
+        self._trim = self._grid(trim_tables)
+        self._heel = self._grid(heel_tables)
+
+    @staticmethod
+    def _grid(tables):
+        """(sounding axis, angle axis, values row by row, first value of each tank) of correction grids."""
+        empty = (np.zeros(0), np.zeros(0), np.zeros((0, 0)))
+        tables = [table or empty for table in tables]
+        count = np.array([table[2].size for table in tables], dtype=np.int64)
+        values = np.concatenate([table[2].ravel() for table in tables]) if count.any() else np.zeros(0)
+        return (_axis([table[0] for table in tables]), _axis([table[1] for table in tables]), values,
+                np.concatenate([[0], np.cumsum(count)[:-1]]))
+
+    def positions(self, tanks):
+        """Index of every tank name, -1 for tanks without a table."""
+        return self._tank_index.get_indexer(np.atleast_1d(np.asarray(tanks, dtype=object)))
+
+    def _correction(self, grid, tank, sounding, angle):
+        """Sounding correction (m) from a grid; 0 without a table, NaN for angles outside it."""
+        soundings, angles, values, first = grid
+        correction = np.zeros(len(tank))
+        rows = np.flatnonzero(angles.count[tank] > 0)
+        if len(rows) == 0:
+            return correction
+        t = tank[rows]
+        s = np.clip(sounding[rows], soundings.nodes[soundings.start[t]], soundings.nodes[soundings.start[t] + soundings.count[t] - 1])
+        a = angle[rows]
+        i, fi = _locate(soundings, t, s)
+        j, fj = _locate(angles, t, a)
+        cell = first[t] + (i - soundings.start[t]) * angles.count[t] + (j - angles.start[t])
+        step = angles.count[t]
+        value = (
+            (values[cell] * (1 - fj) + values[cell + 1] * fj) * (1 - fi)
+            + (values[cell + step] * (1 - fj) + values[cell + step + 1] * fj) * fi
+        )
+        outside = (a < angles.nodes[angles.start[t]]) | (a > angles.nodes[angles.start[t] + angles.count[t] - 1])
+        correction[rows] = np.where(outside, np.nan, value)
+        return correction
+
+    def _corrected(self, tank, soundings, trim, heel):
+        sounding, trim, heel = (np.broadcast_to(np.asarray(v, dtype=np.float64), tank.shape) for v in (soundings, trim, heel))
+        known = tank >= 0
+        corrected = np.full(tank.shape, np.nan)
+        t, s = tank[known], sounding[known]
+        corrected[known] = s + self._correction(self._trim, t, s, trim[known]) + self._correction(self._heel, t, s, heel[known])
+        return corrected
+
+    def corrected_sounding(self, tanks, soundings, trim=0.0, heel=0.0):
+        """Observed soundings corrected for trim and heel."""
+        return self._corrected(self.positions(tanks), soundings, trim, heel)
+
+    def volume(self, tanks, soundings, trim=0.0, heel=0.0):
+        """Volume (m3) of observed soundings (m) at a trim (m) and heel (degrees); scalars or arrays per tank.
+
+        A corrected sounding below the table reads as the lowest entry. NaN
+        for unknown tanks, soundings above the table and trims or heels
+        outside the correction tables.
+        """
+        tank = self.positions(tanks)
+        corrected = self._corrected(tank, soundings, trim, heel)
+        volume = np.full(tank.shape, np.nan)
+        rows = np.flatnonzero(tank >= 0)
+        t, s = tank[rows], corrected[rows]
+        s = np.maximum(s, self._soundings.nodes[self._soundings.start[t]])
+        i, f = _locate(self._soundings, t, s)
+        value = self._volumes[i] + f * (self._volumes[i + 1] - self._volumes[i])
+        volume[rows] = np.where(s <= self.heights[t], value, np.nan)
+        return volume
+
+    def sounding_for_volume(self, tanks, volumes):
+        """Even keel sounding (m) that holds a volume (m3); NaN beyond the capacity."""
+        tank = self.positions(tanks)
+        volume = np.broadcast_to(np.asarray(volumes, dtype=np.float64), tank.shape)
+        sounding = np.full(tank.shape, np.nan)
+        rows = np.flatnonzero(tank >= 0)
+        t = tank[rows]
+        v = np.maximum(volume[rows], self._volumes[self._volume_keys.start[t]])
+        i, f = _locate(self._volume_keys, t, v)
+        value = self._soundings.nodes[i] + f * (self._soundings.nodes[i + 1] - self._soundings.nodes[i])
+        sounding[rows] = np.where(v <= self.capacities[t], value, np.nan)
+        return sounding
+
+    def sounding_from_ullage(self, tanks, ullages):
+        """Sounding (m) of an ullage measured down from the top of the tank's table."""
+        tank = self.positions(tanks)
+        return np.where(tank >= 0, self.heights[tank] - np.asarray(ullages, dtype=np.float64), np.nan)
+
+
+def _volume_table(tank, rows):
+    rows = rows.sort_values(SOUNDING)
+    soundings, volumes = rows[SOUNDING].to_numpy(dtype=np.float64), rows[VALUE].to_numpy(dtype=np.float64)
+    if len(soundings) < 2:
+        raise CalibrationError(f"{tank}: the volume table needs at least two soundings")
+    if (np.diff(soundings) <= 0).any() or (np.diff(volumes) <= 0).any():
+        raise CalibrationError(f"{tank}: soundings must be unique and volumes must increase with the sounding")
+    return soundings, volumes
+
+
+def _correction_grid(tank, kind, rows):
+    grid = rows.pivot_table(index=SOUNDING, columns=ANGLE, values=VALUE, aggfunc="first").sort_index().sort_index(axis=1)
+    if grid.shape[0] < 1 or grid.shape[1] < 2:
+        raise CalibrationError(f"{tank}: the {kind.lower()} table needs at least two {kind.lower()} values")
+    if grid.isna().any().any():
+        raise CalibrationError(f"{tank}: the {kind.lower()} table needs a correction for every sounding and {kind.lower()}")
+    if grid.shape[0] == 1:  # one row: the same correction at every sounding
+        grid = pd.concat([grid, grid.set_axis(grid.index + 1.0)])
+    return grid.index.to_numpy(dtype=np.float64), grid.columns.to_numpy(dtype=np.float64), grid.to_numpy(dtype=np.float64)
+
+
+def compile_calibration(tables):
+    """CompiledCalibration of a long table with CALIBRATION_COLUMNS; raises CalibrationError for unusable tables.
+
+    Every tank needs a TABLE_VOLUME table; TABLE_TRIM and TABLE_HEEL tables
+    are optional and must be complete grids of sounding x angle.
+    """
+    missing = set(CALIBRATION_COLUMNS) - set(tables.columns) - {ANGLE}
+    if missing:
+        raise CalibrationError(f"Missing columns: {', '.join(sorted(missing))}")
+    tables = tables.assign(**{
+        column: pd.to_numeric(tables[column], errors="coerce") if column in tables else np.nan
+        for column in (SOUNDING, ANGLE, VALUE)
+    }).dropna(subset=[TANK, SOUNDING, VALUE])
+    kinds = set(tables[TABLE].unique()) - {TABLE_VOLUME, TABLE_TRIM, TABLE_HEEL}
+    if kinds:
+        raise CalibrationError(f"Unknown tables: {', '.join(sorted(map(str, kinds)))}")
+
+    tanks = list(pd.unique(tables.loc[tables[TABLE] == TABLE_VOLUME, TANK]))
+    unknown = set(tables[TANK]) - set(tanks)
+    if unknown:
+        raise CalibrationError(f"No volume table for {', '.join(sorted(map(str, unknown)))}")
+    grouped = {key: rows for key, rows in tables.groupby([TANK, TABLE], sort=False)}
+    return CompiledCalibration(
+        tanks,
+        [_volume_table(tank, grouped[tank, TABLE_VOLUME]) for tank in tanks],
+        [_correction_grid(tank, TABLE_TRIM, grouped[tank, TABLE_TRIM]) if (tank, TABLE_TRIM) in grouped else None for tank in tanks],
+        [_correction_grid(tank, TABLE_HEEL, grouped[tank, TABLE_HEEL]) if (tank, TABLE_HEEL) in grouped else None for tank in tanks],
+    )
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+# Kinds of tank operation
+OP_TRANSFER = 0  # from_tank -> to_tank
+OP_BUNKERING = 1  # into to_tank
+OP_DEBUNKERING = 2  # out of from_tank
+OP_CONSUMPTION = 3  # out of from_tank
+OP_SURVEY = 4  # signed correction of to_tank
+
+OPERATION_NAMES = {
+    OP_TRANSFER: "Transfer",
+    OP_BUNKERING: "Bunkering",
+    OP_DEBUNKERING: "Debunkering",
+    OP_CONSUMPTION: "Consumption",
+    OP_SURVEY: "Survey correction",
+}
+
+NO_TANK = -1
+SNAPSHOT_INTERVAL = 256  # operations between ROB snapshots
+
+HISTORY_COLUMNS = {
+    "Timestamp": "time",
+    "Operation": "kind",
+    "From Tank": "from_tank",
+    "To Tank": "to_tank",
+    "Quantity (MT)": "quantity",
+    "Source Fuel Grade": "from_grade",
+    "Destination Fuel Grade": "to_grade",
+    "Reference": "reference",
+}
+
+
+class TankOperationLedger:
+    """Append-only, columnar log of everything that moves fuel in or out of the tanks.
+
+    Transfers, bunkering, debunkering, consumption and survey corrections are
+    rows of parallel arrays kept in time order; an operation dated before the
+    latest one is inserted at its place, and seq keeps the order of entry.
+    Nothing is changed or removed once recorded.
+
+    The ROB after every SNAPSHOT_INTERVAL operations is kept as a snapshot, so
+    rob_at(time) is a binary search plus a replay of at most one interval,
+    instead of a replay of the whole log.
+    """
+
+    def __init__(self, tanks, opening_rob, capacity=64):
+        self.tanks = list(tanks)
+        self.tank_index = {tank: i for i, tank in enumerate(self.tanks)}
+        self.opening_rob = np.asarray(opening_rob, dtype=np.float64).copy()
+        self.current_rob = self.opening_rob.copy()
+        self.version = 0  # bumped by every append
+        self._n = 0
+        self._columns = {
+            "seq": np.zeros(capacity, dtype=np.int64),
+            "time": np.zeros(capacity, dtype="datetime64[ns]"),
+            "kind": np.zeros(capacity, dtype=np.int8),
+            "from_tank": np.full(capacity, NO_TANK, dtype=np.int32),
+            "to_tank": np.full(capacity, NO_TANK, dtype=np.int32),
+            "quantity": np.zeros(capacity),
+            "from_grade": np.empty(capacity, dtype=object),
+            "to_grade": np.empty(capacity, dtype=object),
+            "reference": np.empty(capacity, dtype=object),
+        }
+        self._snapshots = np.zeros((0, len(self.tanks)))  # row k: ROB after the first (k + 1) * SNAPSHOT_INTERVAL operations
+        self._history = None  # (version, kinds, DataFrame)
+
+    def __len__(self):
+        return self._n
+
+    def column(self, name):
+        """One column of the log in time order (a read-only view)."""
+        view = self._columns[name][:self._n]
+        view.flags.writeable = False
+        return view
+
+    def _tank(self, tank):
+        return NO_TANK if tank is None else self.tank_index[tank]
+
+    def append(self, kind, quantity, time=None, from_tank=None, to_tank=None,
+               from_grade=None, to_grade=None, reference=None):
+        """Records one operation and returns the tanks' Current ROB after it."""
+        if kind not in OPERATION_NAMES:
+            raise ValueError(f"Unknown tank operation {kind!r}")
+        source, destination = self._tank(from_tank), self._tank(to_tank)
+        if kind in (OP_TRANSFER, OP_DEBUNKERING, OP_CONSUMPTION) and source == NO_TANK:
+            raise ValueError(f"{OPERATION_NAMES[kind]} needs a source tank")
+        if kind in (OP_TRANSFER, OP_BUNKERING, OP_SURVEY) and destination == NO_TANK:
+            raise ValueError(f"{OPERATION_NAMES[kind]} needs a destination tank")
+        time = np.datetime64(pd.Timestamp.now() if time is None else pd.Timestamp(time), "ns")
+
+        if self._n == len(self._columns["seq"]):
+            self._columns = {name: np.concatenate([values, np.empty_like(values)]) for name, values in self._columns.items()}
+        # Keep time order; an operation dated in the past goes after everything at or before its time
+        row = int(np.searchsorted(self._columns["time"][:self._n], time, side="right"))
+        if row < self._n:
+            for values in self._columns.values():
+                values[row + 1:self._n + 1] = values[row:self._n]
+            self._snapshots = self._snapshots[:row // SNAPSHOT_INTERVAL]
+        values = {
+            "seq": self.version, "time": time, "kind": kind, "from_tank": source, "to_tank": destination,
+            "quantity": quantity, "from_grade": from_grade, "to_grade": to_grade, "reference": reference,
+        }
+        for name, value in values.items():
+            self._columns[name][row] = value
+        self._n += 1
+        self.version += 1
+        self._apply(self.current_rob, row, row + 1)
+        return self.current_rob.copy()
+
+    def transfer(self, from_tank, to_tank, quantity, time=None, from_grade=None, to_grade=None):
+        return self.append(OP_TRANSFER, quantity, time, from_tank, to_tank, from_grade, to_grade)
+
+    def _apply(self, rob, lo, hi):
+        """Adds the ROB changes of operations lo:hi to rob in place."""
+        columns = self._columns
+        quantity = columns["quantity"][lo:hi]
+        source, destination = columns["from_tank"][lo:hi], columns["to_tank"][lo:hi]
+        np.subtract.at(rob, source[source != NO_TANK], quantity[source != NO_TANK])
+        np.add.at(rob, destination[destination != NO_TANK], quantity[destination != NO_TANK])
+
+    def _snapshot(self, k):
+        """ROB after the first k * SNAPSHOT_INTERVAL operations, building missing snapshots on the way."""
+        while len(self._snapshots) < k:
+            rob = self._snapshots[-1].copy() if len(self._snapshots) else self.opening_rob.copy()
+            start = len(self._snapshots) * SNAPSHOT_INTERVAL
+            self._apply(rob, start, start + SNAPSHOT_INTERVAL)
+            self._snapshots = np.vstack([self._snapshots, rob])
+        return self._snapshots[k - 1].copy() if k else self.opening_rob.copy()
+
+    def rob_at(self, time):
+        """ROB of every tank after all operations at or before time."""
+        time = np.datetime64(pd.Timestamp(time), "ns")
+        count = int(np.searchsorted(self._columns["time"][:self._n], time, side="right"))
+        k = count // SNAPSHOT_INTERVAL
+        rob = self._snapshot(k)
+        self._apply(rob, k * SNAPSHOT_INTERVAL, count)
+        return rob
+
+    def rob(self, tank):
+        return float(self.current_rob[self.tank_index[tank]])
+
+    def history(self, kinds=None):
+        """The log as a display table (time order), rebuilt only after new operations."""
+        kinds = None if kinds is None else tuple(kinds)
+        if self._history is not None and self._history[:2] == (self.version, kinds):
+            return self._history[2]
+        rows = slice(None) if kinds is None else np.isin(self.column("kind"), kinds)
+        tank_names = np.array(self.tanks + [None], dtype=object)  # NO_TANK indexes the trailing None
+        frame = pd.DataFrame({
+            label: (
+                tank_names[self.column(name)[rows]] if name.endswith("_tank")
+                else pd.Series(self.column(name)[rows]).map(OPERATION_NAMES).to_numpy() if name == "kind"
+                else self.column(name)[rows]
+            )
+            for label, name in HISTORY_COLUMNS.items()
+        })
+        self._history = (self.version, kinds, frame)
+        return frame
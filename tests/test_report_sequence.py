@@ -0,0 +1,46 @@
+import random
+
+import pandas as pd
+import pytest
+
+from report_sequence import (PAIRED_REPORTS, REPORT_TYPES, VIOLATION_UNCLOSED_BEGIN, is_valid_next,
+                             validate_report_history)
+
+# Paired reports drawn more often than the rest, so histories open and close pairs a lot
+WEIGHTED_REPORTS = REPORT_TYPES + 3 * (list(PAIRED_REPORTS) + list(PAIRED_REPORTS.values()))
+
+
+def random_histories(seed, vessels=200, max_length=40):
+    rng = random.Random(seed)
+    return {
+        vessel: [rng.choice(WEIGHTED_REPORTS) for _ in range(rng.randint(1, max_length))]
+        for vessel in range(vessels)
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bulk_validator_flags_what_the_form_rejects(seed):
+    histories = random_histories(seed)
+    rows = pd.DataFrame(
+        [(vessel, time, report) for vessel, reports in histories.items() for time, report in enumerate(reports)],
+        columns=["vessel", "timestamp", "report_type"],
+    ).sample(frac=1, random_state=seed)
+    rows["violations"] = validate_report_history(rows)
+
+    for vessel, reports in histories.items():
+        codes = rows[rows["vessel"] == vessel].sort_values("timestamp")["violations"].tolist()
+        for i, (report, code) in enumerate(zip(reports, codes)):
+            rejected = code & ~VIOLATION_UNCLOSED_BEGIN != 0
+            assert rejected == (not is_valid_next(reports[:i], report)), (reports[:i + 1], code)
+
+
+def test_end_report_of_a_pair_outside_the_history_is_allowed():
+    assert is_valid_next(["Noon (Position) - Port"], "End of offhire")
+    assert not is_valid_next(["Begin of offhire", "End of offhire", "Noon (Position) - Port"], "End of offhire")
+
+
+def test_overlapping_pairs_can_close_in_any_order():
+    history = ["Begin of offhire", "Noon (Position) - Port", "Begin of deviation", "Noon (Position) - Port"]
+    assert is_valid_next(history, "End of offhire")
+    rows = pd.DataFrame({"vessel": "A", "timestamp": range(5), "report_type": history + ["End of offhire"]})
+    assert validate_report_history(rows).tolist() == [0, 0, VIOLATION_UNCLOSED_BEGIN, 0, 0]
@@ -0,0 +1,97 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+REFERENCE_TEMP_C = 15.0
+AIR_BUOYANCY = 1.1  # kg/m3; weight in air = volume at 15 °C x (density at 15 °C - 1.1)
+TEMP_RANGE_C = (-20.0, 150.0)
+DENSITY_STEP = 0.5  # kg/m3 between table rows
+TEMP_STEP = 0.5  # °C between table columns
+
+
+class ProductBand(NamedTuple):
+    """ASTM D1250 Table 54B product group: thermal expansion alpha15 = k0 / rho^2 + k1 / rho + a."""
+    name: str
+    density_min: float  # kg/m3 at 15 °C
+    density_max: float
+    k0: float
+    k1: float
+    a: float = 0.0
+
+
+PRODUCT_BANDS = (
+    ProductBand("Gasolines", 653.0, 770.5, 346.4228, 0.4388),
+    ProductBand("Transition zone", 770.5, 787.5, 2680.3206, 0.0, -0.00336312),
+    ProductBand("Jet fuels", 787.5, 838.5, 594.5418, 0.0),
+    ProductBand("Fuel oils", 838.5, 1075.0, 186.9696, 0.4862),
+)
+BAND_EDGES = np.array([band.density_min for band in PRODUCT_BANDS] + [PRODUCT_BANDS[-1].density_max])
+
+
+def vcf_formula(density15, temperature, band):
+    """Volume correction factor to 15 °C straight from the Table 54B equations."""
+    density15 = np.asarray(density15, dtype=np.float64)
+    alpha = band.k0 / density15 ** 2 + band.k1 / density15 + band.a
+    delta = np.asarray(temperature, dtype=np.float64) - REFERENCE_TEMP_C
+    return np.exp(-alpha * delta * (1.0 + 0.8 * alpha * delta))
+
+
+@lru_cache(maxsize=None)
+def band_table(band_index):
+    """Precomputed VCF grid of one product band: (density nodes, temperature nodes, table)."""
+    band = PRODUCT_BANDS[band_index]
+    densities = np.arange(band.density_min, band.density_max + DENSITY_STEP / 2, DENSITY_STEP)
+    temps = np.arange(TEMP_RANGE_C[0], TEMP_RANGE_C[1] + TEMP_STEP / 2, TEMP_STEP)
+    return densities, temps, vcf_formula(densities[:, None], temps[None, :], band)
+
+
+@lru_cache(maxsize=None)
+def _stacked_tables():
+    """All band grids stacked row-wise, with each band's first row and row count."""
+    tables = [band_table(i)[2] for i in range(len(PRODUCT_BANDS))]
+    rows = np.array([len(table) for table in tables])
+    return np.vstack(tables), np.concatenate([[0], np.cumsum(rows)[:-1]]), rows
+
+
+def volume_correction_factor(density15, temperature):
+    """VCF (ASTM D1250 Table 54B) for any arrays of density at 15 °C (kg/m3) and temperature (°C).
+
+    Values are interpolated bilinearly in the precomputed grid of the
+    density's product band, all readings in one gather, rather than a Python
+    call per reading. NaN outside the tables' density and temperature range.
+    """
+    density15, temperature = np.broadcast_arrays(
+        np.asarray(density15, dtype=np.float64), np.asarray(temperature, dtype=np.float64)
+    )
+    shape = density15.shape
+    density15, temperature = density15.ravel(), temperature.ravel()
+    table, first_row, rows = _stacked_tables()
+    bands = np.searchsorted(BAND_EDGES, density15, side="right") - 1
+    bands[density15 == BAND_EDGES[-1]] = len(PRODUCT_BANDS) - 1  # the top edge belongs to the last band
+    in_range = (bands >= 0) & (bands < len(PRODUCT_BANDS)) & (temperature >= TEMP_RANGE_C[0]) & (temperature <= TEMP_RANGE_C[1])
+    bands = np.where(in_range, bands, 0)
+
+    d = np.where(in_range, (density15 - BAND_EDGES[bands]) / DENSITY_STEP, 0.0)
+    t = np.where(in_range, (temperature - TEMP_RANGE_C[0]) / TEMP_STEP, 0.0)
+    i = np.minimum(d.astype(np.int64), rows[bands] - 2)
+    j = np.minimum(t.astype(np.int64), table.shape[1] - 2)
+    fd, ft = d - i, t - j
+    i += first_row[bands]
+    result = (
+        (table[i, j] * (1 - ft) + table[i, j + 1] * ft) * (1 - fd)
+        + (table[i + 1, j] * (1 - ft) + table[i + 1, j + 1] * ft) * fd
+    )
+    result[~in_range] = np.nan
+    return result.reshape(shape)
+
+
+def standard_volume(volume, density15, temperature):
+    """Volume at 15 °C of a volume measured at temperature."""
+    return np.asarray(volume, dtype=np.float64) * volume_correction_factor(density15, temperature)
+
+
+def mass_in_air(volume_m3, density15, temperature):
+    """Weight in air (mt) of a volume (m3) measured at temperature, as used on BDNs and in sounding reports."""
+    density15 = np.asarray(density15, dtype=np.float64)
+    return standard_volume(volume_m3, density15, temperature) * (density15 - AIR_BUOYANCY) / 1000.0
@@ -0,0 +1,67 @@
+import re
+import sys
+
+
+class DuplicateWidgetKeyError(ValueError):
+    pass
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def unique_keys(keys):
+    """The set of keys; raises DuplicateWidgetKeyError on any repeat, e.g. for compiled field specs at startup."""
+    seen = set()
+    for key in keys:
+        if key in seen:
+            raise DuplicateWidgetKeyError(f"Widget key {key!r} is used by more than one field")
+        seen.add(key)
+    return seen
+
+
+class WidgetKeys:
+    """Stable widget keys derived from (page, report type, section, field).
+
+    Create one per page at module level, so each full run starts a fresh registry:
+
+        keys = WidgetKeys("EOSP")
+        key = keys.section(report_type, "Voyage Information")
+        st.text_input("Voyage ID", key=key("voyage_id"))  # "eosp.voyage_information.voyage_id"
+
+    A key requested twice in one run raises DuplicateWidgetKeyError, also
+    from the same line (e.g. a loop). A section fragment that reruns on its
+    own calls release() on its scope first, so it can claim its keys again.
+    """
+
+    def __init__(self, *scope, owners=None):
+        self.scope = tuple(slug(part) for part in scope if part is not None)
+        self._owners = {} if owners is None else owners  # key -> (filename, line) that claimed it
+        self._claimed = []  # keys claimed through this scope
+
+    def section(self, *parts):
+        """Keys scoped below this one; None parts (e.g. no report type) are skipped."""
+        return WidgetKeys(*self.scope, *parts, owners=self._owners)
+
+    def name(self, *parts):
+        """The key of parts without claiming it, e.g. to read a widget's value elsewhere."""
+        return ".".join(self.scope + tuple(slug(part) for part in parts if part is not None))
+
+    def release(self):
+        """Gives up the keys claimed through this scope, before it renders its widgets again."""
+        for key in self._claimed:
+            self._owners.pop(key, None)
+        self._claimed = []
+
+    def __call__(self, *parts):
+        key = self.name(*parts)
+        caller = sys._getframe(1)
+        site = (caller.f_code.co_filename, caller.f_lineno)
+        owner = self._owners.get(key)
+        if owner is not None:
+            raise DuplicateWidgetKeyError(
+                f"Widget key {key!r} is used at {owner[0]}:{owner[1]} and {site[0]}:{site[1]}"
+            )
+        self._owners[key] = site
+        self._claimed.append(key)
+        return key